@@ -0,0 +1,103 @@
+import glob
+import math
+import os
+
+import pytest
+from compas.geometry import Transformation
+from compas.geometry import Translation
+
+from cdf_2023.assembly import Assembly
+from cdf_2023.assembly import generate_assembly
+
+HERE = os.path.dirname(__file__)
+DATA = os.path.abspath(os.path.join(HERE, '..', 'data', 'assembly'))
+
+DATASETS = sorted(os.path.basename(path) for path in glob.glob(os.path.join(DATA, '*.json')))
+
+# the dataset which is tiled into larger synthetic assemblies, and the numbers of tiles
+SCALED_DATASET = 'trunk_liuba_24072023_assembly.json'
+SCALES = (4, 16)
+
+# the sizes of grown synthetic assemblies, see generate_assembly
+GENERATED = 'generated'
+GENERATED_SIZES = (1000, )
+
+CASES = [(name, 1) for name in DATASETS] + [(SCALED_DATASET, copies) for copies in SCALES] + [(GENERATED, size) for size in GENERATED_SIZES]
+
+
+def rod_globals(assembly):
+    """Recover the globals of the Grasshopper definition from the first rod of an assembly."""
+    for _key, element in assembly.elements():
+        if element.line is None or element.connector_frame_1 is None:
+            continue
+        point = element.connector_frame_1.point.transformed(Transformation.from_frame(element.frame).inverse())
+        return {'rod_length': element.line.length,
+                'rod_radius': element.capsule.radius,
+                'rf_unit_radius': -2. * point[1],
+                'rf_unit_offset': point[0]}
+    return {}
+
+
+def scaled(assembly, copies, margin=1.):
+    """Tile copies of an assembly on a square grid in the xy plane."""
+    points = [element.frame.point for _key, element in assembly.elements()]
+    dx = max(p[0] for p in points) - min(p[0] for p in points) + margin
+    dy = max(p[1] for p in points) - min(p[1] for p in points) + margin
+    n = int(math.ceil(math.sqrt(copies)))
+
+    result = Assembly(attributes=dict(assembly.network.attributes))
+    for i in range(copies):
+        T = Translation.from_vector([dx * (i % n), dy * (i // n), 0])
+        keys = {}
+        for key, element, attr in assembly.elements(data=True):
+            attr_dict = dict((name, value) for name, value in attr.items() if name not in ('element', 'x', 'y', 'z'))
+            keys[key] = result.add_element(element.transformed(T), attr_dict=attr_dict)
+        for (u, v), attr in assembly.network.edges(data=True):
+            result.add_connection(keys[u], keys[v], attr_dict=dict(attr))
+    result.globals = dict(assembly.globals)
+    return result
+
+
+def case_id(case):
+    name, copies = case
+    if name == GENERATED:
+        return '%s_%d' % (name, copies)
+    name = os.path.splitext(name)[0]
+    return name if copies == 1 else '%s_x%d' % (name, copies)
+
+
+@pytest.fixture(scope='session', params=CASES, ids=case_id)
+def dataset(request, tmp_path_factory):
+    """The path of a bundled, a scaled or a generated assembly."""
+    name, copies = request.param
+    path = os.path.join(DATA, name)
+    if name == GENERATED:
+        path = str(tmp_path_factory.mktemp('assemblies') / (case_id(request.param) + '.json'))
+        generate_assembly(copies, seed=0).to_json(path)
+    elif copies > 1:
+        assembly = Assembly.from_json(path)
+        assembly.globals = rod_globals(assembly)
+        path = str(tmp_path_factory.mktemp('assemblies') / (case_id(request.param) + '.json'))
+        scaled(assembly, copies).to_json(path)
+    return path
+
+
+_LOADED = {}
+
+
+@pytest.fixture
+def assembly(dataset):
+    """The assembly of a dataset, loaded once, benchmarks must not modify it."""
+    if dataset not in _LOADED:
+        assembly = Assembly.from_json(dataset)
+        assembly.globals = rod_globals(assembly)
+        _LOADED[dataset] = assembly
+    return _LOADED[dataset]
+
+
+@pytest.fixture
+def rods(assembly):
+    """The assembly of a dataset, skips datasets without rods."""
+    if not assembly.globals:
+        pytest.skip('The assembly has no rods.')
+    return assembly
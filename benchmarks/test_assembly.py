@@ -0,0 +1,71 @@
+import compas
+import pytest
+from compas.geometry import Rotation
+from compas.geometry import Translation
+
+from cdf_2023.assembly import Assembly
+
+TRANSFORMATION = Translation.from_vector([1., 2., 0.]) * Rotation.from_axis_and_angle([0, 0, 1], 0.5)
+
+
+def test_load(benchmark, dataset):
+    benchmark(Assembly.from_json, dataset)
+
+
+def test_save(benchmark, assembly, tmp_path):
+    path = str(tmp_path / 'assembly.json')
+    benchmark(assembly.to_json, path)
+
+
+def test_copy(benchmark, assembly):
+    benchmark(assembly.copy)
+
+
+def test_transform(benchmark, assembly):
+    def transform(copy):
+        copy.transform(TRANSFORMATION)
+        # deferred geometry is only transformed when it is read
+        for _key, element in copy.elements():
+            element.mesh
+
+    benchmark.pedantic(transform, setup=lambda: ((assembly.copy(), ), {}), rounds=5)
+
+
+def test_open_connectors(benchmark, assembly):
+    benchmark(lambda: list(assembly.connectors('open')))
+
+
+def test_open_connector_ranges(benchmark, assembly):
+    benchmark(lambda: list(assembly.connectors_ranges('open')))
+
+
+def test_placement_options(benchmark, rods):
+    benchmark(rods.all_options_elements, 'AB', 10.)
+
+
+def test_collision_check(benchmark, rods):
+    options = [(key, element.current_option_elements(rods, 'AB', 10., 0)) for key, element in rods.elements()]
+    options = [(key, elements) for key, elements in options if elements]
+    if not options:
+        pytest.skip('The assembly has no open connectors.')
+    # a growth step checks the options of one element against all others
+    options = options[::max(1, len(options) // 10)]
+
+    def check():
+        return [rods.collision_check(key, elements, -0.001) for key, elements in options]
+
+    benchmark(check)
+
+
+def test_volume_and_center(benchmark, rods):
+    def mass(copy):
+        return sum(element.volume for _key, element in copy.elements()), [element.center for _key, element in copy.elements()]
+
+    # copies do not share the cached values
+    benchmark.pedantic(mass, setup=lambda: ((rods.copy(), ), {}), rounds=5)
+
+
+@pytest.mark.skipif(not compas.RHINO, reason='The equilibrium is computed with Rhino geometry.')
+def test_local_equilibrium(benchmark, rods):
+    key = list(rods.network.nodes())[-1]
+    benchmark(rods.calculate_local_equilibrium_in_all_branches, key, [])
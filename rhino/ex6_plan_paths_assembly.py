@@ -3,7 +3,6 @@ import json
 from compas.geometry import Vector, Plane, Transformation, Frame
 from compas.datastructures import Mesh
 from compas_fab.backends import RosClient
-from compas_fab.robots import PlanningScene
 from compas_fab.robots import Configuration
 from compas_fab.robots import Tool
 from compas_fab.robots import AttachedCollisionMesh
@@ -15,6 +14,11 @@ from compas_fab.ghpython.components import create_id
 from assembly_information_model.assembly import Assembly
 from assembly_information_model.assembly import Element
 
+from cdf_2023.planning import RosPlanningBackend
+from cdf_2023.planning import PlanningScheduler
+from cdf_2023.planning import PlanningPolicy
+from cdf_2023.instrumentation import PROFILER
+
 from helpers import plan_picking_motion
 from helpers import plan_moving_and_placing_motion
 
@@ -23,6 +27,11 @@ HERE = os.path.dirname(__file__)
 DATA = os.path.abspath(os.path.join(HERE, "..", "data"))
 PATH_TO = os.path.join(DATA, os.path.splitext(
     os.path.basename(__file__))[0] + ".json")
+STATISTICS_PATH = os.path.join(DATA, os.path.splitext(
+    os.path.basename(__file__))[0] + "_statistics.json")
+# timings of the assembly methods and planner calls, recorded if CDF_PROFILE is set
+PROFILE_PATH = os.path.join(DATA, os.path.splitext(
+    os.path.basename(__file__))[0] + "_profile")
 
 LOAD_FROM_EXISTING = False
 
@@ -77,17 +86,45 @@ attached_element_mesh = AttachedCollisionMesh(
 # ==============================================================================
 # From here on: fill in code, whereever you see this dots ...
 
+# 5. Calculate moving_ and placing trajectories
+# (uses start_configuration and attached_element_mesh computed below)
+# The policy tries cheap planner budgets first and escalates on failure.
+policy = PlanningPolicy(exceptions=(BackendError, ))
+
+
+def plan_element(robot, key, element):
+    def plan(budget):
+        return plan_moving_and_placing_motion(robot,
+                                              element,
+                                              start_configuration,
+                                              group,
+                                              tolerance_vector,
+                                              placing_frame_safe,
+                                              attached_element_mesh,
+                                              planner_options=budget.options)
+    return policy.plan(key, plan)
+
+
 # NOTE: If you run Docker Toolbox, change `localhost` to `192.168.99.100`
-with RosClient('localhost') as client:
-    robot = client.load_robot()
-    planing_scene = PlanningScene(robot)
-    robot.attach_tool(tool)
+# Add one host per ROS/MoveIt container to plan several elements in parallel.
+HOSTS = ['localhost']
 
-    # 1. Add a collison mesh to the planning scene: floor, desk, etc.
-    for cm in scene_collision_meshes:
-        planing_scene.add_collision_mesh(cm)
-    if not LOAD_FROM_EXISTING:
-        planing_scene.remove_collision_mesh('assembly')
+clients = [RosClient(host) for host in HOSTS]
+
+try:
+    backends = []
+    for host, client in zip(HOSTS, clients):
+        client.run()
+        robot = client.load_robot()
+        robot.attach_tool(tool)
+        backend = RosPlanningBackend(robot, plan_element, name=host)
+
+        # 1. Add a collison mesh to the planning scene: floor, desk, etc.
+        for cm in scene_collision_meshes:
+            backend.scene.add_collision_mesh(cm)
+        backends.append(backend)
+
+    robot = backends[0].robot
 
     #2. Compute picking trajectory
     picking_trajectory = plan_picking_motion(robot, picking_frame,
@@ -113,50 +150,37 @@ with RosClient('localhost') as client:
     attached_element_mesh = AttachedCollisionMesh(CollisionMesh(element_tool0.mesh, 'element'), ee_link_name, ['robot_arm_tool0'])
 
     # add the collision mesh to the scene
-    planing_scene.add_attached_collision_mesh(attached_element_mesh)
+    for backend in backends:
+        backend.scene.add_attached_collision_mesh(attached_element_mesh)
 
-    for key in sequence:
-        print("=" * 30 + "\nCalculating path for element with key %d." % key)
+    def merge(result):
+        key = result.key
+        stats = policy.element_statistics(key)
+        print("=" * 30 + "\nCalculated path for element with key %d on %s." % (key, result.backend))
+        print("%d attempt(s), %.1f s, found with %s" % (stats['attempts'], stats['time'], stats['budget']))
 
+        # 6. Add calculated trajectories to element and set to 'planned'
+        # (the element is added to the planning scenes by the scheduler)
         element = assembly.element(key)
-
-
-        # # 4. Create an attached collision mesh and attach it to the robot's end effector.
-        # T = Transformation.from_frame_to_frame(assembly.element(0).frame, tool.frame)
-        # element_tool0 = assembly.element(0).transformed(T)
-        # ee_link_name = robot.get_end_effector_link_name()
-        # attached_element_mesh = AttachedCollisionMesh(CollisionMesh(element_tool0.mesh, 'element'), ee_link_name, ['robot_arm_tool0'])
-
-
-        # 5. Calculate moving_ and placing trajectories
-        for i in range(10):
-            try:
-                moving_trajectory = plan_moving_and_placing_motion(robot,
-                                                                   element,
-                                                                   start_configuration,
-                                                                   group,
-                                                                   tolerance_vector,
-                                                                   placing_frame_safe,
-                                                                   attached_element_mesh)
-
-                if moving_trajectory.fraction != 1:
-                    raise BackendError("Cartesian path not working")
-                else:
-                    break
-
-            except BackendError:
-                print("Trying the %d. time" % (i + 2))
-                continue
-        else:
-            raise BackendError("NOT FOUND")
-
-        # 6. Add the element to the planning scene
-        cm = CollisionMesh(element.mesh, "assembly")
-        planing_scene.append_collision_mesh(cm)
-
-        # 7. Add calculated trajectories to element and set to 'planned'
-        element.trajectory = [picking_trajectory, moving_trajectory]
+        element.trajectory = [picking_trajectory, result.trajectory]
         assembly.network.node_attribute(key, 'is_planned', True)
 
-        # 8. Save assembly to json after every placed element
+        # 7. Save assembly and planning statistics to json after every placed element
         assembly.to_json(PATH_TO, pretty=True)
+        with open(STATISTICS_PATH, 'w') as f:
+            json.dump(policy.statistics(), f, indent=4)
+
+    # Plan ahead on all backends, results are merged in building order
+    scheduler = PlanningScheduler(backends)
+    results = scheduler.plan(assembly, sequence, placed_keys=exclude_keys, callback=merge)
+
+    if results and not results[-1].success:
+        raise results[-1].error
+
+finally:
+    for client in clients:
+        client.close()
+    if PROFILER.enabled:
+        print(PROFILER.report())
+        PROFILER.to_json(PROFILE_PATH + ".json", pretty=True)
+        PROFILER.to_folded(PROFILE_PATH + ".folded")
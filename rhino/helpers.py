@@ -2,34 +2,47 @@ import math
 from compas_fab.robots import Configuration
 from ur_fabrication_control.kinematics.ur_kinematics import inverse_kinematics
 from ur_fabrication_control.kinematics.ur_params import ur_params
+from cdf_2023.instrumentation import timed
 
 def show_trajectory(trajectory):
     import matplotlib.pyplot as plt
+    from cdf_2023.planning import trajectory_arrays_numpy
     # visualise
-    positions = []
-    velocities = []
-    accelerations = []
-    time_from_start = []
-
-    for p in trajectory.points:
-        positions.append(p.positions)
-        velocities.append(p.velocities)
-        accelerations.append(p.accelerations)
-        time_from_start.append(p.time_from_start.seconds)
+    time_from_start, positions, velocities, accelerations = trajectory_arrays_numpy(trajectory)
 
     plt.rcParams['figure.figsize'] = [17, 4]
     plt.subplot(131)
     plt.title('positions')
-    plt.plot(positions)
+    plt.plot(time_from_start, positions)
     plt.subplot(132)
-    plt.plot(velocities)
+    plt.plot(time_from_start, velocities)
     plt.title('velocities')
     plt.subplot(133)
-    plt.plot(accelerations)
+    plt.plot(time_from_start, accelerations)
     plt.title('accelerations')
     plt.show()
 
 
+def print_trajectory_metrics(trajectory, robot=None, group=None):
+    """Print the metrics of a trajectory, without opening a window.
+
+    Parameters
+    ----------
+    trajectory : :class:`JointTrajectory`
+    robot : :class:`compas_fab.robots.Robot`, optional
+        If given, the joint limit margins are included.
+    group : str, optional
+    """
+    from cdf_2023.planning import joint_limits_numpy
+    from cdf_2023.planning import trajectory_metrics_numpy
+
+    joint_limits = joint_limits_numpy(robot, group) if robot else None
+    metrics = trajectory_metrics_numpy(trajectory, joint_limits)
+    for name, value in sorted(metrics.items()):
+        print("%s: %s" % (name, value))
+
+
+@timed('helpers.plan_picking_motion')
 def plan_picking_motion(robot, picking_frame, safelevel_picking_frame, group, attached_element_mesh):
     """Returns a cartesian trajectory to pick an element.
 
@@ -65,7 +78,8 @@ def plan_picking_motion(robot, picking_frame, safelevel_picking_frame, group, at
     return picking_trajectory
 
 
-def plan_moving_and_placing_motion(robot, element, start_configuration, group, tolerance_vector, safe_target_frame, attached_element_mesh):
+@timed('helpers.plan_moving_and_placing_motion')
+def plan_moving_and_placing_motion(robot, element, start_configuration, group, tolerance_vector, safe_target_frame, attached_element_mesh, planner_options=None):
     """Returns two trajectories for moving and placing an element.
 
     Parameters
@@ -76,6 +90,9 @@ def plan_moving_and_placing_motion(robot, element, start_configuration, group, t
     tolerance_vector : :class:`Vector`
     safelevel_vector : :class:`Vector`
     attached_element_mesh : :class:`AttachedCollisionMesh`
+    planner_options : dict, optional
+        Overrides ``planner_id``, ``num_planning_attempts`` and ``allowed_planning_time``,
+        e.g. :attr:`cdf_2023.planning.PlannerBudget.options`.
 
     Returns
     -------
@@ -95,15 +112,16 @@ def plan_moving_and_placing_motion(robot, element, start_configuration, group, t
                                                     tolerance_axes,
                                                     group)
 
+    options = dict(planner_id='RRTConnect',
+                   attached_collision_meshes=[attached_element_mesh],
+                   num_planning_attempts=20,
+                   allowed_planning_time=10)
+    options.update(planner_options or {})
+
     moving_trajectory = robot.plan_motion(goal_constraints,
                                           start_configuration=start_configuration,
                                           group=group,
-                                          options=dict(
-                                          planner_id='RRTConnect',
-                                          attached_collision_meshes=[attached_element_mesh],
-                                          num_planning_attempts=20,
-                                          allowed_planning_time=10
-                                          ))
+                                          options=options)
 
     #frames = [safe_target_frame, target_frame]
     frames = [target_frame]
@@ -1,3 +1,10 @@
 from .assembly import Assembly
+from .collision import COLLISION_LEVELS
+from .connector_range import ConnectorRange
 from .element import Element
+from .element import ElementOption
+from .exporters import BuildingPlanReader
+from .generator import generate_assembly
+from .trajectory_store import TrajectoryStore
+from .trajectory_store import trajectory_store_path
 #from .interfaces_numpy import assembly_interfaces_numpy
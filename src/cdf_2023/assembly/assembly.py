@@ -16,18 +16,28 @@ from compas.datastructures import Network, mesh_offset
 from compas.artists import Artist
 from compas.colors import Color
 from compas.topology import connected_components
-from compas_rhino.conversions import line_to_rhino_curve, point_to_compas, point_to_rhino, line_to_compas
 
-import rhinoscriptsyntax as rs
-import Rhino.Geometry as rg
-import ghpythonlib.components as gh
+# the growth and equilibrium methods need Rhino, the data, copy, transform and query methods do not
+if compas.RHINO:
+    from compas_rhino.conversions import line_to_rhino_curve, point_to_compas, point_to_rhino, line_to_compas
 
+    import rhinoscriptsyntax as rs
+    import Rhino.Geometry as rg
+    import ghpythonlib.components as gh
+
+from ..instrumentation import timed
+from .collision import distance_segment_segment
 from .element import Element
+from .trajectory_store import TrajectoryStore
+from .trajectory_store import trajectory_store_path
 
 from .utilities import FromToData
 from .utilities import FromToJson
-from .utilities import element_to_INCON
-from .utilities import tag_to_INCON
+from .utilities import node_to_data
+from .exporters import write_building_plan
+from .exporters import write_building_plan_index
+from .exporters import write_incon
+from .exporters import write_xr
 
 __all__ = ['Assembly']
 
@@ -59,10 +69,13 @@ class Assembly(FromToData, FromToJson):
 
     Examples
     --------
+    >>> from compas.geometry import Box
     >>> assembly = Assembly()
     >>> for i in range(2):
-    >>>     element = Element.from_box(Box(Frame.worldXY(), 10, 5, 2))
-    >>>     assembly.add_element(element)
+    ...     element = Element.from_box(Box(Frame.worldXY(), 10, 5, 2))
+    ...     key = assembly.add_element(element)
+    >>> assembly.number_of_elements()
+    2
     """
 
     def __init__(self,
@@ -98,6 +111,8 @@ class Assembly(FromToData, FromToJson):
         if default_connection_attributes is not None:
             self.network.default_edge_attributes.update(default_connection_attributes)
 
+        self.trajectory_store = None
+
         if elements:
             for element in elements:
                 self.add_element(element)
@@ -120,7 +135,8 @@ class Assembly(FromToData, FromToJson):
             The number of elements.
 
         """
-        return self.network.number_of_nodes()
+        # the network counts its nodes by iterating over them
+        return len(self.network.node)
 
     def number_of_connections(self):
         """Compute the number of connections of the assembly.
@@ -143,20 +159,7 @@ class Assembly(FromToData, FromToJson):
         # so we need to trigger that for elements stored in nodes
         node = {}
         for vkey, vdata in d['node'].items():
-            node[vkey] = {key: vdata[key] for key in vdata.keys() if key != 'element'}
-            node[vkey]['element'] = vdata['element'].to_data()
-
-            if 'frame_measured' in vdata:
-                if node[vkey]['frame_measured']:
-                    node[vkey]['frame_measured'] = node[vkey]['frame_measured'].to_data()
-
-            if 'robot_AA_base_frame' in vdata:
-                if node[vkey]['robot_AA_base_frame']:
-                    node[vkey]['robot_AA_base_frame'] = node[vkey]['robot_AA_base_frame'].to_data()
-
-            if 'robot_AB_base_frame' in vdata:
-                if node[vkey]['robot_AB_base_frame']:
-                    node[vkey]['robot_AB_base_frame'] = node[vkey]['robot_AB_base_frame'].to_data()
+            node[vkey] = node_to_data(vdata)
 
         d['node'] = node
 
@@ -182,11 +185,95 @@ class Assembly(FromToData, FromToJson):
 
         self.network = Network.from_data(data)
 
+    @classmethod
+    @timed('Assembly.from_json')
+    def from_json(cls, filepath):
+        """Construct an assembly from a json file.
+
+        If the trajectories of the assembly were moved to a trajectory store,
+        the store is attached and trajectories are loaded when they are accessed.
+
+        Parameters
+        ----------
+        filepath : str
+            The path to the json file.
+
+        Returns
+        -------
+        :class:`Assembly`
+        """
+        assembly = super(Assembly, cls).from_json(filepath)
+
+        path = assembly.network.attributes.get('trajectory_store')
+        if path:
+            path = trajectory_store_path(path, filepath)
+            # the json may be saved elsewhere afterwards
+            assembly.network.attributes['trajectory_store'] = path
+            if os.path.isdir(path):
+                assembly.attach_trajectory_store(TrajectoryStore(path))
+
+        return assembly
+
+    def to_json(self, filepath, pretty=False):
+        """Serialise the assembly to json.
+
+        An absolute path of a trajectory store is written relative to the json file.
+
+        Parameters
+        ----------
+        filepath : str
+            The path to the json file.
+        pretty : bool, optional
+        """
+        path = self.network.attributes.get('trajectory_store')
+        if not path or not os.path.isabs(path):
+            return super(Assembly, self).to_json(filepath, pretty)
+        try:
+            self.network.attributes['trajectory_store'] = os.path.relpath(path, os.path.dirname(os.path.abspath(filepath)))
+        except ValueError:
+            # another drive on Windows
+            pass
+        try:
+            return super(Assembly, self).to_json(filepath, pretty)
+        finally:
+            self.network.attributes['trajectory_store'] = path
+
+    def attach_trajectory_store(self, store):
+        """Load the trajectories referenced by the elements from a trajectory store.
+
+        Parameters
+        ----------
+        store : :class:`TrajectoryStore`
+        """
+        self.trajectory_store = store
+        for _key, element in self.elements():
+            element.trajectory_store = store
+
+    def store_trajectories(self, store, path=None):
+        """Move the trajectories of all elements to a trajectory store.
+
+        Afterwards the elements only hold references to the trajectories
+        and the assembly json stays small.
+
+        Parameters
+        ----------
+        store : :class:`TrajectoryStore`
+            The store to write to.
+        path : str, optional
+            The path of the store recorded in the assembly attributes, absolute
+            or relative to the assembly json file. Defaults to the absolute
+            ``store.path``, which :meth:`to_json` writes relative to the json file.
+        """
+        for key, element in self.elements():
+            element.store_trajectory(store, str(key))
+        self.attach_trajectory_store(store)
+        self.network.attributes['trajectory_store'] = path or os.path.abspath(store.path)
+
     def clear(self):
         """Clear all the assembly data."""
         self.network.clear()
 
-    def add_element(self, element, key=None, attr_dict={}, **kwattr):
+    def add_element(self, element, key=None, attr_dict=None, **kwattr):
         """Add an element to the assembly.
 
         Parameters
@@ -201,13 +288,14 @@ class Assembly(FromToData, FromToJson):
         hashable
             The identifier of the element.
         """
-        attr_dict.update(kwattr)
+        attr_dict = dict(attr_dict or {}, **kwattr)
         x, y, z = element.frame.point
         key = self.network.add_node(key=key, attr_dict=attr_dict,
                                     x=x, y=y, z=z, element=element)
         return key
 
 
+    @timed('Assembly.add_rf_unit_element')
     def add_rf_unit_element(
             self,
             current_key,
@@ -229,7 +317,7 @@ class Assembly(FromToData, FromToJson):
         rf_unit_radius = self.globals['rf_unit_radius']
         rf_unit_offset = self.globals['rf_unit_offset']
 
-        N = self.network.number_of_nodes()
+        N = self.number_of_elements()
 
         current_elem = self.network.node[current_key]['element']
 
@@ -359,11 +447,15 @@ class Assembly(FromToData, FromToJson):
         assembly.network.transform(transformation)
         return assembly
 
+    @timed('Assembly.copy')
     def copy(self):
         """Returns a copy of this assembly.
         """
         cls = type(self)
-        return cls.from_data(deepcopy(self.data))
+        assembly = cls.from_data(deepcopy(self.data))
+        if self.trajectory_store:
+            assembly.attach_trajectory_store(self.trajectory_store)
+        return assembly
 
     def element(self, key, data=False):
         """Get an element by its key."""
@@ -423,24 +515,41 @@ class Assembly(FromToData, FromToJson):
         a, b, d = gh.CurveProximity(line1, line2)
         return d
 
+    @timed('Assembly.collision_check')
     def collision_check(self, current_key, option_elems, tolerance):
         """Check for collisions with previously built elements.
-        """
 
+        The elements are treated as capsules around their axes, see
+        :attr:`Element.capsule`, which collide if the axes are closer than two
+        rod radii plus a clearance.
+
+        Parameters
+        ----------
+        current_key : int
+            The key of the element the options are attached to, which is not checked.
+        option_elems : list of :class:`ElementOption` or :class:`Element`
+        tolerance : float
+            Added to the clearance.
+
+        Returns
+        -------
+        tuple
+            ``True`` if an option collides, and the shortest distance between the axes.
+        """
+        clearance = self.globals['rod_radius'] * 2. + 0.015 + tolerance
+        option_lines = [option.line for option in option_elems]
         collision = False
-        results = []
-        dist_list = []
+        dist = None
         for key, elem in self.elements():
-            if key != current_key:
-                line1 = Artist(elem.line).draw()
-                for option_elem in option_elems:
-                    line2 = Artist(option_elem.line).draw()
-                    #results.append(True if distance_line_line(elem.line, option_elem.line, tol = 0.001) < assembly.globals['rod_radius']*2. + tolerance else False)
-                    distance = self.shortest_distance_between_two_lines(line1, line2)
-                    results.append(True if distance < (self.globals['rod_radius'] * 2. + 0.015 + tolerance) else False)
-                    dist_list.append(distance)
-                collision = True if True in results else False
-                dist = min(dist_list)
+            if key == current_key:
+                continue
+            line = elem.line
+            for option_line in option_lines:
+                distance = distance_segment_segment(line, option_line)
+                if distance < clearance:
+                    collision = True
+                if dist is None or distance < dist:
+                    dist = distance
         return collision, dist
 
     def check_ground_collision(self, option_elems):
@@ -454,6 +563,7 @@ class Assembly(FromToData, FromToJson):
             if intersection != None:
                 return intersection
 
+    @timed('Assembly.get_rot_angle')
     def get_rot_angle(self, step, rot_axis, rot_point, elem_line1, elem_line2, rot_dir, epsilon):
         """
         elem_line1: element to rotate
@@ -517,6 +627,7 @@ class Assembly(FromToData, FromToJson):
 
         return math.degrees(rot_angle)
 
+    @timed('Assembly.add_third_element')
     def add_third_element(self, elem, elem1, elem2, point1, point2, shift_value, epsilon):
         """
         elem1: open connector
@@ -564,6 +675,7 @@ class Assembly(FromToData, FromToJson):
 
         return new_elem
 
+    @timed('Assembly.calculate_global_equilibrium')
     def calculate_global_equilibrium(self, support, option_elems, radius, allow_temp_support=True):
         """Check if the structure is in equilibrium.
         """
@@ -715,6 +827,7 @@ class Assembly(FromToData, FromToJson):
 
         return([la, rp])
 
+    @timed('Assembly.calculate_local_equilibrium_in_all_branches')
     def calculate_local_equilibrium_in_all_branches(self, current_key, elem_options):
 
         # Identify the connected elements (branches) in the assembly.
@@ -745,6 +858,7 @@ class Assembly(FromToData, FromToJson):
 
         return lever_arm_branches, resultant_branches
 
+    @timed('Assembly.close_rf_unit')
     def close_rf_unit(self,
                       current_key,
                       flip,
@@ -769,13 +883,14 @@ class Assembly(FromToData, FromToJson):
                                                        angle=angle,
                                                        shift_value=shift_value,
                                                        placed_by=placed_by,
-                                                       robot_name='AA',
+                                                       robot_name=robot_name,
                                                        robot_AA_base_frame=robot_AA_base_frame,
                                                        robot_AB_base_frame=robot_AB_base_frame,
                                                        on_ground=False,
                                                        unit_index=i,
                                                        frame_measured=None)
-                keys_robot += list(self.network.nodes_where({'element': my_new_elem}))
+                # the new element is the last node
+                keys_robot.append(self.number_of_elements() - 1)
             else:
                 placed_by = 'human'
                 #frame_id = added_frame_id
@@ -784,18 +899,19 @@ class Assembly(FromToData, FromToJson):
                                                        angle=angle,
                                                        shift_value=shift_value,
                                                        placed_by=placed_by,
-                                                       robot_name='AA',
+                                                       robot_name=robot_name,
                                                        robot_AA_base_frame=robot_AA_base_frame,
                                                        robot_AB_base_frame=robot_AB_base_frame,
                                                        on_ground=False,
                                                        unit_index=i,
                                                        frame_measured=None)
-                keys_human = list((self.network.nodes_where({'element': my_new_elem})))
+                keys_human = [self.number_of_elements() - 1]
 
         keys_dict = {'keys_human': keys_human, 'keys_robot':keys_robot}
 
         return keys_dict
 
+    @timed('Assembly.join_branches')
     def join_branches(self,
                       keys_pair,
                       flip,
@@ -856,7 +972,7 @@ class Assembly(FromToData, FromToJson):
                                                frame_measured=None)
                 keys_human = list((self.network.nodes_where({'element': my_new_elem})))
 
-        N = self.network.number_of_nodes()
+        N = self.number_of_elements()
 
         d1 = distance_point_point(new_elem.line.end, self.element(keys_pair[1]).frame.point)
         d2 = distance_point_point(new_elem.line.start, self.element(keys_pair[1]).frame.point)
@@ -897,10 +1013,9 @@ class Assembly(FromToData, FromToJson):
     def update_connectors_states(self, current_key, flip, my_new_elem, unit_index):
 
 
-        key_index = self.network.key_index()
         current_elem = self.network.node[current_key]['element']
-        keys = [key_index[key] for key in self.network.nodes()]
-        previous_elem = self.network.node[keys[-2]]['element']
+        # the keys are the indices of the nodes, the element added before the new one
+        previous_elem = self.network.node[self.number_of_elements() - 2]['element']
 
         if unit_index == 1:
             if current_elem.connector_2_state:
@@ -999,11 +1114,11 @@ class Assembly(FromToData, FromToJson):
 
         return abs(dot_product)*100, vector
 
-    def all_options_elements(self, flip, angle):
-        """Returns a list of elements.
+    @timed('Assembly.all_options_elements')
+    def all_options_elements(self, flip, angle, shift_value=0):
+        """Returns the options of all elements, see :meth:`Element.current_option_elements`.
         """
-        keys = [key for key, element in self.elements()]
-        return [self.element(key).current_option_elements(self, flip, angle) for key in keys]
+        return [element.current_option_elements(self, flip, angle, shift_value) for key, element in self.elements()]
 
 
     def all_options_vectors(self, len):
@@ -1069,7 +1184,7 @@ class Assembly(FromToData, FromToJson):
         # return [(key, self.element(key).connectors(state)) for key in keys]
 
 
-    def export_building_plan(self):
+    def export_building_plan(self, path, markers=(), binary=False, index_path=None):
         """
         exports the building plan by using the following protocol:
 
@@ -1080,58 +1195,32 @@ class Assembly(FromToData, FromToJson):
         the next lines contain the wall information:
         type [string], element pose [6], string_message [string]
         = type, x, y, z, qw, qx, qy, qz, string_message
-        """
-
-        print("exporting")
-        building_plan = []
 
-        for key, element, data in self.elements(data=True):
-            line = []
+        The plan is written as CSV or as fixed-width binary records, see
+        :func:`write_building_plan`, with an index next to it,
+        ``<name>.idx`` by default, to read the row of an element with
+        :class:`BuildingPlanReader` without parsing the plan.
 
-            t = element._type
-            line.append(t) #type
-            line += element.get_pose_quaternion() #element pose
-            string_message = "This is the element with the key index %i" %key
-            line.append(string_message)
-            building_plan.append(line)
-
-        print(building_plan)
-        exporter = Exporter()
-        exporter.delete_file()
-        exporter.export_building_plan(building_plan)
+        Returns
+        -------
+        list of tuple
+            The ``(key, offset)`` of every element.
+        """
+        with open(path, 'wb') as fp:
+            index = write_building_plan(self, fp, markers, binary)
+        with open(index_path or os.path.splitext(path)[0] + '.idx', 'wb') as fp:
+            write_building_plan_index(index, fp)
+        return index
 
     def export_to_json_for_xr(self, path, is_built=False):
-
-        self.network.update_default_node_attributes({"is_built":False,"idx_v":None,"custom_attr_1":None,"custom_attr_2":None,"custom_attr_3":None})
-
-        for key, element in self.elements():
-            idx_v = self.network.node_attribute(key, "course")
-            self.network.node_attribute(key, "idx_v", idx_v)
-            self.network.node_attribute(key, "is_built", is_built)
-
-        self.to_json(path)
+        """Write the assembly for the XR app, see :func:`write_xr`. The assembly is not modified."""
+        with open(path, 'w') as fp:
+            write_xr(self, fp, is_built)
 
     def export_to_json_incon(self, path, qr_code, starting_geometry=True, is_built=True, pretty=True):
-        buildingplan = {"id":"iaac_plan",'name':"iaac_plan", "description":"iaac_plan", "building_steps":[]}
-        building_steps = []
-        len = 0
-
-        if starting_geometry:
-            element_to_INCON("starting element", len, None, building_steps, True, "starting_material.obj")
-            len += 1
-
-        for key, element, data in self.elements(data=True):
-            element_to_INCON("dynamic_cylinder", key, element, building_steps, True, "cylinder_for_iaac_workshop.obj")
-
-        placeholder = {"type":"object",'object_type':"cylinder_for_iaac_workshop_1m.obj", "id": "dynamic_cylinder", "is_tag": False, "is_already_built": False, "color_rgb": [1.0, 0.0, 0.0],"instances": 200,"build_instructions" : []}
-        building_steps.append(placeholder)
-
-        for key, tag in enumerate(qr_code):
-            tag_to_INCON(key, tag, building_steps)
-
-        buildingplan['building_steps'] = building_steps
-        compas.json_dump(buildingplan, path, pretty)
-
+        """Write the INCON building plan for the AR headset, see :func:`write_incon`."""
+        with open(path, 'w') as fp:
+            write_incon(self, fp, qr_code, starting_geometry, is_built, pretty)
 
     def assembly_to_json(self, path, pretty):
 
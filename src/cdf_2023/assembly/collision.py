@@ -0,0 +1,201 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import math
+
+from compas.datastructures import Mesh
+from compas.geometry import Frame
+from compas.geometry import Transformation
+from compas.geometry import cross_vectors
+from compas.geometry import distance_point_point
+from compas.geometry import dot_vectors
+from compas.geometry import scale_vector
+from compas.geometry import subtract_vectors
+from compas.geometry import transform_points
+
+
+__all__ = [
+    'COLLISION_LEVELS',
+    'closest_points_segment_segment',
+    'distance_segment_segment',
+    'distance_capsule_capsule',
+    'capsule_mesh',
+    'prism_hull',
+    'box_hull',
+]
+
+
+COLLISION_LEVELS = ('capsule', 'hull', 'mesh')
+"""The levels of detail of the collision geometry of an element, from the cheapest to the exact one."""
+
+
+def _clamp(value):
+    return min(max(value, 0.), 1.)
+
+
+def closest_points_segment_segment(segment1, segment2):
+    """Compute the closest points of two segments.
+
+    Parameters
+    ----------
+    segment1 : tuple
+        The start and end point of the first segment.
+    segment2 : tuple
+        The start and end point of the second segment.
+
+    Returns
+    -------
+    tuple
+        The closest point on the first and on the second segment.
+
+    Examples
+    --------
+    >>> closest_points_segment_segment(([0, 0, 0], [1, 0, 0]), ([2, -1, 1], [2, 1, 1]))
+    ([1.0, 0.0, 0.0], [2.0, 0.0, 1.0])
+    """
+    # plain floats, the vector functions of compas are too slow for the growth of large assemblies
+    (ax, ay, az), (bx, by, bz) = segment1
+    (cx, cy, cz), (dx, dy, dz) = segment2
+    ux, uy, uz = bx - ax, by - ay, bz - az
+    vx, vy, vz = dx - cx, dy - cy, dz - cz
+    wx, wy, wz = ax - cx, ay - cy, az - cz
+    uu = ux * ux + uy * uy + uz * uz
+    vv = vx * vx + vy * vy + vz * vz
+    uv = ux * vx + uy * vy + uz * vz
+    uw = ux * wx + uy * wy + uz * wz
+    vw = vx * wx + vy * wy + vz * wz
+
+    if uu < 1e-24 and vv < 1e-24:
+        return [ax, ay, az], [cx, cy, cz]
+    if uu < 1e-24:
+        s, t = 0., _clamp(vw / vv)
+    elif vv < 1e-24:
+        s, t = _clamp(-uw / uu), 0.
+    else:
+        denominator = uu * vv - uv * uv
+        # parallel segments have no unique pair, any point of the first one will do
+        s = _clamp((uv * vw - vv * uw) / denominator) if denominator > 1e-12 * uu * vv else 0.
+        t = (uv * s + vw) / vv
+        if t < 0.:
+            s, t = _clamp(-uw / uu), 0.
+        elif t > 1.:
+            s, t = _clamp((uv - uw) / uu), 1.
+
+    return [ax + ux * s, ay + uy * s, az + uz * s], [cx + vx * t, cy + vy * t, cz + vz * t]
+
+
+def distance_segment_segment(segment1, segment2):
+    """Compute the shortest distance between two segments.
+
+    Parameters
+    ----------
+    segment1 : tuple
+        The start and end point of the first segment.
+    segment2 : tuple
+        The start and end point of the second segment.
+
+    Returns
+    -------
+    float
+    """
+    return distance_point_point(*closest_points_segment_segment(segment1, segment2))
+
+
+def distance_capsule_capsule(capsule1, capsule2):
+    """Compute the distance between the surfaces of two capsules.
+
+    Parameters
+    ----------
+    capsule1 : :class:`compas.geometry.Capsule`
+    capsule2 : :class:`compas.geometry.Capsule`
+
+    Returns
+    -------
+    float
+        The distance, negative if the capsules overlap.
+    """
+    return distance_segment_segment(capsule1.line, capsule2.line) - capsule1.radius - capsule2.radius
+
+
+def capsule_mesh(capsule, sides=8, rings=2):
+    """Construct a coarse mesh of a capsule.
+
+    Parameters
+    ----------
+    capsule : :class:`compas.geometry.Capsule`
+    sides : int, optional
+        The number of faces around the axis.
+    rings : int, optional
+        The number of rings of each cap.
+
+    Returns
+    -------
+    :class:`compas.datastructures.Mesh`
+    """
+    return Mesh.from_shape(capsule, u=sides, v=2 * rings)
+
+
+def prism_hull(line, radius, sides=6):
+    """Construct a prism around a cylinder.
+
+    The edges of the prism touch the circle of the cylinder from outside,
+    so the prism contains the cylinder.
+
+    Parameters
+    ----------
+    line : :class:`compas.geometry.Line`
+        The axis of the cylinder.
+    radius : float
+        The radius of the cylinder.
+    sides : int, optional
+        The number of sides of the prism.
+
+    Returns
+    -------
+    :class:`compas.datastructures.Mesh`
+
+    Examples
+    --------
+    >>> from compas.geometry import Line
+    >>> hull = prism_hull(Line([0, 0, 0], [1, 0, 0]), 0.01)
+    >>> hull.number_of_vertices(), hull.number_of_faces()
+    (12, 8)
+    """
+    direction = line.direction
+    # any frame with the z axis along the line
+    xaxis = [0, 0, 1] if abs(direction[2]) < 0.9 else [1, 0, 0]
+    xaxis = subtract_vectors(xaxis, scale_vector(direction, dot_vectors(xaxis, direction)))
+    frame = Frame(line.start, xaxis, cross_vectors(direction, xaxis))
+    circumradius = radius / math.cos(math.pi / sides)
+    length = line.length
+    local = []
+    for z in (0., length):
+        for i in range(sides):
+            angle = 2 * math.pi * i / sides
+            local.append([circumradius * math.cos(angle), circumradius * math.sin(angle), z])
+    vertices = transform_points(local, Transformation.from_frame(frame))
+    faces = [list(range(sides - 1, -1, -1)), list(range(sides, 2 * sides))]
+    faces += [[i, (i + 1) % sides, sides + (i + 1) % sides, sides + i] for i in range(sides)]
+    return Mesh.from_vertices_and_faces(vertices, faces)
+
+
+def box_hull(mesh, frame):
+    """Construct the bounding box of a mesh, aligned with a frame.
+
+    Parameters
+    ----------
+    mesh : :class:`compas.datastructures.Mesh`
+    frame : :class:`compas.geometry.Frame`
+
+    Returns
+    -------
+    :class:`compas.datastructures.Mesh`
+    """
+    to_local = Transformation.from_frame(frame).inverse()
+    points = transform_points([mesh.vertex_coordinates(key) for key in mesh.vertices()], to_local)
+    (x0, y0, z0), (x1, y1, z1) = [[f(p[i] for p in points) for i in range(3)] for f in (min, max)]
+    local = [[x0, y0, z0], [x1, y0, z0], [x1, y1, z0], [x0, y1, z0],
+             [x0, y0, z1], [x1, y0, z1], [x1, y1, z1], [x0, y1, z1]]
+    faces = [[0, 3, 2, 1], [4, 5, 6, 7], [0, 1, 5, 4], [1, 2, 6, 5], [2, 3, 7, 6], [3, 0, 4, 7]]
+    return Mesh.from_vertices_and_faces(transform_points(local, Transformation.from_frame(frame)), faces)
@@ -0,0 +1,352 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import math
+
+from compas.geometry import Frame
+from compas.geometry import Plane
+from compas.geometry import Point
+from compas.geometry import add_vectors
+from compas.geometry import cross_vectors
+from compas.geometry import dot_vectors
+from compas.geometry import length_vector
+from compas.geometry import normalize_vector
+from compas.geometry import scale_vector
+from compas.geometry import subtract_vectors
+
+
+__all__ = ['ConnectorRange']
+
+
+def _circumcircle(a, b, c):
+    # center, radius and normal of the circle through three points
+    ab = subtract_vectors(b, a)
+    ac = subtract_vectors(c, a)
+    normal = cross_vectors(ab, ac)
+    nn = dot_vectors(normal, normal)
+    if nn < 1e-24:
+        raise ValueError('The points of the range are collinear.')
+    offset = add_vectors(scale_vector(cross_vectors(normal, ab), dot_vectors(ac, ac)),
+                         scale_vector(cross_vectors(ac, normal), dot_vectors(ab, ab)))
+    center = add_vectors(a, scale_vector(offset, 0.5 / nn))
+    return center, length_vector(subtract_vectors(a, center)), normalize_vector(normal)
+
+
+def _curve_point(points, weights, knots, degree, t):
+    # de Boor's algorithm in homogeneous coordinates
+    span = degree
+    while span < len(points) - 1 and knots[span + 1] <= t:
+        span += 1
+    d = [[c * weights[i] for c in points[i]] + [weights[i]] for i in range(span - degree, span + 1)]
+    for r in range(1, degree + 1):
+        for j in range(degree, r - 1, -1):
+            i = j + span - degree
+            denominator = knots[i + degree - r + 1] - knots[i]
+            alpha = (t - knots[i]) / denominator if denominator else 0.
+            d[j] = [(1 - alpha) * a + alpha * b for a, b in zip(d[j - 1], d[j])]
+    return [c / d[degree][3] for c in d[degree][:3]]
+
+
+class ConnectorRange(object):
+    """The range of positions of a connector, a sector of a cone around an axis.
+
+    The range is the part of the cone with its apex at the origin of the frame,
+    the axis along the z-axis and the generators at ``angle`` to the axis,
+    between the distances ``start`` and ``end`` from the apex, along the
+    generators, and between the angles ``0`` and ``sweep`` around the axis,
+    measured from the x-axis. An ``angle`` of 90 degrees describes an
+    annular sector in the xy-plane of the frame.
+
+    Parameters
+    ----------
+    frame : :class:`compas.geometry.Frame`
+        The frame of the apex.
+    angle : float
+        The angle between the axis and the generators in radians, in ``(0, pi/2]``.
+    start : float
+        The distance from the apex to the inner edge.
+    end : float
+        The distance from the apex to the outer edge.
+    sweep : float, optional
+        The angle of the sector around the axis in radians, a full cone by default.
+
+    Examples
+    --------
+    >>> cone = ConnectorRange(Frame.worldXY(), math.radians(45), 0.1, 1.0)
+    >>> cone.contains([0.5, 0, 0.5])
+    True
+    >>> cone.contains([0, 0, 0.5])
+    False
+    >>> [round(t, 6) for t in cone.intersection_line([[-1, 0, 0.5], [1, 0, 0.5]])[0]]
+    [-0.5, 0.0, 0.5]
+    """
+
+    def __init__(self, frame, angle, start, end, sweep=2 * math.pi):
+        self.frame = frame
+        self.angle = angle
+        self.start = start
+        self.end = end
+        self.sweep = sweep
+
+    def __repr__(self):
+        return 'ConnectorRange({0!r}, {1!r}, {2!r}, {3!r}, {4!r})'.format(self.frame, self.angle, self.start, self.end, self.sweep)
+
+    @property
+    def data(self):
+        """dict : The data of the range."""
+        return {
+            'frame': self.frame.to_data(),
+            'angle': self.angle,
+            'start': self.start,
+            'end': self.end,
+            'sweep': self.sweep,
+        }
+
+    @data.setter
+    def data(self, data):
+        self.frame = Frame.from_data(data['frame'])
+        self.angle = data['angle']
+        self.start = data['start']
+        self.end = data['end']
+        self.sweep = data.get('sweep', 2 * math.pi)
+
+    @classmethod
+    def from_data(cls, data):
+        """Construct a range from its data.
+
+        The data of a NURBS surface, see :meth:`from_nurbs_data`, or of a
+        :class:`compas.geometry.Cone`, see :meth:`from_cone_data`, is
+        converted as well.
+
+        Parameters
+        ----------
+        data : dict
+
+        Returns
+        -------
+        :class:`ConnectorRange`
+        """
+        if 'points' in data:
+            return cls.from_nurbs_data(data)
+        if 'circle' in data:
+            return cls.from_cone_data(data)
+        connector_range = cls(Frame.worldXY(), math.pi / 4, 0., 1.)
+        connector_range.data = data
+        return connector_range
+
+    def to_data(self):
+        return self.data
+
+    @classmethod
+    def from_nurbs_data(cls, data):
+        """Fit a range to the data of a NURBS surface, ruled between two arcs.
+
+        This reads the connector ranges stored as NURBS surfaces, e.g. in
+        assemblies written with earlier versions, without Rhino.
+
+        Parameters
+        ----------
+        data : dict
+            The data of the surface, the arcs are its boundaries in the v-direction.
+
+        Returns
+        -------
+        :class:`ConnectorRange`
+        """
+        points, weights, degree = data['points'], data['weights'], data['u_degree']
+        knots = [knot for knot, mult in zip(data['u_knots'], data['u_mults']) for _ in range(mult)]
+        t0, t1 = knots[degree], knots[len(points)]
+        circles = []
+        for j in (0, -1):
+            column = [row[j] for row in points]
+            column_weights = [row[j] for row in weights]
+            arc = [_curve_point(column, column_weights, knots, degree, t0 + (t1 - t0) * i / 3.) for i in range(4)]
+            circles.append(_circumcircle(*arc[:3]) + ([arc[0], arc[-1]], ))
+
+        # the inner arc has the smaller radius, the normal turns along the arcs
+        (c1, r1, zaxis, ends), (c2, r2, _, _) = sorted(circles, key=lambda circle: circle[1])
+        if abs(r2 - r1) < 1e-9:
+            raise ValueError('The surface is a cylinder, not a cone.')
+        first, last = ends
+        height = dot_vectors(subtract_vectors(c2, c1), zaxis)
+        if height < -1e-9 * r2:
+            zaxis, height = scale_vector(zaxis, -1), -height
+            first, last = last, first
+        angle = math.atan2(r2 - r1, height)
+        apex = subtract_vectors(c1, scale_vector(zaxis, r1 * height / (r2 - r1)))
+
+        xaxis = subtract_vectors(first, c1)
+        xaxis = subtract_vectors(xaxis, scale_vector(zaxis, dot_vectors(xaxis, zaxis)))
+        frame = Frame(apex, xaxis, cross_vectors(zaxis, xaxis))
+
+        if length_vector(subtract_vectors(first, last)) < 1e-6 * r1 + 1e-12:
+            sweep = 2 * math.pi
+        else:
+            local = frame.to_local_coordinates(Point(*last))
+            sweep = math.atan2(local[1], local[0]) % (2 * math.pi)
+        return cls(frame, angle, r1 / math.sin(angle), r2 / math.sin(angle), sweep)
+
+    @classmethod
+    def from_cone_data(cls, data):
+        """Construct a range from the data of a :class:`compas.geometry.Cone`, its lateral surface.
+
+        Parameters
+        ----------
+        data : dict
+
+        Returns
+        -------
+        :class:`ConnectorRange`
+        """
+        plane, radius, height = data['circle']['plane'], data['circle']['radius'], data['height']
+        normal = normalize_vector(plane['normal'])
+        apex = add_vectors(plane['point'], scale_vector(normal, height))
+        frame = Frame.from_plane(Plane(apex, scale_vector(normal, -1)))
+        return cls(frame, math.atan2(radius, height), 0., math.hypot(radius, height))
+
+    def copy(self):
+        return ConnectorRange(self.frame.copy(), self.angle, self.start, self.end, self.sweep)
+
+    def transform(self, transformation):
+        """Transform the range with a rigid transformation."""
+        self.frame.transform(transformation)
+
+    def transformed(self, transformation):
+        connector_range = self.copy()
+        connector_range.transform(transformation)
+        return connector_range
+
+    def point_at(self, distance, rotation):
+        """Return the point at a distance from the apex along the generator at an angle around the axis."""
+        radial = distance * math.sin(self.angle)
+        local = [radial * math.cos(rotation), radial * math.sin(rotation), distance * math.cos(self.angle)]
+        return self.frame.to_world_coordinates(Point(*local))
+
+    def _parameters(self, local):
+        # distance along the generator, angle around the axis and distance to the cone of a local point
+        radial = math.hypot(local[0], local[1])
+        rotation = math.atan2(local[1], local[0]) % (2 * math.pi)
+        sin, cos = math.sin(self.angle), math.cos(self.angle)
+        distance = radial * sin + local[2] * cos
+        return distance, rotation, abs(radial * cos - local[2] * sin)
+
+    def _within(self, distance, rotation, tolerance):
+        if distance < self.start - tolerance or distance > self.end + tolerance:
+            return False
+        if self.sweep >= 2 * math.pi:
+            return True
+        return rotation <= self.sweep + tolerance or rotation >= 2 * math.pi - tolerance
+
+    def contains(self, point, tolerance=1e-3):
+        """Check if a point lies on the range.
+
+        Parameters
+        ----------
+        point : :class:`compas.geometry.Point`
+        tolerance : float, optional
+            The maximum distance to the cone.
+
+        Returns
+        -------
+        bool
+        """
+        distance, rotation, offset = self._parameters(self.frame.to_local_coordinates(Point(*point)))
+        return offset <= tolerance and self._within(distance, rotation, tolerance)
+
+    def intersection_line(self, line, segment=True):
+        """Compute the intersections of a line with the range.
+
+        Parameters
+        ----------
+        line : :class:`compas.geometry.Line`
+        segment : bool, optional
+            Only return intersections between the end points of the line.
+
+        Returns
+        -------
+        list of :class:`compas.geometry.Point`
+            The intersections in the order of the line.
+        """
+        a = self.frame.to_local_coordinates(Point(*line[0]))
+        b = self.frame.to_local_coordinates(Point(*line[1]))
+        d = subtract_vectors(b, a)
+        sin, cos = math.sin(self.angle), math.cos(self.angle)
+
+        if cos < 1e-12:
+            # an annular sector in the xy-plane
+            ts = [-a[2] / d[2]] if abs(d[2]) > 1e-12 else []
+        else:
+            # x^2 + y^2 = (z tan(angle))^2, the positive nappe is selected by distance below
+            k = (sin / cos) ** 2
+            qa = d[0] ** 2 + d[1] ** 2 - k * d[2] ** 2
+            qb = 2 * (a[0] * d[0] + a[1] * d[1] - k * a[2] * d[2])
+            qc = a[0] ** 2 + a[1] ** 2 - k * a[2] ** 2
+            if abs(qa) < 1e-12:
+                ts = [-qc / qb] if abs(qb) > 1e-12 else []
+            else:
+                discriminant = qb ** 2 - 4 * qa * qc
+                if discriminant < 0:
+                    return []
+                root = math.sqrt(discriminant)
+                ts = sorted([(-qb - root) / (2 * qa), (-qb + root) / (2 * qa)])
+
+        points = []
+        for t in ts:
+            if segment and not -1e-9 <= t <= 1 + 1e-9:
+                continue
+            local = add_vectors(a, scale_vector(d, t))
+            distance, rotation, _ = self._parameters(local)
+            if local[2] * cos >= -1e-12 and self._within(distance, rotation, 1e-9):
+                points.append(self.frame.to_world_coordinates(Point(*local)))
+        return points
+
+    def nurbs_data(self):
+        """Return the data of the range as rational quadratic NURBS surface.
+
+        Returns
+        -------
+        dict
+            The data in the format of :class:`compas.geometry.NurbsSurface`.
+        """
+        spans = max(1, int(math.ceil(self.sweep / (math.pi / 2) - 1e-9)))
+        delta = self.sweep / spans
+        points, weights = [], []
+        for i in range(2 * spans + 1):
+            rotation = i * delta / 2
+            weight = 1.0 if i % 2 == 0 else math.cos(delta / 2)
+            # the middle control points are at the corners of the tangent polygon
+            scale = 1.0 / weight
+            row = []
+            for distance in (self.end, self.start):
+                radial = distance * math.sin(self.angle) * scale
+                local = [radial * math.cos(rotation), radial * math.sin(rotation), distance * math.cos(self.angle)]
+                row.append(list(self.frame.to_world_coordinates(Point(*local))))
+            points.append(row)
+            weights.append([weight, weight])
+
+        arc = delta * self.end * math.sin(self.angle)
+        return {
+            'points': points,
+            'weights': weights,
+            'u_knots': [i * arc for i in range(spans + 1)],
+            'v_knots': [0.0, self.end - self.start],
+            'u_mults': [3] + [2] * (spans - 1) + [3],
+            'v_mults': [2, 2],
+            'u_degree': 2,
+            'v_degree': 1,
+            'is_u_periodic': False,
+            'is_v_periodic': False,
+        }
+
+    def to_nurbs(self):
+        """Return the range as NURBS surface, for drawing.
+
+        This requires a NURBS backend, e.g. Rhino.
+
+        Returns
+        -------
+        :class:`compas.geometry.NurbsSurface`
+        """
+        from compas.geometry import NurbsSurface
+        return NurbsSurface.from_data(self.nurbs_data())
@@ -7,23 +7,148 @@ import math
 
 from compas.datastructures import Mesh
 from compas.datastructures import mesh_transform
+from compas.datastructures import mesh_transformed
 
 from compas.geometry import Frame, Vector, Line, Point
 from compas.geometry import Box
+from compas.geometry import Capsule, Circle, Cylinder, Plane
 from compas.geometry import Transformation, Translation, Rotation
 from compas.geometry import cross_vectors
 from compas.geometry import normalize_vector
+from compas.geometry import transform_points
+from compas.geometry import transform_vectors
 from compas.geometry import centroid_polyhedron
 from compas.geometry import volume_polyhedron
-from compas_rhino.geometry import RhinoNurbsSurface
 from compas.datastructures import Mesh, mesh_transform
 
 
+from .collision import COLLISION_LEVELS
+from .collision import box_hull
+from .collision import capsule_mesh
+from .collision import prism_hull
+from .connector_range import ConnectorRange
 from .utilities import _deserialize_from_data
 from .utilities import _serialize_to_data
 
 
-__all__ = ['Element']
+__all__ = ['Element', 'ElementOption']
+
+
+# the geometry of rods in their local frame, by parameters
+_ROD_GEOMETRY = {}
+
+ROD_PARAMETERS = ('rod_length', 'rod_radius', 'rf_unit_radius', 'rf_unit_offset', 'connector_angle')
+
+
+def _rod_geometry(rod):
+    key = tuple(rod[name] for name in ROD_PARAMETERS)
+    if key not in _ROD_GEOMETRY:
+        length, radius, rf_unit_radius, rf_unit_offset, angle = key
+        connector_frame_1 = Frame([rf_unit_offset, -rf_unit_radius / 2., 0], [1, 0, 0], [0, 1, 0])
+        connector_frame_2 = Frame([-rf_unit_offset, rf_unit_radius / 2., 0], [-1, 0, 0], [0, -1, 0])
+        geometry = {'line': Line([-length / 2., 0, 0], [length / 2., 0, 0])}
+        for i, connector_frame in enumerate((connector_frame_1, connector_frame_2), 1):
+            connector_frame.transform(Rotation.from_axis_and_angle(connector_frame.yaxis, math.radians(angle), connector_frame.point))
+            joint_direction = connector_frame.yaxis.transformed(Rotation.from_axis_and_angle(connector_frame.zaxis, math.radians(60)))
+            geometry['connector_frame_%d' % i] = connector_frame
+            geometry['joint_frame_%d' % i] = connector_frame.transformed(Translation.from_vector(joint_direction * rf_unit_radius))
+        cylinder = Cylinder(Circle(Plane.from_frame(Frame.worldYZ()), radius), length)
+        geometry['source'] = cylinder
+        geometry['mesh'] = Mesh.from_shape(cylinder)
+        _ROD_GEOMETRY[key] = geometry
+    return _ROD_GEOMETRY[key]
+
+
+# the geometry which is transformed when it is read, see Element.transform
+_DEFERRED = ('_tool_frame', '_connector_frame_1', '_connector_frame_2', '_connector_range_1', '_connector_range_2',
+             '_line', '_joint_frame_1', '_joint_frame_2', '_base_frame', '_RCF', '_source', '_mesh', '_path')
+
+
+def _face_frame(mesh, fkey):
+    xyz = mesh.face_coordinates(fkey)
+    o = mesh.face_center(fkey)
+    w = mesh.face_normal(fkey)
+    u = [xyz[1][i] - xyz[0][i] for i in range(3)]  # align with longest edge instead?
+    v = cross_vectors(w, u)
+    uvw = normalize_vector(u), normalize_vector(v), normalize_vector(w)
+    return o, uvw
+
+
+def _polyhedron(mesh):
+    vertices = [mesh.vertex_coordinates(key) for key in mesh.vertices()]
+    faces = [mesh.face_vertices(fkey) for fkey in mesh.faces()]
+    return vertices, faces
+
+
+def _top(mesh):
+    fkey_centroid = {fkey: mesh.face_center(fkey) for fkey in mesh.faces()}
+    fkey, _ = sorted(fkey_centroid.items(), key=lambda x: x[1][2])[-1]
+    return fkey
+
+
+_PROPERTIES = {
+    'centroid': lambda mesh: mesh.centroid(),
+    'center': lambda mesh: centroid_polyhedron(_polyhedron(mesh)),
+    'volume': lambda mesh: volume_polyhedron(_polyhedron(mesh)),
+    'top': _top,
+    'face_frames': lambda mesh: {fkey: _face_frame(mesh, fkey) for fkey in mesh.faces()},
+}
+
+
+def _transformed_properties(properties, transformation):
+    # centers follow any affine transformation and the volume scales with the determinant,
+    # face frames follow rotations and the top face stays on top if the heights keep their order
+    if not properties:
+        return properties
+    m = transformation.matrix
+    det = (m[0][0] * (m[1][1] * m[2][2] - m[1][2] * m[2][1]) -
+           m[0][1] * (m[1][0] * m[2][2] - m[1][2] * m[2][0]) +
+           m[0][2] * (m[1][0] * m[2][1] - m[1][1] * m[2][0]))
+    rotation = all(abs(sum(m[k][i] * m[k][j] for k in range(3)) - (i == j)) < 1e-9 for i in range(3) for j in range(3)) and det > 0
+    result = {}
+    for name in ('centroid', 'center'):
+        if name in properties:
+            result[name] = transform_points([properties[name]], transformation)[0]
+    if 'volume' in properties and det > 0:
+        result['volume'] = properties['volume'] * det
+    if 'top' in properties and abs(m[2][0]) < 1e-12 and abs(m[2][1]) < 1e-12 and m[2][2] > 0:
+        result['top'] = properties['top']
+    if 'face_frames' in properties and rotation:
+        frames = properties['face_frames']
+        fkeys = list(frames)
+        points = transform_points([frames[fkey][0] for fkey in fkeys], transformation)
+        vectors = transform_vectors([vector for fkey in fkeys for vector in frames[fkey][1]], transformation)
+        result['face_frames'] = {fkey: (points[i], tuple(vectors[3 * i:3 * i + 3])) for i, fkey in enumerate(fkeys)}
+    return result
+
+
+def _rod_attribute(name, doc):
+    # an attribute of a parametric rod which is derived from its frame and cached until the frame changes,
+    # unless it is set, then the set value belongs to the element and is transformed with it
+    def getter(self):
+        self._sync('_' + name)
+        value = getattr(self, '_' + name)
+        if value is None and self.rod is not None:
+            return self._rod_value(name)
+        return value
+
+    def setter(self, value):
+        setattr(self, '_' + name, value)
+        self._mark('_' + name)
+
+    return property(getter, setter, doc=doc)
+
+
+def _coordinates(geometry):
+    if isinstance(geometry, Line):
+        return list(geometry.start) + list(geometry.end)
+    return list(geometry.point) + list(geometry.xaxis) + list(geometry.yaxis)
+
+
+def _connector_range(connector_range):
+    if connector_range is None or isinstance(connector_range, ConnectorRange):
+        return connector_range
+    return ConnectorRange.from_data(connector_range.to_data())
 
 
 class Element(object):
@@ -46,22 +171,34 @@ class Element(object):
     trajectory : :class:`compas_fab.robots.JointTrajectory`
         The robot trajectory in joint space.
 
+    trajectory_store : :class:`TrajectoryStore`
+        The store the trajectory is loaded from, if it is not kept in the element data.
+
     path : :list: :class:`compas.geometry.Frame`
         The robot tool path in cartesian space.
 
+    rod : dict
+        The parameters of a parametric rod, see :meth:`from_rod`, or ``None``.
+
     Examples
     --------
-    >>> from compas.datastructures import Mesh
     >>> from compas.geometry import Box
-    >>> element = Element.from_box(Box(Frame.worldXY(), ))
-
+    >>> element = Element.from_box(Box(Frame.worldXY(), 1, 2, 3))
+    >>> element.mesh.number_of_faces()
+    6
     """
 
     def __init__(self, frame):
         super(Element, self).__init__()
 
+        self._transformations = []
+        self._synced = {}
+        self._properties = {}
+
         self.message = "dynamic_cylinder"
         self.type = "object"
+        self.rod = None
+        self._rod_cache = None
         self.connector_frame_1 = None
         self.connector_frame_2 = None
         self.connector_range_1 = None
@@ -81,9 +218,41 @@ class Element(object):
         self._mesh = None
 
         self.RCF = None
-        self.trajectory = None
+        self._trajectory = None
+        self._trajectory_refs = []
+        self.trajectory_store = None
         self.path = []
 
+    @classmethod
+    def from_rod(cls, frame, globals, connector_angle=0.):
+        """Construct a parametric rod.
+
+        The axis, the connector, joint frames, the mesh and the source cylinder
+        of the rod are derived from its frame and parameters when they are read
+        and cached until the frame changes. Assigned values replace them, are
+        transformed with the element and are only written to the data if they
+        differ from the derived ones.
+
+        Parameters
+        ----------
+        frame : :class:`Frame`
+            The frame of the rod, at its center with the x-axis along the rod.
+        globals : dict
+            The parameters of the assembly, ``rod_length``, ``rod_radius``,
+            ``rf_unit_radius`` and ``rf_unit_offset``, e.g. ``assembly.globals``.
+        connector_angle : float, optional
+            The angle of the connectors to the axis in degrees.
+
+        Returns
+        -------
+        :class:`Element`
+            New instance of element.
+        """
+        element = cls(frame)
+        element.rod = dict((name, globals[name]) for name in ROD_PARAMETERS[:-1])
+        element.rod['connector_angle'] = connector_angle
+        return element
+
     @classmethod
     def from_mesh(cls, mesh, frame):
         """Construct an element from a mesh.
@@ -203,10 +372,24 @@ class Element(object):
         element._mesh = element._source.mesh.to_compas()
         return element
 
+    @property
+    def source(self):
+        """Source geometry of the element, e.g. a :class:`compas.geometry.Box`.
+
+        The cylinder of a parametric rod is derived from its frame like its mesh.
+        """
+        self._sync('_source')
+        if self._source is None and self.rod is not None:
+            return self._rod_value('source')
+        return self._source
+
     @property
     def mesh(self):
         """Mesh of the element."""
+        self._sync('_source', '_mesh')
         if not self._source:
+            if self.rod is not None:
+                return self._rod_value('mesh')
             return None
 
         if self._mesh:
@@ -222,6 +405,9 @@ class Element(object):
     @mesh.setter
     def mesh(self, mesh):
         self._source = self._mesh = mesh
+        self._mark('_source')
+        self._mark('_mesh')
+        self._properties = {}
 
     @property
     def frame(self):
@@ -231,10 +417,108 @@ class Element(object):
     @frame.setter
     def frame(self, frame):
         self._frame = frame.copy()
+        # the derived geometry of a rod follows its frame
+        self._rod_cache = None
+        self._properties = {}
+
+    line = _rod_attribute('line', """:class:`compas.geometry.Line` : The axis of the element.""")
+    connector_frame_1 = _rod_attribute('connector_frame_1', """:class:`compas.geometry.Frame` : The frame of the first connector.""")
+    connector_frame_2 = _rod_attribute('connector_frame_2', """:class:`compas.geometry.Frame` : The frame of the second connector.""")
+    joint_frame_1 = _rod_attribute('joint_frame_1', """:class:`compas.geometry.Frame` : The frame of the first joint.""")
+    joint_frame_2 = _rod_attribute('joint_frame_2', """:class:`compas.geometry.Frame` : The frame of the second joint.""")
+
+    def _rod_derived(self, name):
+        return _rod_geometry(self.rod)[name].transformed(Transformation.from_frame(self.frame))
+
+    def _is_rod_derived(self, name):
+        # an attribute of a rod which still equals the one derived from its frame
+        if self.rod is None:
+            return False
+        return all(abs(a - b) < 1e-9 for a, b in zip(_coordinates(getattr(self, '_' + name)), _coordinates(self._rod_derived(name))))
+
+    def _rod_value(self, name):
+        # the derived geometry is cached until the frame or the parameters change
+        key = tuple(self.frame.point) + tuple(self.frame.xaxis) + tuple(self.frame.yaxis) + tuple(self.rod[p] for p in ROD_PARAMETERS)
+        if self._rod_cache is None or self._rod_cache[0] != key:
+            self._rod_cache = key, Transformation.from_frame(self.frame), {}
+        _, transformation, values = self._rod_cache
+        if name not in values:
+            local = _rod_geometry(self.rod)[name]
+            values[name] = mesh_transformed(local, transformation) if name == 'mesh' else local.transformed(transformation)
+        return values[name]
+
+    @property
+    def connector_range_1(self):
+        """:class:`ConnectorRange` : The range of the first connector.
+
+        A NURBS surface or a cone assigned to it is converted to a :class:`ConnectorRange`.
+        """
+        self._sync('_connector_range_1')
+        return self._connector_range_1
+
+    @connector_range_1.setter
+    def connector_range_1(self, connector_range):
+        self._connector_range_1 = _connector_range(connector_range)
+        self._mark('_connector_range_1')
+
+    @property
+    def connector_range_2(self):
+        """:class:`ConnectorRange` : The range of the second connector."""
+        self._sync('_connector_range_2')
+        return self._connector_range_2
+
+    @connector_range_2.setter
+    def connector_range_2(self, connector_range):
+        self._connector_range_2 = _connector_range(connector_range)
+        self._mark('_connector_range_2')
+
+    @property
+    def trajectory(self):
+        """Trajectories of the element.
+
+        If the element only references trajectories in a :class:`TrajectoryStore`,
+        they are loaded on first access. Accessing them without a store raises
+        a ``ValueError``.
+        """
+        if self._trajectory is None and self._trajectory_refs:
+            if not self.trajectory_store:
+                raise ValueError('The trajectories %s are in a trajectory store, but no store is attached.' % ', '.join(self._trajectory_refs))
+            self._trajectory = [self.trajectory_store.load(ref) for ref in self._trajectory_refs]
+        return self._trajectory
+
+    @trajectory.setter
+    def trajectory(self, trajectory):
+        self._trajectory = trajectory
+        self._trajectory_refs = []
+
+    @property
+    def trajectory_refs(self):
+        """list : The names of the trajectories of the element in its trajectory store."""
+        return list(self._trajectory_refs)
+
+    def store_trajectory(self, store, name):
+        """Move the trajectories of the element to a trajectory store.
+
+        The element keeps only references to the stored trajectories in its data.
+        Assigning a new trajectory afterwards replaces the references.
+
+        Parameters
+        ----------
+        store : :class:`TrajectoryStore`
+            The store to write to.
+        name : str
+            The prefix of the names of the stored trajectories, e.g. the element key.
+        """
+        trajectory = self.trajectory
+        if not trajectory:
+            return
+        self._trajectory_refs = [store.save('%s_%d' % (name, i), t) for i, t in enumerate(trajectory)]
+        self.trajectory_store = store
 
     @property
     def tool_frame(self):
         """tool frame of the element"""
+        self._sync('_tool_frame')
         if not self._tool_frame:
             self._tool_frame = self.frame.copy()
 
@@ -243,6 +527,7 @@ class Element(object):
     @tool_frame.setter
     def tool_frame(self, frame):
         self._tool_frame = frame.copy()
+        self._mark('_tool_frame')
 
     @property
     def tool_frame_pose_quaternion(self):
@@ -253,9 +538,37 @@ class Element(object):
     def tool_frame_pose_quaternion(self, pose_quaternion):
         self.tool_frame = Frame.from_quaternion(pose_quaternion[3:], point=pose_quaternion[:3])
 
+    @property
+    def RCF(self):
+        """:class:`compas.geometry.Frame` : The frame of the robot."""
+        self._sync('_RCF')
+        return self._RCF
+
+    @RCF.setter
+    def RCF(self, frame):
+        self._RCF = frame
+        self._mark('_RCF')
+
+    @property
+    def path(self):
+        """list of :class:`compas.geometry.Frame` : The robot tool path in cartesian space."""
+        self._sync('_path')
+        return self._path
+
+    @path.setter
+    def path(self, path):
+        self._path = path
+        self._mark('_path')
+
+    def _property(self, name):
+        # computed once, then kept up to date by transform, see _transformed_properties
+        if name not in self._properties:
+            self._properties[name] = _PROPERTIES[name](self.mesh)
+        return self._properties[name]
+
     @property
     def centroid(self):
-        return self._mesh.centroid()
+        return self._property('centroid')
 
     @property
     def face_frames(self):
@@ -266,7 +579,7 @@ class Element(object):
         dict
             A dictionary mapping face identifiers to face frames.
         """
-        return {fkey: self.face_frame(fkey) for fkey in self._mesh.faces()}
+        return dict(self._property('face_frames'))
 
     def face_frame(self, fkey):
         """Compute the frame of a specific face.
@@ -281,13 +594,9 @@ class Element(object):
         frame
             The frame of the specified face.
         """
-        xyz = self._mesh.face_coordinates(fkey)
-        o = self._mesh.face_center(fkey)
-        w = self._mesh.face_normal(fkey)
-        u = [xyz[1][i] - xyz[0][i] for i in range(3)]  # align with longest edge instead?
-        v = cross_vectors(w, u)
-        uvw = normalize_vector(u), normalize_vector(v), normalize_vector(w)
-        return o, uvw
+        if 'face_frames' in self._properties:
+            return self._properties['face_frames'][fkey]
+        return _face_frame(self.mesh, fkey)
 
     @property
     def top(self):
@@ -302,9 +611,7 @@ class Element(object):
         -----
         The face with the highest centroid is considered the *top* face.
         """
-        fkey_centroid = {fkey: self._mesh.face_center(fkey) for fkey in self._mesh.faces()}
-        fkey, _ = sorted(fkey_centroid.items(), key=lambda x: x[1][2])[-1]
-        return fkey
+        return self._property('top')
 
     @property
     def center(self):
@@ -315,23 +622,62 @@ class Element(object):
         point
             The center of mass of the element.
         """
-        vertices = [self._mesh.vertex_coordinates(key) for key in self._mesh.vertices()]
-        faces = [self._mesh.face_vertices(fkey) for fkey in self._mesh.faces()]
-        return centroid_polyhedron((vertices, faces))
+        return self._property('center')
 
     @property
     def volume(self):
         """Compute the volume of the element.
 
+        The volume, the centers and the face frames are computed once and
+        transformed with the element, until its mesh or frame is replaced.
+
         Returns
         -------
         float
             The volume of the element.
         """
-        vertices = [self._mesh.vertex_coordinates(key) for key in self._mesh.vertices()]
-        faces = [self._mesh.face_vertices(fkey) for fkey in self._mesh.faces()]
-        v = volume_polyhedron((vertices, faces))
-        return v
+        return self._property('volume')
+
+    @property
+    def capsule(self):
+        """:class:`compas.geometry.Capsule` : The axis of the element with its radius, ``None`` without an axis.
+
+        The capsule contains a rod and is the cheapest collision geometry, see :meth:`collision_mesh`.
+        """
+        if self.line is None:
+            return None
+        return Capsule(self.line, self._diameter() / 2.)
+
+    @property
+    def hull(self):
+        """:class:`compas.datastructures.Mesh` : A coarse mesh containing the element.
+
+        A hexagonal prism around the axis of a rod, the bounding box in the frame of other elements.
+        """
+        if self.line is not None:
+            return prism_hull(self.line, self._diameter() / 2.)
+        return box_hull(self.mesh, self.frame)
+
+    def collision_mesh(self, level='mesh'):
+        """Return the collision geometry of the element at a level of detail.
+
+        Parameters
+        ----------
+        level : str, optional
+            ``'capsule'``, ``'hull'`` or ``'mesh'``, see :attr:`COLLISION_LEVELS`.
+            Elements without an axis use their hull for ``'capsule'``.
+
+        Returns
+        -------
+        :class:`compas.datastructures.Mesh`
+        """
+        if level not in COLLISION_LEVELS:
+            raise ValueError('Unknown collision level %s, use one of %s.' % (level, ', '.join(COLLISION_LEVELS)))
+        if level == 'mesh':
+            return self.mesh
+        if level == 'capsule' and self.line is not None:
+            return capsule_mesh(self.capsule)
+        return self.hull
 
     @classmethod
     def from_data(cls, data):
@@ -363,8 +709,10 @@ class Element(object):
         Examples
         --------
         >>> element = Element(Frame.worldXY())
-        >>> print(element.data)
+        >>> sorted(element.data)
+        ['connector_1_state', 'connector_2_state', 'frame']
         """
+        self._sync(*_DEFERRED)
         d = dict(frame=self.frame.to_data())
 
         # Only include gripping plane if attribute is really set
@@ -379,17 +727,19 @@ class Element(object):
             #d['_mesh'] = _serialize_to_data(self._mesh)
             d['_mesh'] = self._mesh.to_data()
 
-        if self.trajectory:
+        if self._trajectory_refs:
+            d['trajectory_refs'] = list(self._trajectory_refs)
+        elif self.trajectory:
             d['trajectory'] = [f.to_data() for f in self.trajectory]
 
         if self.path:
             d['path'] = [f.to_data() for f in self.path]
 
-        if self.connector_frame_1:
-            d['connector_frame_1'] = self.connector_frame_1.to_data()
+        if self._connector_frame_1 and not self._is_rod_derived('connector_frame_1'):
+            d['connector_frame_1'] = self._connector_frame_1.to_data()
 
-        if self.connector_frame_2:
-            d['connector_frame_2'] = self.connector_frame_2.to_data()
+        if self._connector_frame_2 and not self._is_rod_derived('connector_frame_2'):
+            d['connector_frame_2'] = self._connector_frame_2.to_data()
 
         if self.connector_range_1:
             d['connector_range_1'] = self.connector_range_1.to_data()
@@ -401,14 +751,17 @@ class Element(object):
 
         d['connector_2_state'] = self.connector_2_state
 
-        if self.line:
-            d['line'] = self.line.to_data()
+        if self._line and not self._is_rod_derived('line'):
+            d['line'] = self._line.to_data()
+
+        if self._joint_frame_1 and not self._is_rod_derived('joint_frame_1'):
+            d['joint_frame_1'] = self._joint_frame_1.to_data()
 
-        if self.joint_frame_1:
-            d['joint_frame_1'] = self.joint_frame_1.to_data()
+        if self._joint_frame_2 and not self._is_rod_derived('joint_frame_2'):
+            d['joint_frame_2'] = self._joint_frame_2.to_data()
 
-        if self.joint_frame_2:
-            d['joint_frame_2'] = self.joint_frame_2.to_data()
+        if self.rod is not None:
+            d['rod'] = dict(self.rod)
 
         if self._type:
             d['_type'] = self._type
@@ -423,6 +776,7 @@ class Element(object):
 
     @data.setter
     def data(self, data):
+        self._sync(*_DEFERRED)
         self.frame = Frame.from_data(data['frame'])
         if '_tool_frame' in data:
             self.tool_frame = Frame.from_data(data['_tool_frame'])
@@ -435,6 +789,9 @@ class Element(object):
             from compas_fab.robots import JointTrajectory
             self.trajectory = [JointTrajectory.from_data(d) for d in data['trajectory']]
             #self.trajectory = _deserialize_from_data(data['trajectory'])
+        if 'trajectory_refs' in data:
+            self._trajectory = None
+            self._trajectory_refs = list(data['trajectory_refs'])
         if 'path' in data:
             self.path = [Frame.from_data(d) for d in data['path']]
         if 'connector_frame_1' in data:
@@ -442,9 +799,9 @@ class Element(object):
         if 'connector_frame_2' in data:
             self.connector_frame_2 = Frame.from_data(data['connector_frame_2'])
         if 'connector_range_1' in data:
-            self.connector_range_1 = RhinoNurbsSurface.from_data(data['connector_range_1'])
+            self.connector_range_1 = ConnectorRange.from_data(data['connector_range_1'])
         if 'connector_range_2' in data:
-            self.connector_range_2 = RhinoNurbsSurface.from_data(data['connector_range_2'])
+            self.connector_range_2 = ConnectorRange.from_data(data['connector_range_2'])
         if 'connector_1_state' in data:
             self.connector_1_state = data['connector_1_state']
         if 'connector_2_state' in data:
@@ -455,12 +812,15 @@ class Element(object):
             self.joint_frame_1 = Frame.from_data(data['joint_frame_1'])
         if 'joint_frame_2' in data:
             self.joint_frame_2 = Frame.from_data(data['joint_frame_2'])
+        if 'rod' in data:
+            self.rod = dict(data['rod'])
         if '_type' in data:
             self._type = data['_type']
         if '_base_frame' in data:
             self._base_frame = Frame.from_data(data['_base_frame'])
         if 'RCF' in data:
             self.RCF = Frame.from_data(data['RCF'])
+        self._properties = {}
 
     def to_data(self):
         """Returns the data dictionary that represents the element.
@@ -474,7 +834,7 @@ class Element(object):
         --------
         >>> from compas.geometry import Frame
         >>> e1 = Element(Frame.worldXY())
-        >>> e2 = Element.from_data(element.to_data())
+        >>> e2 = Element.from_data(e1.to_data())
         >>> e2.frame == Frame.worldXY()
         True
         """
@@ -483,6 +843,10 @@ class Element(object):
     def transform(self, transformation):
         """Transforms the element.
 
+        The frame is transformed right away. The transformation of the other
+        geometry, e.g. the mesh, is deferred until it is read, then the
+        transformations since the last read are applied as one.
+
         Parameters
         ----------
         transformation : :class:`Transformation`
@@ -499,35 +863,46 @@ class Element(object):
         >>> element.transform(Translation.from_vector([1, 0, 0]))
         """
         self.frame.transform(transformation)
-        if self._tool_frame:
-            self.tool_frame.transform(transformation)
-        if self.connector_frame_1:
-            self.connector_frame_1.transform(transformation)
-        if self.connector_frame_2:
-            self.connector_frame_2.transform(transformation)
-        if self.connector_range_1:
-            self.connector_range_1.transform(transformation)
-        if self.connector_range_2:
-            self.connector_range_2.transform(transformation)
-        if self.line:
-            self.line.transform(transformation)
-        if self.joint_frame_1:
-            self.joint_frame_1.transform(transformation)
-        if self.joint_frame_2:
-            self.joint_frame_2.transform(transformation)
-        if self._base_frame:
-            self._base_frame.transform(transformation)
-        if self.RCF:
-            self.RCF.transform(transformation)
-        if self._source:
-            if type(self._source) == Mesh:
-                mesh_transform(self._source, transformation)  # it would be really good to have Mesh.transform()
+        self._transformations.append(transformation)
+        self._properties = _transformed_properties(self._properties, transformation)
+
+    def _mark(self, name):
+        # a value assigned after a transformation is already transformed
+        if self._transformations:
+            self._synced[name] = len(self._transformations)
+
+    def _sync(self, *names):
+        # applies the transformations since the last read to the geometry
+        count = len(self._transformations)
+        if not count:
+            return
+        for name in names:
+            start = self._synced.get(name, 0)
+            if start == count:
+                continue
+            self._synced[name] = count
+            value = getattr(self, name)
+            if not value:
+                continue
+            transformation = self._transformations[start]
+            for other in self._transformations[start + 1:]:
+                transformation = other * transformation
+            if name == '_path':
+                for frame in value:
+                    frame.transform(transformation)
+            elif name in ('_source', '_mesh'):
+                # a mesh which is also the source is transformed once
+                if self._mesh is self._source:
+                    self._synced['_source'] = self._synced['_mesh'] = count
+                if type(value) == Mesh or name == '_mesh':
+                    mesh_transform(value, transformation)  # it would be really good to have Mesh.transform()
+                else:
+                    value.transform(transformation)
             else:
-                self._source.transform(transformation)
-        if self._mesh:
-            mesh_transform(self._mesh, transformation)  # it would be really good to have Mesh.transform()
-        if self.path:
-            [f.transform(transformation) for f in self.path]
+                value.transform(transformation)
+        if all(self._synced.get(name, 0) == count for name in _DEFERRED):
+            self._transformations = []
+            self._synced = {}
 
     def transformed(self, transformation):
         """Returns a transformed copy of this element.
@@ -559,38 +934,25 @@ class Element(object):
         Element
         """
         elem = Element(self.frame.copy())
-        if self._tool_frame:
-            elem.tool_frame = self.tool_frame.copy()
-        if self.connector_frame_1:
-            elem.connector_frame_1 = self.connector_frame_1.copy()
-        if self.connector_frame_2:
-            elem.connector_frame_2 = self.connector_frame_2.copy()
-        if self.connector_range_1:
-            elem.connector_range_1 = self.connector_range_1.copy()
-        if self.connector_range_2:
-            elem.connector_range_2 = self.connector_range_2.copy()
+        # the geometry is copied as it is, with the transformations which are not applied yet
+        for name in _DEFERRED:
+            value = getattr(self, name)
+            if value and name != '_mesh':
+                setattr(elem, name, [f.copy() for f in value] if name == '_path' else value.copy())
+        if self._mesh:
+            elem._mesh = elem._source if self._mesh is self._source else self._mesh.copy()
+        elem._transformations = list(self._transformations)
+        elem._synced = dict(self._synced)
+        elem._properties = dict(self._properties)
+
         if self.connector_1_state:
             elem.connector_1_state = self.connector_1_state
         if self.connector_2_state:
             elem.connector_2_state = self.connector_2_state
-        if self.line:
-            elem.line = self.line.copy()
-        if self.joint_frame_1:
-            elem.joint_frame_1 = self.joint_frame_1.copy()
-        if self.joint_frame_2:
-            elem.joint_frame_2 = self.joint_frame_2.copy()
+        if self.rod is not None:
+            elem.rod = dict(self.rod)
         if self._type:
             elem._type = self._type
-        if self._base_frame:
-            elem._base_frame = self._base_frame.copy()
-        if self.RCF:
-            elem.RCF = self.RCF.copy()
-        if self._source:
-            elem._source = self._source.copy()
-        if self._mesh:
-            elem._mesh = self._mesh.copy()
-        if self.path:
-            elem.path = [f.copy() for f in self.path]
 
         return elem
 
@@ -643,6 +1005,13 @@ class Element(object):
             return []
 
     def current_option_elements(self, assembly, flip, angle, shift_value):
+        """Compute the two options to place the elements of a new unit at the open connector.
+
+        Returns
+        -------
+        list of :class:`ElementOption`
+            The options, use :meth:`ElementOption.to_element` to place one of them.
+        """
 
         radius = assembly.globals['rod_radius']
         length = assembly.globals['rod_length']
@@ -653,6 +1022,7 @@ class Element(object):
         #length = self._source.height
 
         current_connector_frame = None
+        c = 0
 
         if self.connector_1_state == True:
             current_connector_frame = self.connector_frame_1
@@ -675,20 +1045,18 @@ class Element(object):
         if current_connector_frame != None:
             R1 = Rotation.from_axis_and_angle(current_connector_frame.zaxis, math.radians(120), current_connector_frame.point)
             R2 = Rotation.from_axis_and_angle(current_connector_frame.zaxis, math.radians(240), current_connector_frame.point)
-            e1 = self.transformed(R1)
-            e2 = self.transformed(R2)
 
             # T_point = Translation.from_vector(self.frame.xaxis)
             # new_point = self.frame.point.transformed(T_point)
             R3 = Rotation.from_axis_and_angle(self.frame.xaxis, math.radians(angle),self.frame.point)
 
-            T1 = Translation.from_vector(-e1.frame.xaxis*a*((length-rf_unit_radius+rf_unit_offset)/2.))
-            T2 = Translation.from_vector(-e2.frame.xaxis*b*((length-rf_unit_radius+rf_unit_offset)/2.))
+            T1 = Translation.from_vector(-self.frame.xaxis.transformed(R1)*a*((length-rf_unit_radius+rf_unit_offset)/2.))
+            T2 = Translation.from_vector(-self.frame.xaxis.transformed(R2)*b*((length-rf_unit_radius+rf_unit_offset)/2.))
 
             T3 = Translation.from_vector(self.frame.xaxis * shift_value)
 
-            e1.transform(R3*T1*T3)
-            e2.transform(R3*T2*T3)
+            e1 = ElementOption(self, R3*T1*T3*R1)
+            e2 = ElementOption(self, R3*T2*T3*R2)
 
             option_elements.append(e1)
             option_elements.append(e2)
@@ -718,6 +1086,12 @@ class Element(object):
 
         return option_elements
 
+    def _diameter(self):
+        self._sync('_source')
+        if self._source is None and self.rod is not None:
+            return self.rod['rod_radius'] * 2.
+        return self._source.diameter
+
     def current_option_vectors(self, len):
 
         vector_vertical_offset = 0.01
@@ -725,13 +1099,13 @@ class Element(object):
         current_option_vectors = []
         if self.connector_1_state == True:
             p = self.connector_frame_1.point + Vector.Zaxis()*vector_vertical_offset
-            T1 = Translation.from_vector(self.frame.xaxis*self._source.diameter/2.*1)
+            T1 = Translation.from_vector(self.frame.xaxis*self._diameter()/2.*1)
             T2 = Translation.from_vector(self.frame.xaxis*len)
             current_option_vectors.append((p.transformed(T1), Vector.from_start_end(p.transformed(T1), p.transformed(T2))))
 
         if self.connector_2_state == True:
             p = self.connector_frame_2.point + Vector.Zaxis()*vector_vertical_offset
-            T1 = Translation.from_vector(self.frame.xaxis*self._source.diameter/2.*-1)
+            T1 = Translation.from_vector(self.frame.xaxis*self._diameter()/2.*-1)
             T2 = Translation.from_vector(self.frame.xaxis*-len)
             current_option_vectors.append((p.transformed(T1), Vector.from_start_end(p.transformed(T1), p.transformed(T2))))
 
@@ -759,3 +1133,133 @@ class Element(object):
             return current_option_frames
         else:
             return []
+
+
+class ElementOption(object):
+    """A candidate placement of an element, the element with a transformation.
+
+    An option is cheap to create: its frame, line and connector frames are
+    only computed when they are read, and its mesh only if it is drawn.
+    It reads the geometry of the element at that time.
+    :meth:`to_element` promotes the chosen option to a full :class:`Element`.
+
+    An option only stands in for an element where options are checked and
+    previewed. It has the transformed ``frame``, ``tool_frame``, ``line``,
+    connector, joint frames and ranges, ``source``, ``mesh`` and ``capsule``,
+    which are read-only, the connector states and ``data``. Everything else,
+    e.g. setting geometry, needs the element from :meth:`to_element`.
+
+    Parameters
+    ----------
+    element : :class:`Element`
+        The element that is placed.
+    transformation : :class:`compas.geometry.Transformation`
+        The transformation of the element to the placement.
+    """
+
+    def __init__(self, element, transformation):
+        self.element = element
+        self.transformation = transformation
+        # like a copy of an element, a new element has open connectors
+        self.connector_1_state = True
+        self.connector_2_state = True
+        self._cache = {}
+
+    def _transformed(self, name):
+        if name not in self._cache:
+            value = getattr(self.element, name)
+            if value is None:
+                self._cache[name] = None
+            elif isinstance(value, Mesh):
+                self._cache[name] = mesh_transformed(value, self.transformation)
+            else:
+                self._cache[name] = value.transformed(self.transformation)
+        return self._cache[name]
+
+    @property
+    def frame(self):
+        """:class:`compas.geometry.Frame` : The frame of the option."""
+        return self._transformed('frame')
+
+    @property
+    def tool_frame(self):
+        """:class:`compas.geometry.Frame` : The tool frame of the option."""
+        return self._transformed('tool_frame')
+
+    @property
+    def line(self):
+        """:class:`compas.geometry.Line` : The axis of the option."""
+        return self._transformed('line')
+
+    @property
+    def connector_frame_1(self):
+        return self._transformed('connector_frame_1')
+
+    @property
+    def connector_frame_2(self):
+        return self._transformed('connector_frame_2')
+
+    @property
+    def connector_range_1(self):
+        return self._transformed('connector_range_1')
+
+    @property
+    def connector_range_2(self):
+        return self._transformed('connector_range_2')
+
+    @property
+    def joint_frame_1(self):
+        return self._transformed('joint_frame_1')
+
+    @property
+    def joint_frame_2(self):
+        return self._transformed('joint_frame_2')
+
+    @property
+    def source(self):
+        """:class:`compas.geometry.Shape` : The source geometry of the option, for previews."""
+        return self._transformed('source')
+
+    @property
+    def mesh(self):
+        """:class:`compas.datastructures.Mesh` : The mesh of the option, for previews."""
+        return self._transformed('mesh')
+
+    @property
+    def capsule(self):
+        """:class:`compas.geometry.Capsule` : The collision capsule of the option."""
+        return self._transformed('capsule')
+
+    @property
+    def data(self):
+        """dict : The data of the element of the option."""
+        return self.to_element().data
+
+    def _option(self, transformation):
+        option = ElementOption(self.element, transformation)
+        option.connector_1_state = self.connector_1_state
+        option.connector_2_state = self.connector_2_state
+        return option
+
+    def transform(self, transformation):
+        """Transform the option, only the transformation is updated."""
+        self.transformation = transformation * self.transformation
+        self._cache = {}
+
+    def transformed(self, transformation):
+        return self._option(transformation * self.transformation)
+
+    def copy(self):
+        return self._option(self.transformation.copy())
+
+    def to_element(self):
+        """Return the option as an element.
+
+        Returns
+        -------
+        :class:`Element`
+        """
+        element = self.element.transformed(self.transformation)
+        element.connector_1_state = self.connector_1_state
+        element.connector_2_state = self.connector_2_state
+        return element
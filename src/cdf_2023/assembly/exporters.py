@@ -0,0 +1,472 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import csv
+import json
+import math
+import struct
+
+from compas.data import DataEncoder
+from compas.geometry import cross_vectors
+from compas.geometry import normalize_vector
+
+from .utilities import node_to_data
+
+
+__all__ = [
+    'BUILDING_PLAN_HEADER',
+    'BUILDING_PLAN_INDEX',
+    'BUILDING_PLAN_RECORD',
+    'BuildingPlanReader',
+    'building_plan_rows',
+    'frame_pose',
+    'incon_step',
+    'incon_tag',
+    'write_building_plan',
+    'write_building_plan_index',
+    'write_incon',
+    'write_xr',
+]
+
+
+BUILDING_PLAN_MAGIC = b'CDFP'
+BUILDING_PLAN_HEADER = struct.Struct('<4sHH')
+BUILDING_PLAN_RECORD = struct.Struct('<16si7d64s')
+BUILDING_PLAN_INDEX = struct.Struct('<iq')
+BUILDING_PLAN_VERSION = 1
+
+
+def frame_pose(frame):
+    """Return the pose of a frame as position and quaternion.
+
+    The quaternion is computed directly from the axes, with the same result
+    as ``frame.quaternion`` but without building a transformation matrix.
+
+    Parameters
+    ----------
+    frame : :class:`compas.geometry.Frame`
+
+    Returns
+    -------
+    list of float
+        ``[x, y, z, qw, qx, qy, qz]``
+
+    Examples
+    --------
+    >>> from compas.geometry import Frame
+    >>> frame = Frame([1, 2, 3], [0, 1, 0], [-1, 0, 0])
+    >>> frame_pose(frame)[3:] == list(frame.quaternion)
+    True
+    """
+    x = normalize_vector(list(frame.xaxis))
+    y = normalize_vector(list(frame.yaxis))
+    z = cross_vectors(x, y)
+    y = cross_vectors(z, x)
+
+    # the rotation matrix has the axes as columns, M[i][j] is axis j, coordinate i
+    trace = x[0] + y[1] + z[2]
+    if trace > 0.0:
+        s = 0.5 / math.sqrt(trace + 1.0)
+        q = [0.25 / s, (y[2] - z[1]) * s, (z[0] - x[2]) * s, (x[1] - y[0]) * s]
+    elif x[0] > y[1] and x[0] > z[2]:
+        s = 2.0 * math.sqrt(1.0 + x[0] - y[1] - z[2])
+        q = [(y[2] - z[1]) / s, 0.25 * s, (y[0] + x[1]) / s, (z[0] + x[2]) / s]
+    elif y[1] > z[2]:
+        s = 2.0 * math.sqrt(1.0 + y[1] - x[0] - z[2])
+        q = [(z[0] - x[2]) / s, (y[0] + x[1]) / s, 0.25 * s, (z[1] + y[2]) / s]
+    else:
+        s = 2.0 * math.sqrt(1.0 + z[2] - x[0] - y[1])
+        q = [(x[1] - y[0]) / s, (z[0] + x[2]) / s, (z[1] + y[2]) / s, 0.25 * s]
+
+    return list(frame.point) + q
+
+
+def incon_step(id_name, key, pose, is_built, object_type):
+    """Return the INCON building step of an object.
+
+    Parameters
+    ----------
+    id_name : str
+        The prefix of the id.
+    key : int
+        The key of the object, the suffix of the id.
+    pose : list of float
+        The pose, see :func:`frame_pose`. ``None`` for the origin.
+    is_built : bool
+    object_type : str
+        The name of the object file, e.g. ``'cylinder_for_iaac_workshop.obj'``.
+
+    Returns
+    -------
+    dict
+    """
+    x, y, z, w, qx, qy, qz = pose or (0, 0, 0, 1, 0, 0, 0)
+    return {
+        "id": str(id_name) + str(key),
+        "type": "object",
+        "object_type": object_type,
+        "is_tag": False,
+        "pos.x": x,
+        "pos.y": y,
+        "pos.z": z,
+        "quat.w": w,
+        "quat.x": qx,
+        "quat.y": qy,
+        "quat.z": qz,
+        "is_already_built": is_built,
+        "color_rgb": [1.0, 0.0, 0.0],
+        "build_instructions": [],
+    }
+
+
+def incon_tag(key, tag):
+    """Return the INCON building step of a QR code tag.
+
+    Parameters
+    ----------
+    key : int
+        The id of the tag.
+    tag : :class:`compas.geometry.Frame`
+        The frame of the tag.
+
+    Returns
+    -------
+    dict
+    """
+    x, y, z, w, qx, qy, qz = frame_pose(tag)
+    return {
+        "id": "tag_" + str(key),
+        "type": "tag",
+        "tag_id": key,
+        "tag_size": 0.096,
+        "pos.x": x,
+        "pos.y": y,
+        "pos.z": z,
+        "quat.w": w,
+        "quat.x": qx,
+        "quat.y": qy,
+        "quat.z": qz,
+        "is_already_built": True,
+        "build_instructions": [],
+    }
+
+
+class _Stream(object):
+    # a list, or a dictionary if value is given, whose items are produced while it is written
+
+    def __init__(self, keys, value=None):
+        self.keys = keys
+        self.value = value
+
+
+def _write(fp, value, encoder, level=0):
+    # writes the same text as json.dump(value, fp, cls=DataEncoder, **options) in Python 3
+    if isinstance(value, _Stream):
+        keys, get = value.keys, value.value
+        if get is not None and encoder.sort_keys:
+            keys = sorted(keys)
+    elif isinstance(value, dict) and any(isinstance(v, _Stream) for v in value.values()):
+        keys, get = sorted(value) if encoder.sort_keys else list(value), value.__getitem__
+    else:
+        text = encoder.encode(value)
+        if encoder.indent:
+            text = text.replace('\n', '\n' + ' ' * encoder.indent * level)
+        fp.write(text)
+        return
+
+    if encoder.indent:
+        separator, newline, inner = ',', '\n' + ' ' * encoder.indent * level, '\n' + ' ' * encoder.indent * (level + 1)
+    else:
+        separator, newline, inner = ', ', '', ''
+
+    fp.write('[' if get is None else '{')
+    first = True
+    for key in keys:
+        fp.write(inner if first else separator + inner)
+        if get is None:
+            _write(fp, key, encoder, level + 1)
+        else:
+            fp.write(json.dumps(key) + ': ')
+            _write(fp, get(key), encoder, level + 1)
+        first = False
+    if not first:
+        fp.write(newline)
+    fp.write(']' if get is None else '}')
+
+
+def _encoder(pretty):
+    return DataEncoder(sort_keys=True, indent=4) if pretty else DataEncoder()
+
+
+def write_incon(assembly, fp, qr_code=(), starting_geometry=True, is_built=True, pretty=True, object_type="cylinder_for_iaac_workshop.obj"):
+    """Write the INCON building plan of an assembly for the AR headset, step by step.
+
+    Parameters
+    ----------
+    assembly : :class:`Assembly`
+        The assembly, it is not modified.
+    fp : file-like object
+        A text file or stream to write to, e.g. ``socket.makefile('w')``.
+    qr_code : list of :class:`compas.geometry.Frame`, optional
+        The frames of the QR code tags.
+    starting_geometry : bool, optional
+        Add the starting material as first step.
+    is_built : bool, optional
+        The ``is_already_built`` state of the elements.
+    pretty : bool, optional
+        Indent the document, like ``compas.json_dump(..., pretty=True)``.
+    object_type : str, optional
+        The object file of the elements.
+    """
+    def steps():
+        if starting_geometry:
+            yield incon_step("starting element", 0, None, True, "starting_material.obj")
+        for key, element in assembly.elements():
+            yield incon_step("dynamic_cylinder", key, frame_pose(element.frame), is_built, object_type)
+        yield {"type": "object", "object_type": "cylinder_for_iaac_workshop_1m.obj", "id": "dynamic_cylinder",
+               "is_tag": False, "is_already_built": False, "color_rgb": [1.0, 0.0, 0.0], "instances": 200,
+               "build_instructions": []}
+        for key, tag in enumerate(qr_code):
+            yield incon_tag(key, tag)
+
+    plan = {"id": "iaac_plan", "name": "iaac_plan", "description": "iaac_plan", "building_steps": _Stream(steps())}
+    _write(fp, plan, _encoder(pretty))
+
+
+def write_xr(assembly, fp, is_built=False, pretty=False):
+    """Write an assembly for the XR app, element by element.
+
+    The document is the json of the assembly, with the node attributes
+    ``idx_v``, the course of the element, ``is_built``, and the defaults of
+    ``custom_attr_1`` to ``custom_attr_3``.
+
+    Parameters
+    ----------
+    assembly : :class:`Assembly`
+        The assembly, it is not modified.
+    fp : file-like object
+        A text file or stream to write to, e.g. ``socket.makefile('w')``.
+    is_built : bool, optional
+        The ``is_built`` state of the elements.
+    pretty : bool, optional
+        Indent the document, like ``compas.json_dump(..., pretty=True)``.
+    """
+    network = assembly.network
+    data = network.data
+    data['dna'] = dict(data['dna'], is_built=False, idx_v=None, custom_attr_1=None, custom_attr_2=None, custom_attr_3=None)
+
+    nodes = data['node']
+
+    def node(vkey):
+        attr = nodes[vkey]
+        node_data = node_to_data(attr)
+        course = attr.get('course', network.default_node_attributes.get('course'))
+        if course is not None:
+            node_data['idx_v'] = course
+        node_data['is_built'] = is_built
+        return node_data
+
+    data['node'] = _Stream(list(nodes), node)
+    _write(fp, data, _encoder(pretty))
+
+
+def building_plan_rows(assembly, markers=()):
+    """Generate the rows of the building plan of an assembly.
+
+    The plan starts with the global markers, fixed in the world frame, as rows
+    ``"GM", x, y, z, qw, qx, qy, qz``, followed by one row per element,
+    ``type, x, y, z, qw, qx, qy, qz, string_message``.
+
+    Parameters
+    ----------
+    assembly : :class:`Assembly`
+    markers : list of :class:`compas.geometry.Frame`, optional
+        The frames of the global markers.
+
+    Yields
+    ------
+    tuple
+        The key of the element, ``None`` for markers, the type, the pose and the message.
+    """
+    for frame in markers:
+        yield None, "GM", frame_pose(frame), ""
+    for key, element in assembly.elements():
+        yield key, element._type, frame_pose(element.frame), "This is the element with the key index %i" % key
+
+
+class _Line(object):
+    # receives the text of one row from a csv writer
+
+    def write(self, text):
+        self.text = text
+
+
+def _csv_row(fields):
+    line = _Line()
+    csv.writer(line, lineterminator='\n').writerow(fields)
+    return line.text.encode('utf-8') if not isinstance(line.text, bytes) else line.text
+
+
+def _text(value, size):
+    # utf-8, cut to size without splitting a character
+    data = value.encode('utf-8')[:size]
+    return data.decode('utf-8', 'ignore').encode('utf-8')
+
+
+def write_building_plan(assembly, fp, markers=(), binary=False):
+    """Write the building plan of an assembly, row by row.
+
+    In CSV, a row without message is written for a marker.
+    In the binary format, the file starts with ``BUILDING_PLAN_HEADER``
+    (``b'CDFP'``, the version and the record size) followed by one
+    ``BUILDING_PLAN_RECORD`` per row: the type (16 bytes), the key of the
+    element (``-1`` for markers), the pose (7 doubles) and the message
+    (64 bytes), little-endian, texts utf-8 and padded with zeros. Record ``i``
+    starts at ``BUILDING_PLAN_HEADER.size + i * BUILDING_PLAN_RECORD.size``.
+
+    Parameters
+    ----------
+    assembly : :class:`Assembly`
+    fp : file-like object
+        A binary file or stream to write to, e.g. ``socket.makefile('wb')``.
+    markers : list of :class:`compas.geometry.Frame`, optional
+        The frames of the global markers.
+    binary : bool, optional
+        Write fixed-width binary records instead of CSV.
+
+    Returns
+    -------
+    list of tuple
+        The ``(key, offset)`` of every element, the offset in bytes of its row.
+    """
+    index = []
+    if binary:
+        fp.write(BUILDING_PLAN_HEADER.pack(BUILDING_PLAN_MAGIC, BUILDING_PLAN_VERSION, BUILDING_PLAN_RECORD.size))
+        offset = BUILDING_PLAN_HEADER.size
+    else:
+        offset = 0
+
+    for key, type, pose, message in building_plan_rows(assembly, markers):
+        if binary:
+            row = BUILDING_PLAN_RECORD.pack(_text(type, 16), -1 if key is None else key, *(list(pose) + [_text(message, 64)]))
+        else:
+            row = _csv_row([type] + [repr(float(value)) for value in pose] + ([message] if key is not None else []))
+        if key is not None:
+            index.append((key, offset))
+        fp.write(row)
+        offset += len(row)
+
+    return index
+
+
+def write_building_plan_index(index, fp):
+    """Write the index of a building plan, to find the row of an element without reading the plan.
+
+    The index is sorted by key, one ``BUILDING_PLAN_INDEX`` record per element:
+    the key and the offset of its row, little-endian.
+
+    Parameters
+    ----------
+    index : list of tuple
+        The ``(key, offset)`` of every element, see :func:`write_building_plan`.
+    fp : file-like object
+        A binary file to write to.
+    """
+    for key, offset in sorted(index):
+        fp.write(BUILDING_PLAN_INDEX.pack(key, offset))
+
+
+class BuildingPlanReader(object):
+    """Reads rows of a building plan, CSV or binary, without parsing the whole plan.
+
+    Parameters
+    ----------
+    fp : file-like object
+        The plan, opened in binary mode.
+    index : file-like object, optional
+        The index of the plan, opened in binary mode, see :func:`write_building_plan_index`.
+        Only needed for :meth:`element`.
+
+    Examples
+    --------
+    >>> with open('plan.bin', 'rb') as fp, open('plan.idx', 'rb') as index:  # doctest: +SKIP
+    ...     reader = BuildingPlanReader(fp, index)
+    ...     key, type, pose, message = reader.element(12)
+    """
+
+    def __init__(self, fp, index=None):
+        self.fp = fp
+        self.fp.seek(0)
+        header = self.fp.read(BUILDING_PLAN_HEADER.size)
+        self.binary = len(header) == BUILDING_PLAN_HEADER.size and header[:4] == BUILDING_PLAN_MAGIC
+        if self.binary:
+            _, version, size = BUILDING_PLAN_HEADER.unpack(header)
+            if version != BUILDING_PLAN_VERSION or size != BUILDING_PLAN_RECORD.size:
+                raise ValueError('Unsupported building plan version %d.' % version)
+        self.offsets = {}
+        if index is not None:
+            data = index.read()
+            for i in range(0, len(data) - BUILDING_PLAN_INDEX.size + 1, BUILDING_PLAN_INDEX.size):
+                key, offset = BUILDING_PLAN_INDEX.unpack(data[i:i + BUILDING_PLAN_INDEX.size])
+                self.offsets[key] = offset
+
+    def __len__(self):
+        """The number of records of a binary plan."""
+        if not self.binary:
+            raise TypeError('Only binary plans have a known number of rows.')
+        self.fp.seek(0, 2)
+        return (self.fp.tell() - BUILDING_PLAN_HEADER.size) // BUILDING_PLAN_RECORD.size
+
+    def read(self, offset):
+        """Read the row starting at an offset.
+
+        Parameters
+        ----------
+        offset : int
+            The offset in bytes.
+
+        Returns
+        -------
+        tuple
+            The key of the element, ``None`` for markers, the type, the pose and the message.
+        """
+        self.fp.seek(offset)
+        if self.binary:
+            data = self.fp.read(BUILDING_PLAN_RECORD.size)
+            if len(data) < BUILDING_PLAN_RECORD.size:
+                raise IndexError('No row at offset %d.' % offset)
+            values = BUILDING_PLAN_RECORD.unpack(data)
+            key = None if values[1] == -1 else values[1]
+            return key, values[0].rstrip(b'\0').decode('utf-8'), list(values[2:9]), values[9].rstrip(b'\0').decode('utf-8')
+
+        line = self.fp.readline()
+        if not line:
+            raise IndexError('No row at offset %d.' % offset)
+        row = next(csv.reader([line.decode('utf-8')]))
+        message = row[8] if len(row) > 8 else ''
+        return None, row[0], [float(value) for value in row[1:8]], message
+
+    def record(self, i):
+        """Read the ``i``-th record of a binary plan, markers included."""
+        if not self.binary:
+            raise TypeError('Only binary plans have fixed-width records.')
+        return self.read(BUILDING_PLAN_HEADER.size + i * BUILDING_PLAN_RECORD.size)
+
+    def element(self, key):
+        """Read the row of an element.
+
+        Parameters
+        ----------
+        key : int
+            The key of the element.
+
+        Returns
+        -------
+        tuple
+            The key, the type, the pose and the message.
+        """
+        if key not in self.offsets:
+            raise KeyError(key)
+        _, type, pose, message = self.read(self.offsets[key])
+        return key, type, pose, message
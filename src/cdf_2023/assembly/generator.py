@@ -0,0 +1,192 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import math
+import random
+
+from compas.geometry import Frame
+
+from .assembly import Assembly
+from .collision import distance_segment_segment
+from .element import Element
+
+
+__all__ = [
+    'DEFAULT_GLOBALS',
+    'generate_assembly',
+]
+
+
+DEFAULT_GLOBALS = {
+    'rod_length': 0.7,
+    'rod_radius': 0.01,
+    'rf_unit_radius': 0.12,
+    'rf_unit_offset': 0.14,
+}
+"""The globals of the trunk designs in ``data/assembly``."""
+
+FLIPS = ('AA', 'AB', 'BA', 'BB')
+
+
+class _Grid(object):
+    # the axes of the elements, as tuples of their start and end, in the cells their boxes overlap
+
+    def __init__(self, cell_size, clearance):
+        self.cell_size = cell_size
+        self.clearance = clearance
+        self.cells = {}
+
+    def axis(self, line):
+        return tuple(line.start), tuple(line.end)
+
+    def cells_of(self, axis):
+        # the box of the axis, grown by the clearance
+        ranges = []
+        for a, b in zip(*axis):
+            ranges.append(range(int(math.floor((min(a, b) - self.clearance) / self.cell_size)),
+                                int(math.floor((max(a, b) + self.clearance) / self.cell_size)) + 1))
+        i, j, k = ranges
+        return [(x, y, z) for x in i for y in j for z in k]
+
+    def add(self, key, line):
+        axis = self.axis(line)
+        for cell in self.cells_of(axis):
+            self.cells.setdefault(cell, []).append((key, axis))
+
+    def near(self, axis):
+        seen = set()
+        for cell in self.cells_of(axis):
+            for key, other in self.cells.get(cell, ()):
+                if key not in seen:
+                    seen.add(key)
+                    yield key, other
+
+
+def generate_assembly(size,
+                      seed=None,
+                      globals=None,
+                      connector_angle=10.,
+                      supports=3,
+                      angles=(-90., 90.),
+                      shift_values=(0., 0.),
+                      attempts=20,
+                      tolerance=-0.001):
+    """Grow a random reciprocal frame structure, without Rhino.
+
+    The structure starts with vertical support rods on a circle. Then, units of
+    two rods are added to random elements with an open connector with
+    :meth:`Assembly.close_rf_unit`, with a random flip, rotation angle and
+    shift. A unit is only added if it does not collide with other elements,
+    like in :meth:`Assembly.collision_check`, and stays above the ground.
+    Elements whose units keep failing are given up. As units add two rods, a
+    single support rod is added where it is free if one element is missing.
+
+    Parameters
+    ----------
+    size : int
+        The number of elements to grow to. Growth stops earlier if no element
+        with an open connector is left.
+    seed : int, optional
+        The seed of the random numbers, the same seed grows the same structure.
+    globals : dict, optional
+        Replaces values of :data:`DEFAULT_GLOBALS`.
+    connector_angle : float, optional
+        The angle of the connectors to the axes of the rods in degrees.
+    supports : int, optional
+        The number of support rods.
+    angles : tuple of float, optional
+        The range of the rotation angles of the units in degrees.
+    shift_values : tuple of float, optional
+        The range of the shifts of the units along their parent element.
+    attempts : int, optional
+        The number of random units tried on an element before it is given up.
+    tolerance : float, optional
+        The tolerance of the collision check.
+
+    Returns
+    -------
+    :class:`Assembly`
+        The assembly, with its ``globals``.
+
+    Examples
+    --------
+    >>> assembly = generate_assembly(21, seed=1)
+    >>> assembly.number_of_elements()
+    21
+    >>> generate_assembly(21, seed=1).data == assembly.data
+    True
+    >>> generate_assembly(22, seed=1).number_of_elements()
+    22
+    """
+    rng = random.Random(seed)
+    assembly = Assembly()
+    assembly.globals = dict(DEFAULT_GLOBALS, **(globals or {}))
+    length = assembly.globals['rod_length']
+    clearance = assembly.globals['rod_radius'] * 2. + 0.015 + tolerance
+    grid = _Grid(length / 4., clearance)
+
+    # vertical rods standing on the ground, which grow from their upper connector
+    radius = assembly.globals['rf_unit_radius'] * 2.
+    growing = []
+    for i in range(supports):
+        element = _support(assembly, radius, 2 * math.pi * i / supports, connector_angle)
+        key = _add_support(assembly, element)
+        grid.add(key, element.line)
+        growing.append(key)
+
+    while growing and assembly.number_of_elements() + 2 <= size:
+        key = rng.choice(growing)
+        element = assembly.element(key)
+        for _ in range(attempts):
+            flip = rng.choice(FLIPS)
+            angle = rng.uniform(*angles)
+            shift_value = rng.uniform(*shift_values)
+            lines = [option.line for option in element.current_option_elements(assembly, flip, angle, shift_value)]
+            if all(_is_free(grid, key, line, clearance) for line in lines):
+                break
+        else:
+            growing.remove(key)
+            continue
+
+        keys = assembly.close_rf_unit(key, flip, angle, shift_value)
+        growing.remove(key)
+        for new_key in keys['keys_robot'] + keys['keys_human']:
+            grid.add(new_key, assembly.element(new_key).line)
+            growing.append(new_key)
+
+    if assembly.number_of_elements() == size - 1:
+        # between the supports, on rings further out until there is space
+        ring = 1
+        while True:
+            for i in range(max(supports, 1) * ring):
+                element = _support(assembly, radius * ring, 2 * math.pi * (i + 0.5) / (max(supports, 1) * ring), connector_angle)
+                if _is_free(grid, None, element.line, clearance):
+                    _add_support(assembly, element)
+                    return assembly
+            ring += 1
+
+    return assembly
+
+
+def _support(assembly, radius, angle, connector_angle):
+    length = assembly.globals['rod_length']
+    frame = Frame([radius * math.cos(angle), radius * math.sin(angle), length / 2.], [0, 0, 1], [-math.sin(angle), math.cos(angle), 0])
+    element = Element.from_rod(frame, assembly.globals, connector_angle)
+    element.connector_2_state = False
+    return element
+
+
+def _add_support(assembly, element):
+    return assembly.add_element(element, placed_by='human', is_support=True, is_built=True, on_ground=True)
+
+
+def _is_free(grid, parent_key, line, clearance):
+    axis = grid.axis(line)
+    if min(axis[0][2], axis[1][2]) < 0:
+        return False
+    for key, other in grid.near(axis):
+        if key != parent_key and distance_segment_segment(axis, other) < clearance:
+            return False
+    return True
+
@@ -0,0 +1,265 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import ast
+import json
+import os
+import struct
+import sys
+from array import array
+
+
+__all__ = [
+    'TrajectoryStore',
+    'trajectory_store_path',
+]
+
+
+_DTYPES = {
+    'float64': ('d', '<f8'),
+    'float32': ('f', '<f4'),
+}
+
+_NPY_MAGIC = b'\x93NUMPY\x01\x00'
+
+# the attributes of a trajectory point which may be empty, stored after the positions
+_OPTIONAL = ('velocities', 'accelerations', 'effort')
+
+
+def _write_npy(filepath, values, shape, dtype):
+    typecode, descr = _DTYPES[dtype]
+    header = "{'descr': '%s', 'fortran_order': False, 'shape': (%d, %d), }" % ((descr, ) + tuple(shape))
+    # magic, version, header length and header are padded to a multiple of 64 bytes
+    padding = (64 - (len(_NPY_MAGIC) + 2 + len(header) + 1) % 64) % 64
+    header = header + ' ' * padding + '\n'
+
+    data = array(typecode, values)
+    if sys.byteorder == 'big':
+        data.byteswap()
+
+    with open(filepath, 'wb') as fp:
+        fp.write(_NPY_MAGIC)
+        fp.write(struct.pack('<H', len(header)))
+        fp.write(header.encode('latin1'))
+        data.tofile(fp)
+
+
+def _read_npy(filepath):
+    with open(filepath, 'rb') as fp:
+        if fp.read(len(_NPY_MAGIC)) != _NPY_MAGIC:
+            raise ValueError('Not a version 1.0 npy file: %s' % filepath)
+        header_length, = struct.unpack('<H', fp.read(2))
+        header = ast.literal_eval(fp.read(header_length).decode('latin1'))
+        typecode = [t for t, descr in _DTYPES.values() if descr == header['descr']][0]
+        rows, columns = header['shape']
+
+        data = array(typecode)
+        data.fromfile(fp, rows * columns)
+        if sys.byteorder == 'big':
+            data.byteswap()
+
+    return data, (rows, columns)
+
+
+def trajectory_store_path(path, filepath=None):
+    """Return the absolute path of a trajectory store recorded in an assembly.
+
+    Parameters
+    ----------
+    path : str
+        The recorded path, absolute or relative to the assembly json file.
+    filepath : str, optional
+        The path of the assembly json file. Without it, a relative path is
+        resolved against the working directory.
+
+    Returns
+    -------
+    str
+
+    Examples
+    --------
+    >>> import os
+    >>> trajectory_store_path('traj', os.path.join('out', 'a.json')) == os.path.abspath(os.path.join('out', 'traj'))
+    True
+    """
+    if not os.path.isabs(path) and filepath:
+        path = os.path.join(os.path.dirname(os.path.abspath(filepath)), path)
+    return os.path.abspath(path)
+
+
+class TrajectoryStore(object):
+    """Stores robot trajectories as compact arrays in a directory, next to the assembly.
+
+    Every trajectory is written to one ``<name>.npy`` file with one row per
+    trajectory point, ``time_from_start, positions, velocities, accelerations, effort``,
+    and a small ``<name>.json`` file with the joint names, types and the other
+    trajectory attributes. The ``.npy`` files can be memory-mapped with numpy,
+    see :meth:`array`, but reading and writing them only needs the standard library.
+
+    Velocities, accelerations or efforts that none of the points has, or which
+    are all zero, are written as zeros and recorded as ``empty`` in the ``.json``
+    file. They are read back as empty lists, which
+    :class:`compas_fab.robots.JointTrajectoryPoint` fills with zeros.
+
+    Parameters
+    ----------
+    path : str
+        The directory of the store. It is created if it does not exist.
+    dtype : {'float64', 'float32'}, optional
+        The precision of the stored values.
+
+    Examples
+    --------
+    >>> import tempfile
+    >>> store = TrajectoryStore(tempfile.mkdtemp())
+    >>> store.names()
+    []
+    """
+
+    def __init__(self, path, dtype='float64'):
+        if dtype not in _DTYPES:
+            raise ValueError('Unsupported dtype: %s' % dtype)
+        self.path = path
+        self.dtype = dtype
+        if not os.path.isdir(path):
+            os.makedirs(path)
+
+    def _filepath(self, name, extension):
+        return os.path.join(self.path, '%s.%s' % (name, extension))
+
+    def names(self):
+        """Return the names of all stored trajectories.
+
+        Returns
+        -------
+        list of str
+        """
+        return sorted(os.path.splitext(f)[0] for f in os.listdir(self.path) if f.endswith('.npy'))
+
+    def __contains__(self, name):
+        return os.path.isfile(self._filepath(name, 'npy'))
+
+    def save(self, name, trajectory):
+        """Write a trajectory to the store, replacing a stored one with the same name.
+
+        Parameters
+        ----------
+        name : str
+            The name of the trajectory.
+        trajectory : :class:`compas_fab.robots.JointTrajectory`
+            The trajectory.
+
+        Returns
+        -------
+        str
+            The name of the trajectory, to be used as reference.
+        """
+        points = trajectory.points
+        n = len(points[0].joint_values) if points else len(trajectory.joint_names)
+
+        # compas_fab fills the attributes a point is created without with zeros
+        empty = [name for name in _OPTIONAL if not any(any(getattr(point, name) or []) for point in points)]
+
+        values = []
+        for point in points:
+            values.append(point.time_from_start.seconds)
+            for attribute in (point.joint_values, point.velocities, point.accelerations, point.effort):
+                values.extend(attribute if attribute else [0.] * n)
+
+        _write_npy(self._filepath(name, 'npy'), values, (len(points), 1 + 4 * n), self.dtype)
+
+        start_configuration = trajectory.start_configuration
+        meta = {
+            'joints': n,
+            'joint_names': trajectory.joint_names or [],
+            'joint_types': list(points[0].joint_types) if points else [],
+            'point_joint_names': list(points[0].joint_names) if points else [],
+            'start_configuration': start_configuration.to_data() if start_configuration else None,
+            'fraction': trajectory.fraction,
+            'empty': empty,
+            'attached_collision_meshes': [acm.to_data() for acm in trajectory.attached_collision_meshes],
+        }
+        with open(self._filepath(name, 'json'), 'w') as fp:
+            json.dump(meta, fp)
+
+        return name
+
+    def load(self, name):
+        """Read a trajectory from the store.
+
+        Parameters
+        ----------
+        name : str
+            The name of the trajectory.
+
+        Returns
+        -------
+        :class:`compas_fab.robots.JointTrajectory`
+        """
+        from compas_fab.robots import AttachedCollisionMesh
+        from compas_fab.robots import Configuration
+        from compas_fab.robots import Duration
+        from compas_fab.robots import JointTrajectory
+        from compas_fab.robots import JointTrajectoryPoint
+
+        with open(self._filepath(name, 'json'), 'r') as fp:
+            meta = json.load(fp)
+        data, (rows, columns) = _read_npy(self._filepath(name, 'npy'))
+        n = meta['joints']
+        # stores written before the empty attributes were recorded have none
+        empty = meta.get('empty', [])
+
+        points = []
+        for i in range(rows):
+            row = data[i * columns:(i + 1) * columns]
+            secs = int(row[0])
+            nsecs = min(int(round((row[0] - secs) * 1e9)), 999999999)
+            optional = {}
+            for j, name in enumerate(_OPTIONAL, 1):
+                optional[name] = [] if name in empty else list(row[1 + j * n:1 + (j + 1) * n])
+            points.append(JointTrajectoryPoint(joint_values=list(row[1:1 + n]),
+                                               joint_types=meta['joint_types'],
+                                               time_from_start=Duration(secs, nsecs),
+                                               joint_names=meta['point_joint_names'],
+                                               **optional))
+
+        start_configuration = meta['start_configuration']
+        return JointTrajectory(trajectory_points=points,
+                               joint_names=meta['joint_names'],
+                               start_configuration=Configuration.from_data(start_configuration) if start_configuration else None,
+                               fraction=meta['fraction'],
+                               attached_collision_meshes=[AttachedCollisionMesh.from_data(d) for d in meta['attached_collision_meshes']])
+
+    def array(self, name, mmap_mode='r'):
+        """Return the stored array of a trajectory, without parsing it. Requires numpy.
+
+        Parameters
+        ----------
+        name : str
+            The name of the trajectory.
+        mmap_mode : str, optional
+            The mode to memory-map the file with, see :func:`numpy.load`.
+            ``None`` reads the file into memory.
+
+        Returns
+        -------
+        :class:`numpy.ndarray`
+            An array of shape ``(points, 1 + 4 * joints)``.
+        """
+        import numpy
+
+        return numpy.load(self._filepath(name, 'npy'), mmap_mode=mmap_mode)
+
+    def remove(self, name):
+        """Remove a trajectory from the store.
+
+        Parameters
+        ----------
+        name : str
+            The name of the trajectory.
+        """
+        for extension in ('npy', 'json'):
+            filepath = self._filepath(name, extension)
+            if os.path.isfile(filepath):
+                os.remove(filepath)
@@ -5,6 +5,8 @@ from __future__ import division
 import json
 import compas
 
+from ..instrumentation import timed
+
 try:
     basestring
 except NameError:
@@ -93,6 +95,7 @@ class FromToJson(object):
         graph.data = data
         return graph
 
+    @timed('to_json')
     def to_json(self, filepath, pretty=False):
         """Serialise the structured data representing the data structure to json.
 
@@ -158,13 +161,34 @@ def _serialize_to_data(obj):
         data=obj.to_data()
     )
 
+def node_to_data(attr):
+    """Serialize the attributes of an assembly node, including its element.
+
+    Parameters
+    ----------
+    attr : dict
+        The attributes of the node.
+
+    Returns
+    -------
+    dict
+        A new dictionary, the attributes are not modified.
+    """
+    data = {key: attr[key] for key in attr.keys() if key != 'element'}
+    data['element'] = attr['element'].to_data()
+
+    for key in ('frame_measured', 'robot_AA_base_frame', 'robot_AB_base_frame'):
+        if data.get(key):
+            data[key] = data[key].to_data()
+
+    return data
+
 def element_to_INCON(id_name, key, element, building_steps, is_built,name):
         if element != None:
             x,y,z,w,qx,qy,qz = element.get_pose_quaternion()
-            type = element.objecttype
         else:
             x,y,z,w,qx,qy,qz = 0,0,0,1,0,0,0
-            type = "object"
+        type = "object"
         line = {
             "id": str(id_name) + str(key),
             'type':type,
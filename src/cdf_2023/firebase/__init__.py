@@ -1,2 +1,12 @@
+import sys
+
 from .realtime_database import *
+from .local_database import *
+from .batch import *
+from .mirror import *
+from .delta import *
+from .offline import *
 from .storage import *
+
+if sys.version_info >= (3, 6):
+    from .aio import *
@@ -0,0 +1,388 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import asyncio
+import json
+import ssl
+from urllib.parse import parse_qsl
+from urllib.parse import quote
+from urllib.parse import urlencode
+from urllib.parse import urlsplit
+
+from .local_database import split_path
+from .realtime_database import DEFAULT_CONFIG
+
+
+__all__ = [
+    'AsyncRealtimeDatabase',
+    'DatabaseError',
+]
+
+
+class DatabaseError(Exception):
+    """Raised if the database answers a request with an error.
+
+    Attributes
+    ----------
+    status : int
+        The HTTP status code.
+    """
+
+    def __init__(self, status, message):
+        super(DatabaseError, self).__init__('%d: %s' % (status, message))
+        self.status = status
+
+
+class _Connection(object):
+    # a minimal HTTP/1.1 connection, responses are read in the order of the requests
+
+    def __init__(self, host, port, use_ssl):
+        self.host = host
+        self.port = port
+        self.use_ssl = use_ssl
+        self.reader = None
+        self.writer = None
+
+    @property
+    def is_open(self):
+        return self.writer is not None
+
+    async def open(self):
+        context = ssl.create_default_context() if self.use_ssl else None
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port, ssl=context)
+        return self
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+    def write(self, method, target, body=None, headers=None):
+        data = b'' if body is None else json.dumps(body).encode('utf-8')
+        lines = ['%s %s HTTP/1.1' % (method, target), 'Host: %s' % self.host]
+        if method != 'GET':
+            lines.append('Content-Length: %d' % len(data))
+            lines.append('Content-Type: application/json; charset=utf-8')
+        for name, value in (headers or {}).items():
+            lines.append('%s: %s' % (name, value))
+        self.writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin1') + data)
+
+    async def read_head(self):
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError('The connection was closed by the server.')
+        status = int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        return status, headers
+
+    async def chunks(self, status, headers):
+        if status in (204, 304):
+            return
+        if headers.get('transfer-encoding', '').lower() == 'chunked':
+            while True:
+                size = int((await self.reader.readline()).split(b';')[0], 16)
+                if not size:
+                    # skip the trailers
+                    while (await self.reader.readline()) not in (b'\r\n', b'\n', b''):
+                        pass
+                    return
+                chunk = await self.reader.readexactly(size)
+                await self.reader.readline()
+                yield chunk
+        elif 'content-length' in headers:
+            length = int(headers['content-length'])
+            if length:
+                yield await self.reader.readexactly(length)
+        else:
+            # the body ends with the connection
+            while True:
+                chunk = await self.reader.read(65536)
+                if not chunk:
+                    self.close()
+                    return
+                yield chunk
+
+    async def read_response(self):
+        status, headers = await self.read_head()
+        body = b''.join([chunk async for chunk in self.chunks(status, headers)])
+        if headers.get('connection', '').lower() == 'close':
+            self.close()
+        return status, headers, body
+
+
+class AsyncRealtimeDatabase(object):
+    """An asyncio client of the realtime database, using its REST API.
+
+    Requests run on a pool of keep-alive connections, so independent reads
+    run concurrently, see :meth:`get_many` and :meth:`get_state`.
+    :meth:`write_many` pipelines writes on a single connection, which sends
+    them without waiting for the answers and keeps their order.
+    :meth:`stream` iterates over the events of a location.
+
+    Parameters
+    ----------
+    config : dict, optional
+        The Firebase config. Defaults to the config of the cdf-project.
+    url : str, optional
+        The database URL, replaces ``databaseURL`` of the config, e.g. the URL
+        of a :class:`LocalDatabaseServer` or of an emulator with ``?ns=<namespace>``.
+    token : str, optional
+        The id token of a signed in user, sent with every request.
+    connections : int, optional
+        The maximum number of concurrent connections.
+
+    Examples
+    --------
+    >>> async def main():  # doctest: +SKIP
+    ...     async with AsyncRealtimeDatabase() as client:
+    ...         state = await client.get_state()
+    ...         await client.write_many([('update', 'Built Keys', {'3': '3'}),
+    ...                                  ('set', 'Design/node/3/is_built', True)])
+    ...         async for event in client.stream('Built Keys'):
+    ...             print(event)
+    >>> asyncio.run(main())  # doctest: +SKIP
+    """
+
+    _METHODS = {'get': 'GET', 'set': 'PUT', 'update': 'PATCH', 'remove': 'DELETE'}
+
+    def __init__(self, config=None, url=None, token=None, connections=4):
+        self.config = dict(config or DEFAULT_CONFIG)
+        if url:
+            self.config['databaseURL'] = url
+        self.token = token
+        self.connections = connections
+        self._idle = []
+        self._semaphore = None
+
+    @property
+    def url(self):
+        """str : The URL of the database."""
+        return self.config['databaseURL']
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    async def close(self):
+        """Close all idle connections."""
+        for connection in self._idle:
+            connection.close()
+        self._idle = []
+
+    def _address(self, url):
+        parts = urlsplit(url)
+        use_ssl = parts.scheme == 'https'
+        return parts.hostname, parts.port or (443 if use_ssl else 80), use_ssl
+
+    def _target(self, path, **query):
+        parts = urlsplit(self.url)
+        params = parse_qsl(parts.query)
+        if self.token:
+            params.append(('auth', self.token))
+        params.extend(sorted(query.items()))
+        target = '%s/%s.json' % (parts.path.rstrip('/'), quote('/'.join(split_path(path))))
+        return target + ('?' + urlencode(params) if params else '')
+
+    async def _acquire(self):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.connections)
+        await self._semaphore.acquire()
+        while self._idle:
+            connection = self._idle.pop()
+            if connection.is_open:
+                return connection
+        try:
+            return await _Connection(*self._address(self.url)).open()
+        except Exception:
+            self._semaphore.release()
+            raise
+
+    def _release(self, connection):
+        if connection.is_open:
+            self._idle.append(connection)
+        self._semaphore.release()
+
+    async def _exchange(self, requests):
+        # all requests are idempotent, so they are sent again if an idle connection was closed
+        for attempt in range(2):
+            connection = await self._acquire()
+            try:
+                for method, target, body in requests:
+                    connection.write(method, target, body)
+                await connection.writer.drain()
+                responses = [await connection.read_response() for _ in requests]
+            except (ConnectionError, asyncio.IncompleteReadError):
+                connection.close()
+                self._release(connection)
+                if attempt:
+                    raise
+                continue
+            except BaseException:
+                # cancelled or timed out, unread responses may be left on the connection
+                connection.close()
+                self._release(connection)
+                raise
+            self._release(connection)
+            break
+
+        results = []
+        for status, _headers, body in responses:
+            text = body.decode('utf-8')
+            if status >= 400:
+                raise DatabaseError(status, text)
+            results.append(json.loads(text) if text else None)
+        return results
+
+    def _request(self, operation, path, data=None):
+        method = self._METHODS[operation]
+        query = {} if method == 'GET' else {'print': 'silent'}
+        return method, self._target(path, **query), data
+
+    async def get(self, path):
+        """Read the value at a path.
+
+        Parameters
+        ----------
+        path : str or list
+
+        Returns
+        -------
+        object
+        """
+        return (await self._exchange([self._request('get', path)]))[0]
+
+    async def set(self, path, data):
+        """Replace the value at a path."""
+        await self._exchange([self._request('set', path, data)])
+
+    async def update(self, path, data):
+        """Write several children of a path, ``data`` maps relative paths to values."""
+        await self._exchange([self._request('update', path, data)])
+
+    async def remove(self, path):
+        """Remove the value at a path."""
+        await self._exchange([self._request('remove', path)])
+
+    async def get_many(self, paths):
+        """Read several paths concurrently.
+
+        Parameters
+        ----------
+        paths : list
+
+        Returns
+        -------
+        list
+            The values in the order of the paths.
+        """
+        return list(await asyncio.gather(*[self.get(path) for path in paths]))
+
+    async def write_many(self, operations):
+        """Send writes pipelined on one connection, they are applied in order.
+
+        Parameters
+        ----------
+        operations : list of tuple
+            The writes as ``(operation, path, data)``, with the operation
+            ``'set'``, ``'update'`` or ``'remove'``.
+        """
+        requests = [self._request(operation, path, data) for operation, path, data in operations]
+        if requests:
+            await self._exchange(requests)
+
+    async def stream(self, path):
+        """Iterate over the changes of a path, in an ``async for`` loop.
+
+        The first event puts the current value at ``'/'``. Keep-alive events are
+        skipped, the iteration ends when the server closes the stream.
+
+        Parameters
+        ----------
+        path : str or list
+
+        Yields
+        ------
+        dict
+            The event as ``{'event': ..., 'path': ..., 'data': ...}``, like a pyrebase stream.
+        """
+        url = self.url
+        target = self._target(path)
+        for _ in range(3):
+            connection = await _Connection(*self._address(url)).open()
+            connection.write('GET', target, headers={'Accept': 'text/event-stream'})
+            await connection.writer.drain()
+            status, headers = await connection.read_head()
+            if status != 307:
+                break
+            # the database may redirect streams to another server
+            connection.close()
+            url = headers['location']
+            parts = urlsplit(url)
+            target = parts.path + ('?' + parts.query if parts.query else '')
+
+        try:
+            if status >= 400:
+                raise DatabaseError(status, 'Cannot stream %s' % path)
+            buffer = b''
+            event, data = None, []
+            async for chunk in connection.chunks(status, headers):
+                buffer += chunk
+                while b'\n' in buffer:
+                    line, buffer = buffer.split(b'\n', 1)
+                    line = line.rstrip(b'\r').decode('utf-8')
+                    if line.startswith('event:'):
+                        event = line[len('event:'):].strip()
+                    elif line.startswith('data:'):
+                        data.append(line[len('data:'):].strip())
+                    elif not line:
+                        if event and event != 'keep-alive':
+                            payload = json.loads('\n'.join(data)) if data else None
+                            if isinstance(payload, dict) and 'path' in payload:
+                                yield {'event': event, 'path': payload['path'], 'data': payload.get('data')}
+                            else:
+                                yield {'event': event, 'path': None, 'data': payload}
+                        event, data = None, []
+        finally:
+            connection.close()
+
+    async def get_state(self, paths=('Users', 'Built Keys', 'Design')):
+        """Read the state of the app concurrently.
+
+        Returns
+        -------
+        dict
+            The value of every path.
+        """
+        return dict(zip(paths, await self.get_many(paths)))
+
+    async def get_keys_built(self):
+        keys = await self.get('Built Keys')
+        return list(keys.values() if isinstance(keys, dict) else keys or [])
+
+    async def set_keys_built(self, keys):
+        await self.set('Built Keys', dict((str(key), str(key)) for key in keys))
+
+    async def add_key_built(self, new_key_built):
+        await self.update('Built Keys', {str(new_key_built): str(new_key_built)})
+
+    async def remove_key_built(self, key):
+        await self.remove(['Built Keys', key])
+
+    async def update_robot_frame(self, index, robot_frame, frame):
+        await self.set(['Design', 'node', index, robot_frame], frame)
+
+    async def get_users(self):
+        users = await self.get('Users')
+        return list(users) if isinstance(users, dict) else list(range(len(users or [])))
+
+    async def get_json_data(self, name, childname):
+        return await self.get([name, childname])
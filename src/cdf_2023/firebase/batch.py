@@ -0,0 +1,196 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import copy
+import threading
+
+from .local_database import split_path
+
+
+__all__ = [
+    'WriteBatch',
+]
+
+
+def _merged(node, path, value):
+    # returns a copy of node with value written at the relative path
+    node = copy.deepcopy(node) if isinstance(node, dict) else {}
+    parent = node
+    for name in path[:-1]:
+        if not isinstance(parent.get(name), dict):
+            parent[name] = {}
+        parent = parent[name]
+    parent[path[-1]] = value
+    return node
+
+
+class WriteBatch(object):
+    """Collects writes to the realtime database and sends them as one multi-location update.
+
+    Writes are buffered by path, a later write to the same path replaces the
+    earlier one, and writes below a buffered path are merged into its value,
+    so a flush has the same result as sending the writes one by one.
+    A flush sends all buffered writes in a single request. It happens when
+    :meth:`flush` is called, when the batch holds ``max_size`` paths, every
+    ``flush_interval`` seconds if the batch was started, and when leaving a ``with`` block.
+
+    Parameters
+    ----------
+    client : :class:`RealtimeDatabase`
+        The client to send the updates with.
+    flush_interval : float, optional
+        The interval in seconds of the background flushes, see :meth:`start`.
+    max_size : int, optional
+        The maximum number of buffered paths.
+
+    Attributes
+    ----------
+    error : Exception
+        The last error of a background flush. The writes of a failed flush
+        are kept and sent again with the next one.
+
+    Examples
+    --------
+    >>> from cdf_2023.firebase import LocalDatabase, RealtimeDatabase
+    >>> client = RealtimeDatabase(app=LocalDatabase())
+    >>> with client.batch() as batch:
+    ...     batch.add_key_built(3)
+    ...     batch.update_robot_frame(3, 'robot_AA_base_frame', [0, 0, 0])
+    >>> client.app.requests
+    1
+    """
+
+    def __init__(self, client, flush_interval=0.5, max_size=500):
+        self.client = client
+        self.flush_interval = flush_interval
+        self.max_size = max_size
+        self.error = None
+        self._changes = {}
+        self._lock = threading.Lock()
+        self._send_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def __len__(self):
+        return len(self._changes)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
+        self.flush()
+
+    def set(self, path, value):
+        """Buffer the replacement of the value at a path.
+
+        Parameters
+        ----------
+        path : str or list
+            The path, e.g. ``'Design/node/3/is_built'``.
+        value : object
+            The new value, ``None`` removes the value.
+        """
+        if self._buffer(split_path(path), value):
+            self.flush()
+
+    def _buffer(self, path, value):
+        # returns True if the batch is full
+        with self._lock:
+            for i in range(1, len(path)):
+                ancestor = '/'.join(path[:i])
+                if ancestor in self._changes:
+                    self._changes[ancestor] = _merged(self._changes[ancestor], path[i:], value)
+                    return False
+            key = '/'.join(path)
+            for descendant in [k for k in self._changes if k.startswith(key + '/')]:
+                del self._changes[descendant]
+            self._changes[key] = value
+            return len(self._changes) >= self.max_size
+
+    def remove(self, path):
+        """Buffer the removal of the value at a path.
+
+        Parameters
+        ----------
+        path : str or list
+        """
+        self.set(path, None)
+
+    def add_key_built(self, new_key_built):
+        self.set(['Built Keys', new_key_built], str(new_key_built))
+
+    def remove_key_built(self, key):
+        self.remove(['Built Keys', key])
+
+    def set_keys_built(self, keys):
+        self.set('Built Keys', dict((str(key), str(key)) for key in keys))
+
+    def update_robot_frame(self, index, robot_frame, frame):
+        self.set(['Design', 'node', index, robot_frame], frame)
+
+    def update_node(self, index, attributes):
+        """Buffer the update of several attributes of a design node.
+
+        Parameters
+        ----------
+        index : int
+            The key of the node.
+        attributes : dict
+            The new values of the attributes.
+        """
+        for name, value in attributes.items():
+            self.set(['Design', 'node', index, name], value)
+
+    def set_joints(self, joints):
+        self.set('Joints', joints)
+
+    def flush(self):
+        """Send all buffered writes in a single update.
+
+        Returns
+        -------
+        int
+            The number of paths sent.
+        """
+        with self._send_lock:
+            with self._lock:
+                changes, self._changes = self._changes, {}
+            if not changes:
+                return 0
+            try:
+                self.client.child().update(changes, self.client.token)
+            except Exception:
+                # keep the writes which were buffered since, they are newer
+                with self._lock:
+                    newer, self._changes = self._changes, {}
+                for path, value in list(changes.items()) + list(newer.items()):
+                    self._buffer(split_path(path), value)
+                raise
+            return len(changes)
+
+    def start(self):
+        """Flush every ``flush_interval`` seconds in a background thread."""
+        if self._thread:
+            return self
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the background flushes, buffered writes are kept."""
+        if self._thread:
+            self._stopped.set()
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stopped.wait(self.flush_interval):
+            try:
+                self.flush()
+                self.error = None
+            except Exception as e:
+                self.error = e
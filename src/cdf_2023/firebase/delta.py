@@ -0,0 +1,153 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import hashlib
+import json
+import os
+
+
+__all__ = [
+    'content_hash',
+    'json_delta',
+    'DeltaManifest',
+]
+
+
+def content_hash(value):
+    """Hash a json-serializable value, independent of the order of its keys.
+
+    Parameters
+    ----------
+    value : object
+
+    Returns
+    -------
+    str
+
+    Examples
+    --------
+    >>> content_hash({'a': 1, 'b': [1, 2]}) == content_hash({'b': [1, 2], 'a': 1})
+    True
+    """
+    text = json.dumps(value, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+def _entry_hashes(value):
+    # the children of a dictionary are hashed one by one, other values as a whole
+    if isinstance(value, dict):
+        return dict((str(key), content_hash(child)) for key, child in value.items())
+    return content_hash(value)
+
+
+def json_delta(parentname, data, keys, hashes=None):
+    """Compute the update of the database from the previously uploaded hashes to new data.
+
+    Parameters
+    ----------
+    parentname : str
+        The location the data is uploaded to, e.g. ``'Design'``.
+    data : dict
+        The data, e.g. the data of an assembly.
+    keys : list of str
+        The uploaded children of the data, e.g. ``['node', 'edge']``.
+    hashes : dict, optional
+        The hashes of the previous upload, by key.
+
+    Returns
+    -------
+    tuple
+        The update by path, with ``None`` for removed entries, and the hashes of the new data.
+
+    Examples
+    --------
+    >>> old = {'node': {'1': {'x': 0}, '2': {'x': 0}}}
+    >>> new = {'node': {'1': {'x': 1}, '3': {'x': 0}}}
+    >>> _, hashes = json_delta('Design', old, ['node'])
+    >>> update, _ = json_delta('Design', new, ['node'], hashes)
+    >>> sorted(update.items())
+    [('Design/node/1', {'x': 1}), ('Design/node/2', None), ('Design/node/3', {'x': 0})]
+    """
+    hashes = hashes or {}
+    update = {}
+    new_hashes = {}
+
+    for key in keys:
+        value = data.get(key)
+        new = _entry_hashes(value)
+        old = hashes.get(key)
+        new_hashes[key] = new
+        path = '%s/%s' % (parentname, key)
+
+        if not (isinstance(old, dict) and isinstance(new, dict)):
+            # unknown before, or not a dictionary: replace the whole child
+            if old != new:
+                update[path] = value
+            continue
+
+        for entry, entry_hash in new.items():
+            if old.get(entry) != entry_hash:
+                update['%s/%s' % (path, entry)] = value[entry]
+        for entry in old:
+            if entry not in new:
+                update['%s/%s' % (path, entry)] = None
+
+    return update, new_hashes
+
+
+class DeltaManifest(object):
+    """The hashes of the last upload of a json file, stored next to it.
+
+    The manifest is only valid for the database and location it was uploaded to.
+
+    Parameters
+    ----------
+    path : str
+        The path of the manifest file.
+    url : str
+        The URL of the database.
+    parentname : str
+        The location the data is uploaded to.
+    """
+
+    def __init__(self, path, url, parentname):
+        self.path = path
+        self.url = url
+        self.parentname = parentname
+
+    @classmethod
+    def for_json(cls, json_f, url, parentname):
+        """Return the manifest of a json file, ``<name>_firebase_manifest.json``."""
+        path = os.path.splitext(json_f)[0] + '_firebase_manifest.json'
+        return cls(path, url, parentname)
+
+    def load(self):
+        """Read the hashes, empty if there was no upload to the same database and location.
+
+        Returns
+        -------
+        dict
+        """
+        if not os.path.isfile(self.path):
+            return {}
+        with open(self.path, 'r') as fp:
+            manifest = json.load(fp)
+        if manifest.get('url') != self.url or manifest.get('parentname') != self.parentname:
+            return {}
+        return manifest.get('hashes', {})
+
+    def save(self, hashes):
+        """Write the hashes of an upload.
+
+        Parameters
+        ----------
+        hashes : dict
+        """
+        with open(self.path, 'w') as fp:
+            json.dump({'url': self.url, 'parentname': self.parentname, 'hashes': hashes}, fp)
+
+    def clear(self):
+        """Remove the manifest, the next upload replaces all data."""
+        if os.path.isfile(self.path):
+            os.remove(self.path)
@@ -0,0 +1,478 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import copy
+import json
+import threading
+import time
+
+try:
+    from queue import Empty
+    from queue import Queue
+except ImportError:
+    from Queue import Empty
+    from Queue import Queue
+
+try:
+    from http.server import BaseHTTPRequestHandler
+    from http.server import HTTPServer
+    from socketserver import ThreadingMixIn
+    from urllib.parse import unquote
+    from urllib.parse import urlsplit
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler
+    from BaseHTTPServer import HTTPServer
+    from SocketServer import ThreadingMixIn
+    from urllib import unquote
+    from urlparse import urlsplit
+
+
+__all__ = [
+    'LocalDatabase',
+    'LocalReference',
+    'LocalResponse',
+    'LocalStream',
+    'LocalDatabaseServer',
+]
+
+
+def split_path(path):
+    """Split a database path into the names of its nodes.
+
+    Parameters
+    ----------
+    path : str or list
+        A path like ``'Design/node/3'``, or a list of names.
+
+    Returns
+    -------
+    list of str
+    """
+    if isinstance(path, (list, tuple)):
+        return [name for part in path for name in split_path(part)]
+    return [name for name in str(path).split('/') if name]
+
+
+def _normalize(value):
+    # the database stores no empty nodes and no arrays, like Firebase
+    if isinstance(value, (list, tuple)):
+        value = dict((str(i), v) for i, v in enumerate(value))
+    if isinstance(value, dict):
+        value = dict((str(k), _normalize(v)) for k, v in value.items())
+        value = dict((k, v) for k, v in value.items() if v is not None)
+        return value or None
+    return value
+
+
+def _sort_key(key):
+    return (0, int(key), '') if key.isdigit() else (1, 0, key)
+
+
+def _export(value):
+    # nodes with mostly integer keys are returned as arrays, like Firebase
+    if not isinstance(value, dict):
+        return copy.deepcopy(value)
+    if not value:
+        return None
+    keys = sorted(value, key=_sort_key)
+    if all(key.isdigit() for key in keys) and int(keys[-1]) < 2 * len(keys):
+        return [_export(value.get(str(i))) for i in range(int(keys[-1]) + 1)]
+    return dict((key, _export(value[key])) for key in keys)
+
+
+class LocalDatabase(object):
+    """An in-memory stand-in for the Firebase realtime database.
+
+    It implements the part of the pyrebase API the project uses, so it can be
+    passed as ``app`` to a :class:`RealtimeDatabase` to run without network,
+    or served on localhost with a :class:`LocalDatabaseServer`.
+    Data is stored and returned like Firebase does, i.e. without empty nodes
+    and with nodes of mostly integer keys returned as arrays.
+
+    Parameters
+    ----------
+    data : dict, optional
+        The initial content of the database.
+    latency : float, optional
+        A delay in seconds added to every request, to simulate a remote database.
+
+    Attributes
+    ----------
+    requests : int
+        The number of requests served, streams not included.
+
+    Examples
+    --------
+    >>> db = LocalDatabase({'Built Keys': {'3': '3'}})
+    >>> db.database().child('Built Keys').get().val()
+    {'3': '3'}
+    """
+
+    def __init__(self, data=None, latency=0.):
+        self.latency = latency
+        self.requests = 0
+        self._root = _normalize(data) or {}
+        self._streams = []
+        self._lock = threading.RLock()
+
+    def database(self):
+        """Return a reference to the root, like ``pyrebase.initialize_app(config).database()``.
+
+        Returns
+        -------
+        :class:`LocalReference`
+        """
+        return LocalReference(self)
+
+    def _request(self):
+        with self._lock:
+            self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _read(self, path):
+        node = self._root
+        for name in path:
+            if not isinstance(node, dict) or name not in node:
+                return None
+            node = node[name]
+        return node
+
+    def _write(self, path, value):
+        if not path:
+            self._root = value if isinstance(value, dict) else {}
+            return
+        parents = [self._root]
+        for name in path[:-1]:
+            child = parents[-1].get(name)
+            if not isinstance(child, dict):
+                child = parents[-1][name] = {}
+            parents.append(child)
+        if value is None:
+            parents[-1].pop(path[-1], None)
+        else:
+            parents[-1][path[-1]] = value
+        # remove the parents that became empty
+        for parent, name in reversed(list(zip(parents[:-1], path[:-1]))):
+            if parent[name]:
+                break
+            del parent[name]
+
+    def get(self, path):
+        """Read the value at a path.
+
+        Parameters
+        ----------
+        path : str or list
+
+        Returns
+        -------
+        object
+            The value, or ``None`` if there is no data.
+        """
+        self._request()
+        with self._lock:
+            return _export(self._read(split_path(path)))
+
+    def peek(self, path):
+        """Return the stored value at a path, without copying it and without counting a request.
+
+        The value must not be modified. Nodes are dictionaries, never arrays.
+
+        Parameters
+        ----------
+        path : str or list
+
+        Returns
+        -------
+        object
+            The value, or ``None`` if there is no data.
+        """
+        with self._lock:
+            return self._read(split_path(path))
+
+    def set(self, path, data):
+        """Replace the value at a path, ``None`` removes it.
+
+        Parameters
+        ----------
+        path : str or list
+        data : object
+        """
+        self._request()
+        path = split_path(path)
+        with self._lock:
+            self._write(path, _normalize(data))
+            self._notify(path, 'put', data)
+
+    def update(self, path, data):
+        """Write several children of a path at once.
+
+        Parameters
+        ----------
+        path : str or list
+        data : dict
+            The values by relative path, e.g. ``{'Built Keys/3': '3', 'Design/node/3/is_built': True}``.
+        """
+        self._request()
+        path = split_path(path)
+        with self._lock:
+            for key, value in data.items():
+                self._write(path + split_path(key), _normalize(value))
+            self._notify(path, 'patch', data)
+
+    def remove(self, path):
+        """Remove the value at a path.
+
+        Parameters
+        ----------
+        path : str or list
+        """
+        self.set(path, None)
+
+    def _notify(self, path, event, data):
+        for stream in list(self._streams):
+            depth = len(stream.path)
+            if path[:depth] == stream.path:
+                stream._put(event, '/' + '/'.join(path[depth:]), copy.deepcopy(data))
+            elif stream.path[:len(path)] == path:
+                stream._put('put', '/', _export(self._read(stream.path)))
+
+
+class LocalReference(object):
+    """A reference to a location of a :class:`LocalDatabase`, with the API of ``pyrebase.pyrebase.Database``.
+
+    Parameters
+    ----------
+    database : :class:`LocalDatabase`
+    path : list of str, optional
+    """
+
+    def __init__(self, database, path=None):
+        self.database = database
+        self.path = list(path or [])
+
+    def child(self, *args):
+        return LocalReference(self.database, self.path + split_path(list(args)))
+
+    def get(self, token=None):
+        key = self.path[-1] if self.path else None
+        return LocalResponse(self.database.get(self.path), key)
+
+    def set(self, data, token=None):
+        self.database.set(self.path, data)
+        return data
+
+    def update(self, data, token=None):
+        self.database.update(self.path, data)
+        return data
+
+    def remove(self, token=None):
+        self.database.remove(self.path)
+
+    def stream(self, stream_handler, token=None, stream_id=None):
+        return LocalStream(self.database, self.path, stream_handler, stream_id)
+
+
+class LocalResponse(object):
+    """The response of a read, with the API of ``pyrebase.pyrebase.PyreResponse``."""
+
+    def __init__(self, value, key=None):
+        self._value = value
+        self._key = key
+
+    def val(self):
+        return self._value
+
+    def key(self):
+        return self._key
+
+    def each(self):
+        if isinstance(self._value, dict):
+            return [LocalResponse(value, key) for key, value in self._value.items()]
+        if isinstance(self._value, list):
+            return [LocalResponse(value, i) for i, value in enumerate(self._value)]
+        return None
+
+
+class LocalStream(object):
+    """Calls a handler with the changes of a location of a :class:`LocalDatabase`.
+
+    Like a pyrebase stream, the handler is called in a background thread with
+    messages ``{'event': 'put' or 'patch', 'path': ..., 'data': ..., 'stream_id': ...}``.
+    The first message puts the current value at ``'/'``.
+    """
+
+    def __init__(self, database, path, stream_handler, stream_id=None):
+        self.database = database
+        self.path = split_path(path)
+        self.stream_handler = stream_handler
+        self.stream_id = stream_id
+        self._queue = Queue()
+        with database._lock:
+            database._streams.append(self)
+            self._put('put', '/', _export(database._read(self.path)))
+        self.thread = threading.Thread(target=self._run)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def _put(self, event, path, data):
+        self._queue.put({'event': event, 'path': path, 'data': data, 'stream_id': self.stream_id})
+
+    def _run(self):
+        while True:
+            message = self._queue.get()
+            if message is None:
+                break
+            self.stream_handler(message)
+
+    def close(self):
+        with self.database._lock:
+            if self in self.database._streams:
+                self.database._streams.remove(self)
+        self._queue.put(None)
+        return self
+
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class LocalDatabaseServer(object):
+    """Serves a :class:`LocalDatabase` on localhost with the REST and streaming protocol of Firebase.
+
+    Locations are read with ``GET``, replaced with ``PUT``, updated with ``PATCH``
+    and removed with ``DELETE`` on ``<url>/<path>.json``. A ``GET`` with the header
+    ``Accept: text/event-stream`` streams ``put`` and ``patch`` server-sent events.
+    Use ``RealtimeDatabase(url=server.url)`` to connect to it.
+
+    Parameters
+    ----------
+    database : :class:`LocalDatabase`, optional
+        The database to serve, an empty one by default.
+    host : str, optional
+    port : int, optional
+        The port, a free one by default.
+    keep_alive : float, optional
+        The interval in seconds of the keep-alive events of streams.
+
+    Examples
+    --------
+    >>> with LocalDatabaseServer() as server:  # doctest: +SKIP
+    ...     client = RealtimeDatabase(url=server.url)
+    """
+
+    def __init__(self, database=None, host='localhost', port=0, keep_alive=30.):
+        self.database = database or LocalDatabase()
+        self.keep_alive = keep_alive
+        self._stopped = threading.Event()
+        self._server = _ThreadingHTTPServer((host, port), self._handler_class())
+        self._thread = None
+
+    @property
+    def url(self):
+        """str : The URL of the database."""
+        host, port = self._server.server_address[:2]
+        return 'http://%s:%d' % (host, port)
+
+    def start(self):
+        """Start serving in a background thread."""
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._server.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving and close all streams."""
+        self._stopped.set()
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format, *args):
+                pass
+
+            def _path(self):
+                path = unquote(urlsplit(self.path).path)
+                if path.endswith('.json'):
+                    path = path[:-len('.json')]
+                return split_path(path)
+
+            def _body(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                return json.loads(self.rfile.read(length).decode('utf-8')) if length else None
+
+            def _respond(self, value, status=200):
+                body = json.dumps(value).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                if 'text/event-stream' in (self.headers.get('Accept') or ''):
+                    self._stream()
+                else:
+                    self._respond(server.database.get(self._path()))
+
+            def do_PUT(self):
+                data = self._body()
+                server.database.set(self._path(), data)
+                self._respond(data)
+
+            def do_PATCH(self):
+                data = self._body()
+                if not isinstance(data, dict):
+                    self._respond({'error': 'Invalid data; couldn\'t parse JSON object.'}, 400)
+                    return
+                server.database.update(self._path(), data)
+                self._respond(data)
+
+            def do_DELETE(self):
+                server.database.remove(self._path())
+                self._respond(None)
+
+            def _stream(self):
+                messages = Queue()
+                stream = LocalStream(server.database, self._path(), messages.put)
+                self.close_connection = True
+                try:
+                    self.send_response(200)
+                    self.send_header('Content-Type', 'text/event-stream')
+                    self.send_header('Cache-Control', 'no-cache')
+                    self.send_header('Connection', 'close')
+                    self.end_headers()
+                    while not server._stopped.is_set():
+                        try:
+                            message = messages.get(timeout=min(server.keep_alive, 0.5))
+                        except Empty:
+                            message = None
+                        if message is None:
+                            if time.time() - getattr(self, '_last_event', 0) < server.keep_alive:
+                                continue
+                            event, data = 'keep-alive', 'null'
+                        else:
+                            event, data = message['event'], json.dumps({'path': message['path'], 'data': message['data']})
+                        self.wfile.write(('event: %s\ndata: %s\n\n' % (event, data)).encode('utf-8'))
+                        self.wfile.flush()
+                        self._last_event = time.time()
+                except (IOError, OSError):
+                    pass
+                finally:
+                    stream.close()
+
+        return Handler
@@ -0,0 +1,214 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import threading
+import time
+
+from .local_database import LocalDatabase
+from .local_database import split_path
+
+
+__all__ = [
+    'DatabaseMirror',
+]
+
+
+class DatabaseMirror(object):
+    """Keeps an in-memory copy of locations of the realtime database, driven by its stream API.
+
+    One stream is opened per location. Its first event puts the whole content,
+    later ``put`` and ``patch`` events are applied as they arrive. A watchdog
+    reopens streams whose thread died or which were cancelled by the server,
+    and the new stream resyncs the location with its first event.
+    Until a location is synced, :meth:`covers` is ``False`` for it and the
+    getters of the :class:`RealtimeDatabase` fall back to a request.
+
+    Parameters
+    ----------
+    client : :class:`RealtimeDatabase`
+        The client to open the streams with.
+    paths : list of str, optional
+        The mirrored locations.
+    check_interval : float, optional
+        The interval in seconds of the watchdog.
+
+    Attributes
+    ----------
+    store : :class:`LocalDatabase`
+        The mirrored data.
+    reconnects : int
+        The number of streams reopened by the watchdog.
+
+    Examples
+    --------
+    >>> client = RealtimeDatabase()  # doctest: +SKIP
+    >>> mirror = client.mirror()  # doctest: +SKIP
+    >>> client.get_keys_built()  # doctest: +SKIP
+    """
+
+    def __init__(self, client, paths=('Built Keys', 'Users', 'Design'), check_interval=5.):
+        self.client = client
+        self.paths = ['/'.join(split_path(path)) for path in paths]
+        self.check_interval = check_interval
+        self.store = LocalDatabase()
+        self.reconnects = 0
+        self._streams = {}
+        self._generations = dict((path, 0) for path in self.paths)
+        self._synced = set()
+        self._cancelled = set()
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._watchdog = None
+
+    def start(self):
+        """Open the streams and start the watchdog."""
+        self._stopped.clear()
+        for path in self.paths:
+            self._connect(path)
+        self._watchdog = threading.Thread(target=self._watch)
+        self._watchdog.daemon = True
+        self._watchdog.start()
+        return self
+
+    def stop(self):
+        """Close the streams and stop the watchdog."""
+        self._stopped.set()
+        if self._watchdog:
+            self._watchdog.join()
+            self._watchdog = None
+        with self._lock:
+            streams = list(self._streams.values())
+            self._streams = {}
+            self._synced = set()
+        for stream in streams:
+            stream.close()
+
+    def wait(self, timeout=None):
+        """Wait until all locations are synced.
+
+        Parameters
+        ----------
+        timeout : float, optional
+            The maximum time to wait in seconds.
+
+        Returns
+        -------
+        bool
+            ``True`` if all locations are synced.
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        while len(self._synced) < len(self.paths):
+            if self._stopped.is_set() or (deadline is not None and time.time() > deadline):
+                return False
+            self._stopped.wait(0.01)
+        return True
+
+    def covers(self, path):
+        """Check if a location is mirrored and synced.
+
+        Parameters
+        ----------
+        path : str or list
+
+        Returns
+        -------
+        bool
+        """
+        path = split_path(path)
+        return any(path[:len(split_path(p))] == split_path(p) for p in list(self._synced))
+
+    def get(self, path):
+        """Return a copy of the mirrored value at a location.
+
+        Parameters
+        ----------
+        path : str or list
+
+        Returns
+        -------
+        object
+        """
+        return self.store.get(path)
+
+    def get_keys_built(self):
+        keys = self.store.peek('Built Keys') or {}
+        return [keys[key] for key in sorted(keys, key=lambda key: (not key.isdigit(), int(key) if key.isdigit() else key))]
+
+    def is_built(self, key):
+        """Check if a key is in ``Built Keys``.
+
+        Parameters
+        ----------
+        key : int or str
+
+        Returns
+        -------
+        bool
+        """
+        return self.store.peek(['Built Keys', key]) is not None
+
+    def get_users(self):
+        return list(self.store.peek('Users') or {})
+
+    def _connect(self, path):
+        with self._lock:
+            self._generations[path] += 1
+            generation = self._generations[path]
+            self._synced.discard(path)
+            self._cancelled.discard(path)
+            old = self._streams.pop(path, None)
+        if old is not None:
+            old.close()
+
+        def handler(message):
+            self._apply(path, generation, message)
+
+        stream = self.client.child(path).stream(handler, self.client.token)
+        with self._lock:
+            self._streams[path] = stream
+
+    def _apply(self, path, generation, message):
+        with self._lock:
+            # events of a replaced stream are dropped
+            if self._generations[path] != generation or self._stopped.is_set():
+                return
+            event = message.get('event')
+            target = split_path(path) + split_path(message.get('path') or '/')
+            if event == 'put':
+                self.store.set(target, message['data'])
+                if message['path'] == '/':
+                    self._synced.add(path)
+            elif event == 'patch':
+                self.store.update(target, message['data'])
+            elif event in ('cancel', 'auth_revoked'):
+                self._cancelled.add(path)
+                self._synced.discard(path)
+
+    def check(self):
+        """Reopen the streams which died or were cancelled.
+
+        Returns
+        -------
+        list of str
+            The reopened locations.
+        """
+        reopened = []
+        for path in self.paths:
+            with self._lock:
+                stream = self._streams.get(path)
+                thread = getattr(stream, 'thread', None)
+                broken = stream is None or path in self._cancelled or (thread is not None and not thread.is_alive())
+            if broken and not self._stopped.is_set():
+                self._connect(path)
+                self.reconnects += 1
+                reopened.append(path)
+        return reopened
+
+    def _watch(self):
+        while not self._stopped.wait(self.check_interval):
+            try:
+                self.check()
+            except Exception:
+                # the network is down, try again with the next check
+                pass
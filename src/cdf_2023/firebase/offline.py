@@ -0,0 +1,355 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import json
+import os
+import threading
+import time
+from collections import namedtuple
+
+from .local_database import split_path
+
+
+__all__ = [
+    'CachedValue',
+    'OfflineCache',
+]
+
+
+CachedValue = namedtuple('CachedValue', ['value', 'age'])
+CachedValue.__doc__ = """A value read through an :class:`OfflineCache`, with its age in seconds, ``0`` if it was just read from the database."""
+
+_UNKNOWN = object()
+
+
+def _descend(value, path):
+    for name in path:
+        if isinstance(value, list) and name.isdigit() and int(name) < len(value):
+            value = value[int(name)]
+        elif isinstance(value, dict) and name in value:
+            value = value[name]
+        else:
+            return None
+    return value
+
+
+def _replaced(value, path, new):
+    # returns a copy of value with new written at the relative path
+    if not path:
+        return new
+    if isinstance(value, list):
+        value = dict((str(i), v) for i, v in enumerate(value) if v is not None)
+    value = dict(value) if isinstance(value, dict) else {}
+    child = _replaced(value.get(path[0]), path[1:], new)
+    if child is None:
+        value.pop(path[0], None)
+    else:
+        value[path[0]] = child
+    return value or None
+
+
+def _default_path():
+    # the user cache directory, which does not depend on where the app is started
+    base = os.environ.get('LOCALAPPDATA') or os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'cdf_2023', 'cdf_cache.sqlite')
+
+
+def _applied(path, value, write_path, write_value):
+    # the value at path after a write, _UNKNOWN if the write does not touch it
+    names, write_names = split_path(path), split_path(write_path)
+    if write_names[:len(names)] == names:
+        return _replaced(value, write_names[len(names):], write_value)
+    if names[:len(write_names)] == write_names:
+        return _descend(write_value, names[len(write_names):])
+    return _UNKNOWN
+
+
+class OfflineCache(object):
+    """Keeps the app working while the realtime database cannot be reached.
+
+    Reads go to the database and are recorded in a SQLite file. If the database
+    cannot be reached, or the recorded value is younger than ``max_age``, the
+    recorded value is returned instead, with its age.
+
+    Writes are split into writes of single paths and queued in the file, so
+    they survive restarts, and the recorded values are updated right away.
+    Queued writes are replayed in order by a background thread, so writes do
+    not wait for the network, or by :meth:`replay`. Before a write is replayed,
+    the value in the database is compared with the value the write was based on.
+    If someone else changed it in the meantime, the conflict is recorded and
+    ``resolve(path, local, remote)`` decides which value is written,
+    the local one by default.
+
+    Parameters
+    ----------
+    client : :class:`RealtimeDatabase`
+        The client to read and write with.
+    path : str, optional
+        The path of the SQLite file. Defaults to ``cdf_2023/cdf_cache.sqlite``
+        in the cache directory of the user.
+    exceptions : tuple, optional
+        The exception types which signal that the database cannot be reached.
+    resolve : callable, optional
+        Returns the value to write on a conflict.
+    retry_interval : float, optional
+        The time in seconds after a failed request during which no request is
+        sent, so calls do not wait for timeouts while offline.
+    background : bool, optional
+        ``False`` to send queued writes only when :meth:`replay` is called.
+
+    Examples
+    --------
+    >>> from cdf_2023.firebase import LocalDatabase, RealtimeDatabase
+    >>> cache = OfflineCache(RealtimeDatabase(app=LocalDatabase()), ':memory:')
+    >>> cache.add_key_built(3)
+    >>> cache.get_keys_built()
+    ['3']
+    >>> cache.close()
+    """
+
+    def __init__(self, client, path=None, exceptions=(Exception, ), resolve=None, retry_interval=10., background=True):
+        import sqlite3
+
+        if path is None:
+            path = _default_path()
+            if not os.path.isdir(os.path.dirname(path)):
+                os.makedirs(os.path.dirname(path))
+
+        self.client = client
+        self.path = path
+        self.exceptions = exceptions
+        self.resolve = resolve or (lambda path, local, remote: local)
+        self.retry_interval = retry_interval
+        self._offline_since = None
+        self._lock = threading.RLock()
+        self._replay_lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        with self._db:
+            self._db.execute('CREATE TABLE IF NOT EXISTS reads (path TEXT PRIMARY KEY, value TEXT, time REAL)')
+            self._db.execute('CREATE TABLE IF NOT EXISTS writes (id INTEGER PRIMARY KEY AUTOINCREMENT, path TEXT, value TEXT, base TEXT, time REAL)')
+            self._db.execute('CREATE TABLE IF NOT EXISTS conflicts (id INTEGER PRIMARY KEY AUTOINCREMENT, path TEXT, local TEXT, remote TEXT, base TEXT, resolved TEXT, time REAL)')
+
+        self._closed = False
+        self._wake = threading.Event()
+        self._thread = None
+        if background:
+            self._thread = threading.Thread(target=self._run, name='OfflineCache replay')
+            self._thread.daemon = True
+            self._thread.start()
+            # writes queued before a restart
+            self._wake.set()
+
+    def close(self):
+        """Stop the background thread and close the SQLite file."""
+        self._closed = True
+        if self._thread:
+            self._wake.set()
+            self._thread.join()
+        self._db.close()
+
+    def _run(self):
+        timeout = None
+        while True:
+            self._wake.wait(timeout)
+            if self._closed:
+                return
+            self._wake.clear()
+            self.replay()
+            # retry while writes are left, at most as often as the requests are allowed
+            timeout = max(self.retry_interval, 0.1) if self.pending else None
+
+    @property
+    def online(self):
+        """bool : ``False`` if the last request failed less than ``retry_interval`` seconds ago."""
+        return self._offline_since is None or time.time() - self._offline_since > self.retry_interval
+
+    @property
+    def pending(self):
+        """int : The number of queued writes."""
+        with self._lock:
+            return self._db.execute('SELECT COUNT(*) FROM writes').fetchone()[0]
+
+    @property
+    def conflicts(self):
+        """list of dict : The recorded conflicts, oldest first."""
+        with self._lock:
+            rows = self._db.execute('SELECT path, local, remote, base, resolved, time FROM conflicts ORDER BY id').fetchall()
+        return [dict(path=path, local=json.loads(local), remote=json.loads(remote),
+                     base=json.loads(base) if base is not None else None, resolved=json.loads(resolved), time=t)
+                for path, local, remote, base, resolved, t in rows]
+
+    def _request(self, function, *args):
+        try:
+            result = function(*args)
+        except self.exceptions:
+            self._offline_since = time.time()
+            raise
+        self._offline_since = None
+        return result
+
+    def _remote(self, path):
+        return self._request(lambda: self.client.child(path).get(self.client.token).val())
+
+    def _record(self, path, value, t):
+        with self._lock, self._db:
+            self._db.execute('INSERT OR REPLACE INTO reads VALUES (?, ?, ?)', (path, json.dumps(value), t))
+
+    def _recorded(self, path):
+        # the recorded value at a path, also from a recorded ancestor, with its time
+        names = split_path(path)
+        with self._lock:
+            for i in range(len(names), -1, -1):
+                row = self._db.execute('SELECT value, time FROM reads WHERE path = ?', ('/'.join(names[:i]), )).fetchone()
+                if row:
+                    return _descend(json.loads(row[0]), names[i:]), row[1]
+        return _UNKNOWN, None
+
+    def get(self, path, max_age=None):
+        """Read the value at a path.
+
+        Parameters
+        ----------
+        path : str
+        max_age : float, optional
+            Return the recorded value without a request if it is younger.
+
+        Returns
+        -------
+        :class:`CachedValue`
+
+        Raises
+        ------
+        KeyError
+            If the database cannot be reached and the value was never read.
+        """
+        path = '/'.join(split_path(path))
+        value, t = self._recorded(path)
+        now = time.time()
+        if value is not _UNKNOWN and max_age is not None and now - t <= max_age:
+            return CachedValue(value, now - t)
+
+        if self.online:
+            try:
+                value = self._remote(path)
+            except self.exceptions:
+                pass
+            else:
+                # pending writes are not sent yet, but their values count
+                with self._lock:
+                    for write_path, write_value in self._db.execute('SELECT path, value FROM writes ORDER BY id').fetchall():
+                        applied = _applied(path, value, write_path, json.loads(write_value))
+                        if applied is not _UNKNOWN:
+                            value = applied
+                self._record(path, value, now)
+                return CachedValue(value, 0.)
+
+        if value is _UNKNOWN:
+            raise KeyError('%s was never read and the database cannot be reached.' % path)
+        return CachedValue(value, now - t)
+
+    def set(self, path, value):
+        """Queue the replacement of the value at a path, see :meth:`update`.
+
+        Parameters
+        ----------
+        path : str
+        value : object
+            The new value, ``None`` removes the value.
+        """
+        self.update('', {'/'.join(split_path(path)): value})
+
+    def remove(self, path):
+        self.set(path, None)
+
+    def update(self, path, data):
+        """Queue the update of several children of a path.
+
+        The background thread, if any, is woken to send the queued writes.
+
+        Parameters
+        ----------
+        path : str
+        data : dict
+            The values by relative path.
+        """
+        now = time.time()
+        with self._lock, self._db:
+            for key, value in data.items():
+                write_path = '/'.join(split_path([path, key]))
+                base, _ = self._recorded(write_path)
+                base = None if base is _UNKNOWN else json.dumps(base)
+                self._db.execute('INSERT INTO writes (path, value, base, time) VALUES (?, ?, ?, ?)',
+                                 (write_path, json.dumps(value), base, now))
+                self._update_records(write_path, value)
+        if self._thread:
+            self._wake.set()
+
+    def _update_records(self, path, value):
+        # only the records of the ancestors and of the descendants of the path change
+        names = split_path(path)
+        ancestors = ['/'.join(names[:i]) for i in range(len(names) + 1)]
+        rows = self._db.execute('SELECT path, value FROM reads WHERE path IN (%s)' % ', '.join('?' * len(ancestors)), ancestors).fetchall()
+        if path:
+            # '0' follows '/', the range of the primary key holds the paths starting with path + '/'
+            rows += self._db.execute('SELECT path, value FROM reads WHERE path > ? AND path < ?', (path + '/', path + '0')).fetchall()
+        else:
+            rows += self._db.execute("SELECT path, value FROM reads WHERE path != ''").fetchall()
+        for record_path, record_value in rows:
+            applied = _applied(record_path, json.loads(record_value), path, value)
+            if applied is not _UNKNOWN:
+                self._db.execute('UPDATE reads SET value = ? WHERE path = ?', (json.dumps(applied), record_path))
+
+    def replay(self):
+        """Send the queued writes in order, while the database can be reached.
+
+        Returns
+        -------
+        int
+            The number of sent writes.
+        """
+        if not self.online:
+            return 0
+        sent = 0
+        with self._replay_lock:
+            while True:
+                with self._lock:
+                    row = self._db.execute('SELECT id, path, value, base FROM writes ORDER BY id LIMIT 1').fetchone()
+                if not row:
+                    return sent
+                id, path, value, base = row
+                value = json.loads(value)
+                try:
+                    # without the value the write was based on, there is no conflict to check
+                    remote = self._remote(path) if base is not None else _UNKNOWN
+                    if base is not None and json.loads(base) != remote and remote != value:
+                        resolved = self.resolve(path, value, remote)
+                        with self._lock, self._db:
+                            self._db.execute('INSERT INTO conflicts (path, local, remote, base, resolved, time) VALUES (?, ?, ?, ?, ?, ?)',
+                                             (path, json.dumps(value), json.dumps(remote), base, json.dumps(resolved), time.time()))
+                        value = resolved
+                    if remote != value:
+                        self._request(lambda: self.client.child(path).set(value, self.client.token))
+                except self.exceptions:
+                    return sent
+                with self._lock, self._db:
+                    self._db.execute('DELETE FROM writes WHERE id = ?', (id, ))
+                    self._update_records(path, value)
+                sent += 1
+
+    def get_keys_built(self, max_age=None):
+        keys = self.get('Built Keys', max_age).value
+        return list(keys.values() if isinstance(keys, dict) else keys or [])
+
+    def add_key_built(self, new_key_built):
+        self.update('Built Keys', {str(new_key_built): str(new_key_built)})
+
+    def remove_key_built(self, key):
+        self.remove('Built Keys/%s' % key)
+
+    def update_robot_frame(self, index, robot_frame, frame):
+        self.set('Design/node/%s/%s' % (index, robot_frame), frame)
+
+    def set_qr_frames(self, json_fr):
+        with open(json_fr) as json_file:
+            self.set('QRFrames', json.load(json_file))
@@ -4,8 +4,31 @@ from __future__ import print_function
 
 
 import json
-import pyrebase
-import os
+import threading
+
+
+__all__ = [
+    'config',
+    'DEFAULT_CONFIG',
+    'RealtimeDatabase',
+    'get_client',
+    'set_client',
+    'stream_handler',
+    'set_json_data',
+    'sync_json_data',
+    'set_json_data_joints',
+    'set_qr_frames',
+    'get_keys_built',
+    'set_keys_built',
+    'remove_key_built',
+    'update_robot_frame',
+    'add_key_built',
+    'get_users',
+    'get_users_attribute',
+    'get_json_data',
+    'listen',
+    'close_stream',
+]
 
 
 config = {
@@ -19,11 +42,7 @@ config = {
     "measurementId": "G-RZ5BVHNGK8"
 }
 
-# initialize the connection to firebase
-firebase = pyrebase.initialize_app(config)
-
-# reference to firebase database
-db = firebase.database()
+DEFAULT_CONFIG = config
 
 
 def stream_handler(message):
@@ -32,100 +51,320 @@ def stream_handler(message):
     print(message["data"])
 
 
-def set_json_data(json_f, parentname, keys):
-    with open(json_f) as json_file:
-        json_data = json.load(json_file)
-        children = []
+class RealtimeDatabase(object):
+    """A client of the Firebase realtime database of the project.
+
+    Nothing is imported or connected when the client is created. The Firebase
+    app is initialized on the first call, and all later calls reuse its HTTP
+    session, so connections are kept alive between requests.
+
+    Parameters
+    ----------
+    config : dict, optional
+        The Firebase config. Defaults to the config of the cdf-project.
+    url : str, optional
+        The database URL, replaces ``databaseURL`` of the config,
+        e.g. the URL of a database emulator.
+    credentials : str or dict, optional
+        The path to a service account key file, or its content, for admin access.
+    token : str, optional
+        The id token of a signed in user, sent with every request.
+    app : object, optional
+        An initialized Firebase app to use instead, e.g. a :class:`LocalDatabase`
+        to work without network. To use a :class:`LocalDatabaseServer`, pass its ``url``.
+
+    Examples
+    --------
+    >>> client = RealtimeDatabase(url='http://localhost:9000')
+    >>> client.url
+    'http://localhost:9000'
+    """
+
+    def __init__(self, config=None, url=None, credentials=None, token=None, app=None):
+        self.config = dict(config or DEFAULT_CONFIG)
+        if url:
+            self.config['databaseURL'] = url
+        if credentials:
+            self.config['serviceAccount'] = credentials
+        self.token = token
+        self._app = app
+        self._mirror = None
+        self._lock = threading.Lock()
+
+    @property
+    def url(self):
+        """str : The URL of the database."""
+        return self.config['databaseURL']
+
+    @property
+    def app(self):
+        """:class:`pyrebase.pyrebase.Firebase` : The Firebase app, initialized on first access."""
+        if self._app is None:
+            with self._lock:
+                if self._app is None:
+                    import pyrebase
+                    self._app = pyrebase.initialize_app(self.config)
+        return self._app
+
+    def child(self, *path):
+        """Return a reference to a location in the database.
+
+        Every reference is a new object, so references can be used from
+        several threads, but they all share the session of the app.
+
+        Parameters
+        ----------
+        path : str
+            The names of the nodes from the root to the location.
+
+        Returns
+        -------
+        :class:`pyrebase.pyrebase.Database`
+        """
+        return self.app.database().child(*[str(name) for name in path])
+
+    def batch(self, flush_interval=0.5, max_size=500):
+        """Return a batch to collect writes and send them in a single request.
+
+        Parameters
+        ----------
+        flush_interval : float, optional
+            See :class:`WriteBatch`.
+        max_size : int, optional
+            See :class:`WriteBatch`.
+
+        Returns
+        -------
+        :class:`WriteBatch`
+        """
+        from .batch import WriteBatch
+
+        return WriteBatch(self, flush_interval, max_size)
+
+    def mirror(self, paths=('Built Keys', 'Users', 'Design'), check_interval=5.):
+        """Start mirroring locations of the database, the getters read them from memory once synced.
+
+        Parameters
+        ----------
+        paths : list of str, optional
+            See :class:`DatabaseMirror`.
+        check_interval : float, optional
+            See :class:`DatabaseMirror`.
+
+        Returns
+        -------
+        :class:`DatabaseMirror`
+            The started mirror, stop it with :meth:`DatabaseMirror.stop`.
+        """
+        from .mirror import DatabaseMirror
+
+        if self._mirror:
+            self._mirror.stop()
+        self._mirror = DatabaseMirror(self, paths, check_interval).start()
+        return self._mirror
+
+    def _mirrored(self, *path):
+        return self._mirror is not None and self._mirror.covers(list(path))
+
+    def set_json_data(self, json_f, parentname, keys):
+        with open(json_f) as json_file:
+            json_data = json.load(json_file)
+
+        # one request, replacing every child like a set per key would
+        self.child(parentname).update(dict((key, json_data[key]) for key in keys), self.token)
+
+    def sync_json_data(self, json_f, parentname, keys, manifest=None, max_size=1000):
+        """Upload the children of a json file which changed since the last upload.
+
+        Every entry of a child, e.g. every node of ``node``, is hashed and only
+        changed or removed entries are sent, in updates of at most ``max_size``
+        paths. The hashes are kept in a manifest next to the json file. Without
+        a manifest, the children are replaced entirely, like :meth:`set_json_data`.
+
+        Parameters
+        ----------
+        json_f : str
+            The path of the json file.
+        parentname : str
+            The location to upload to, e.g. ``'Design'``.
+        keys : list of str
+            The uploaded children, e.g. ``['node', 'edge']``.
+        manifest : :class:`DeltaManifest`, optional
+            The manifest, ``<name>_firebase_manifest.json`` next to the json file by default.
+        max_size : int, optional
+            The maximum number of paths per request.
+
+        Returns
+        -------
+        dict
+            The number of ``'changed'`` and ``'removed'`` paths.
+        """
+        from .delta import DeltaManifest
+        from .delta import json_delta
+
+        with open(json_f) as json_file:
+            json_data = json.load(json_file)
+
+        manifest = manifest or DeltaManifest.for_json(json_f, self.url, parentname)
+        update, hashes = json_delta(parentname, json_data, keys, manifest.load())
+
+        batch = self.batch(max_size=max_size)
+        for path, value in update.items():
+            batch.set(path, value)
+        batch.flush()
+        manifest.save(hashes)
+
+        removed = sum(1 for value in update.values() if value is None)
+        return {'changed': len(update) - removed, 'removed': removed}
+
+    def set_json_data_joints(self, json_f):
+        with open(json_f) as json_file:
+            json_data = json.load(json_file)
+
+        self.child("Joints").set(json_data, self.token)
+
+    def set_qr_frames(self, json_fr):
+        with open(json_fr) as json_file:
+            json_data = json.load(json_file)
+
+        self.child("QRFrames").set(json_data, self.token)
+
+    def get_keys_built(self):
+        if self._mirrored("Built Keys"):
+            return self._mirror.get_keys_built()
+        keys_built = []
+        keys = self.child("Built Keys").get(self.token)
+        if keys.each():
+            for key in keys.each():
+                keys_built.append(key.val())
+        return keys_built
+
+    def set_keys_built(self, keys):
+        data = {}
         for key in keys:
-            values = json_data[key]
-            children.append(values)
+            data[str(key)] = str(key)
+        self.child("Built Keys").set(data, self.token)
 
-    for child, key in zip(children, keys):
-        db.child(parentname).child(key).set(child)
+    def remove_key_built(self, key):
+        self.child("Built Keys", key).remove(self.token)
 
+    def update_robot_frame(self, index, robot_frame, frame):
+        self.child("Design", "node", index, robot_frame).set(frame, self.token)
 
-def set_json_data_joints(json_f):
-    with open(json_f) as json_file:
-        json_data = json.load(json_file)
+    def add_key_built(self, new_key_built):
+        self.child("Built Keys").update({str(new_key_built): str(new_key_built)}, self.token)
 
-    db.child("Joints").set(json_data)
+    def get_users(self):
+        if self._mirrored("Users"):
+            return self._mirror.get_users()
+        users_ids = []
+        users = self.child("Users").get(self.token)
+        for user in users.each():
+            users_ids.append(user.key())
+        return users_ids
 
+    def get_users_attribute(self, attribute):
+        users_attributes = []
+        users = self.child("user").get(self.token)
+        for user in users.each():
+            users_attributes.append(user.val()[attribute])
+        return users_attributes
+
+    def get_json_data(self, name, childname):
+        if self._mirrored(name, childname):
+            return self._mirror.get([name, childname])
+        data = self.child(name, childname).get(self.token)
+        if data.each():
+            json_data = {}
+            for d in data.each():
+                json_data[d.key()] = d.val()
+            return json_data
+        return data.val()
+
+    def listen(self, path="Built Keys", handler=stream_handler, stream_id=None):
+        """Call a handler with every change of a location, in a background thread.
+
+        Returns
+        -------
+        :class:`pyrebase.pyrebase.Stream`
+            The stream, see :func:`close_stream`.
+        """
+        return self.child(path).stream(handler, self.token, stream_id=stream_id)
+
+
+# ==============================================================================
+# Default client, used by the functions below, e.g. through a compas.rpc Proxy
+# ==============================================================================
+
+_client = None
+
+
+def get_client():
+    """Return the default client, creating it on first use."""
+    global _client
+    if _client is None:
+        _client = RealtimeDatabase()
+    return _client
 
-def set_qr_frames(json_fr):
-    with open(json_fr) as json_file:
-        json_data = json.load(json_file)
 
-    db.child("QRFrames").set(json_data)
+def set_client(client):
+    """Replace the default client, e.g. by ``RealtimeDatabase(url=emulator_url)``."""
+    global _client
+    _client = client
+
+
+def set_json_data(json_f, parentname, keys):
+    get_client().set_json_data(json_f, parentname, keys)
+
+
+def sync_json_data(json_f, parentname, keys):
+    return get_client().sync_json_data(json_f, parentname, keys)
+
+
+def set_json_data_joints(json_f):
+    get_client().set_json_data_joints(json_f)
+
+
+def set_qr_frames(json_fr):
+    get_client().set_qr_frames(json_fr)
 
 
 # get keys_built
 def get_keys_built():
-    keys_built = []
-    keys = db.child("Built Keys").get()
-    if keys.each():
-        for key in keys.each():
-            # print("key to built key ", key.key())
-            keys_built.append(key.val())
-    return keys_built
+    return get_client().get_keys_built()
 
 
 def set_keys_built(keys):
-    data = {}
-    for key in keys:
-        data[str(key)] = str(key)
-    db.child("Built Keys").set(data)
+    get_client().set_keys_built(keys)
 
 
 def remove_key_built(key):
-    db.child("Built Keys").child(str(key)).remove()
+    get_client().remove_key_built(key)
 
 
 def update_robot_frame(index, robot_frame, frame):
-    db.child("Design").child("node").child(str(index)).child(robot_frame).set(frame)
+    get_client().update_robot_frame(index, robot_frame, frame)
 
 
 def add_key_built(new_key_built):
-    db.child("Built Keys").update({str(new_key_built): str(new_key_built)})
+    get_client().add_key_built(new_key_built)
 
 
 # get users' ids
 def get_users():
-    users_ids = []
-    users = db.child("Users").get()
-    for user in users.each():
-        print(user.key())
-        users_ids.append(user.key())
-        # print("Selected Key is ", user.val()["selectedKey"])
-        # print("Selected by user Nr.", user.val()["userID"])
-    return users_ids
+    return get_client().get_users()
 
 
 def get_users_attribute(attribute):
-    users_attributes = []
-    users = db.child("user").get()
-    for user in users.each():
-        users_attributes.append(user.val()[attribute])
-    return users_attributes
+    return get_client().get_users_attribute(attribute)
 
 
 def get_json_data(name, childname):
-    json_data = {}
-    data = db.child(name).child(childname).get()
-    if data.each():
-        for d in data.each():
-            json_data[d.key()] = d.val()
-        return json_data
-    else:
-        dt = db.child(name).child(childname).get().val()
-        return dt
-
+    return get_client().get_json_data(name, childname)
 
-def listen():
-    pass
-    # my_stream = db.child("Built Keys").stream(stream_handler)
 
-# add a stream_id for multiple streams
-# my_stream = db.child("posts").stream(stream_handler, stream_id="new_post")
+def listen(path="Built Keys", handler=stream_handler, stream_id=None):
+    return get_client().listen(path, handler, stream_id)
 
 
 def close_stream(my_stream):
@@ -137,7 +376,6 @@ if __name__ == "__main__":
     # add_key_built(4)
     # remove_key_built(10)
     print(get_keys_built())
-    # my_stream = db.child("Built Keys").stream(stream_handler)
-    # my_stream = db.child("Users").stream(stream_handler)
+    # my_stream = listen("Users")
     # close_stream(my_stream)
     # remove_key_built(17)
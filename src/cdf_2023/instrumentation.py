@@ -0,0 +1,248 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import functools
+import json
+import math
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+
+__all__ = [
+    'Profiler',
+    'PROFILER',
+    'timed',
+    'section',
+]
+
+
+_timer = getattr(time, 'perf_counter', time.time)
+# the number of memory blocks allocated by the interpreter, not available in IronPython
+_blocks = getattr(sys, 'getallocatedblocks', None)
+
+
+def _percentile(values, q):
+    # nearest rank of sorted values
+    return values[max(0, int(math.ceil(q / 100. * len(values))) - 1)]
+
+
+class Profiler(object):
+    """Records the timings of instrumented functions and sections.
+
+    Functions are instrumented with :meth:`timed`, blocks of code with
+    :meth:`section`. While the profiler is disabled, they only check
+    :attr:`enabled` and call through. While it is enabled, every call records
+    its duration, the net number of memory blocks it allocated, and where it
+    was called from, so the time spent in nested calls can be exported as a
+    flame graph.
+
+    Parameters
+    ----------
+    enabled : bool, optional
+        ``True`` to start recording right away.
+    allocations : bool, optional
+        ``False`` to skip counting allocations.
+
+    Examples
+    --------
+    >>> profiler = Profiler(enabled=True)
+    >>> @profiler.timed('square')
+    ... def square(x):
+    ...     return x * x
+    >>> with profiler.section('loop'):
+    ...     values = [square(x) for x in range(3)]
+    >>> profiler.stats()['square']['count']
+    3
+    >>> sorted(profiler.stacks())
+    [('loop',), ('loop', 'square')]
+    """
+
+    def __init__(self, enabled=False, allocations=True):
+        self.enabled = enabled
+        self.allocations = allocations and _blocks is not None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.reset()
+
+    def enable(self):
+        """Start recording."""
+        self.enabled = True
+
+    def disable(self):
+        """Stop recording, the records are kept."""
+        self.enabled = False
+
+    def reset(self):
+        """Remove all records."""
+        with self._lock:
+            self._durations = {}
+            self._allocations = {}
+            self._stacks = {}
+
+    def _stack(self):
+        # the open calls of the current thread, as [name, time spent in nested calls]
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _start(self, name):
+        self._stack().append([name, 0.])
+        return _timer(), _blocks() if self.allocations else 0
+
+    def _stop(self, start, blocks):
+        duration = _timer() - start
+        allocated = _blocks() - blocks if self.allocations else 0
+        stack = self._stack()
+        name, nested = stack.pop()
+        path = tuple(call[0] for call in stack) + (name, )
+        if stack:
+            stack[-1][1] += duration
+        with self._lock:
+            self._durations.setdefault(name, []).append(duration)
+            self._allocations[name] = self._allocations.get(name, 0) + allocated
+            self._stacks[path] = self._stacks.get(path, 0.) + duration - nested
+
+    @contextmanager
+    def section(self, name):
+        """Record the time spent in a block of code, in a ``with`` statement.
+
+        Parameters
+        ----------
+        name : str
+        """
+        if not self.enabled:
+            yield
+            return
+        start, blocks = self._start(name)
+        try:
+            yield
+        finally:
+            self._stop(start, blocks)
+
+    def timed(self, name=None):
+        """Decorator recording the calls of a function.
+
+        Parameters
+        ----------
+        name : str, optional
+            The name of the records, defaults to the name of the function.
+        """
+        def decorator(function):
+            label = name or function.__name__
+
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return function(*args, **kwargs)
+                start, blocks = self._start(label)
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    self._stop(start, blocks)
+
+            return wrapper
+        return decorator
+
+    def stats(self):
+        """Return the statistics of every recorded name.
+
+        Returns
+        -------
+        dict
+            By name, the ``count`` of calls, the ``total``, ``mean``, ``min``,
+            ``max``, ``p50``, ``p90`` and ``p99`` durations in seconds, and the
+            net number of memory blocks the calls allocated, ``allocations``,
+            including nested calls. The allocations are ``0`` if they are not counted.
+        """
+        with self._lock:
+            records = [(name, sorted(durations), self._allocations[name]) for name, durations in self._durations.items()]
+        stats = {}
+        for name, durations, allocations in records:
+            total = sum(durations)
+            stats[name] = {
+                'count': len(durations),
+                'total': total,
+                'mean': total / len(durations),
+                'min': durations[0],
+                'max': durations[-1],
+                'p50': _percentile(durations, 50),
+                'p90': _percentile(durations, 90),
+                'p99': _percentile(durations, 99),
+                'allocations': allocations,
+            }
+        return stats
+
+    def stacks(self):
+        """Return the time spent in every call path, without nested calls.
+
+        Returns
+        -------
+        dict
+            The time in seconds by tuple of names, from the outermost call.
+        """
+        with self._lock:
+            return dict(self._stacks)
+
+    def report(self):
+        """Return the statistics as a table, the most expensive names first.
+
+        Returns
+        -------
+        str
+        """
+        stats = self.stats()
+        lines = ['%-48s %8s %10s %10s %10s %10s %12s' % ('name', 'count', 'total [s]', 'mean [ms]', 'p90 [ms]', 'max [ms]', 'allocations')]
+        for name in sorted(stats, key=lambda name: -stats[name]['total']):
+            s = stats[name]
+            lines.append('%-48s %8d %10.3f %10.3f %10.3f %10.3f %12d' % (name, s['count'], s['total'], s['mean'] * 1e3,
+                                                                       s['p90'] * 1e3, s['max'] * 1e3, s['allocations']))
+        return '\n'.join(lines)
+
+    def to_json(self, filepath, pretty=False):
+        """Write the statistics and the call paths to a json file.
+
+        Parameters
+        ----------
+        filepath : str
+        pretty : bool, optional
+        """
+        data = {
+            'stats': self.stats(),
+            'stacks': [{'stack': list(path), 'self': value} for path, value in sorted(self.stacks().items())],
+        }
+        with open(filepath, 'w') as fp:
+            json.dump(data, fp, sort_keys=True, indent=4 if pretty else None)
+
+    def to_folded(self, filepath):
+        """Write the call paths in the folded format of flame graph tools.
+
+        Every line holds a call path, separated by ``;``, and the time spent
+        in it without nested calls, in microseconds. The file can be opened with
+        ``flamegraph.pl``, speedscope or inferno.
+
+        Parameters
+        ----------
+        filepath : str
+        """
+        with open(filepath, 'w') as fp:
+            for path, value in sorted(self.stacks().items()):
+                fp.write('%s %d\n' % (';'.join(path), int(round(value * 1e6))))
+
+
+PROFILER = Profiler(enabled=bool(os.environ.get('CDF_PROFILE')))
+"""The profiler of the instrumented functions of the package, enabled by the ``CDF_PROFILE`` environment variable."""
+
+
+def timed(name=None):
+    """Decorator recording the calls of a function with :data:`PROFILER`."""
+    return PROFILER.timed(name)
+
+
+def section(name):
+    """Record a block of code with :data:`PROFILER`, in a ``with`` statement."""
+    return PROFILER.section(name)
@@ -0,0 +1,11 @@
+import compas
+
+from .scheduler import PlanningBackend, RosPlanningBackend, MockPlanningBackend
+from .scheduler import PlanningResult, PlanningScheduler
+from .policy import PlannerBudget, PlanningAttempt, PlanningError, PlanningPolicy
+from .policy import DEFAULT_BUDGETS
+from .scene import SceneSync
+
+if not compas.IPY:
+    from .trajectory_numpy import trajectory_arrays_numpy, joint_limits_numpy
+    from .trajectory_numpy import trajectory_metrics_numpy, trajectory_report_numpy
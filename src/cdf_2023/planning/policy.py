@@ -0,0 +1,261 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import threading
+import time
+
+
+__all__ = [
+    'PlannerBudget',
+    'PlanningAttempt',
+    'PlanningError',
+    'PlanningPolicy',
+    'DEFAULT_BUDGETS',
+]
+
+
+class PlannerBudget(object):
+    """A planner together with the budget it may spend on a request.
+
+    Parameters
+    ----------
+    planner_id : str, optional
+        The name of the OMPL planner, e.g. ``'RRTConnect'``.
+    num_planning_attempts : int, optional
+        The number of planning attempts MoveIt runs for one request.
+    allowed_planning_time : float, optional
+        The time in seconds MoveIt may spend on one request.
+    """
+
+    def __init__(self, planner_id='RRTConnect', num_planning_attempts=1, allowed_planning_time=1.):
+        self.planner_id = planner_id
+        self.num_planning_attempts = num_planning_attempts
+        self.allowed_planning_time = allowed_planning_time
+
+    @property
+    def name(self):
+        """str : A readable identifier of the budget."""
+        return '{}/{}x{}s'.format(self.planner_id, self.num_planning_attempts, self.allowed_planning_time)
+
+    @property
+    def options(self):
+        """dict : The planner options to pass to ``robot.plan_motion``."""
+        return dict(planner_id=self.planner_id,
+                    num_planning_attempts=self.num_planning_attempts,
+                    allowed_planning_time=self.allowed_planning_time)
+
+    def __repr__(self):
+        return 'PlannerBudget({!r}, {!r}, {!r})'.format(self.planner_id, self.num_planning_attempts, self.allowed_planning_time)
+
+
+DEFAULT_BUDGETS = [
+    PlannerBudget('RRTConnect', 1, 1.),
+    PlannerBudget('RRTConnect', 4, 3.),
+    PlannerBudget('BiTRRT', 10, 5.),
+    PlannerBudget('RRTConnect', 20, 10.),
+]
+
+
+class PlanningAttempt(object):
+    """The record of a single call to the planner.
+
+    Attributes
+    ----------
+    key : hashable
+        The identifier of the element.
+    budget : :class:`PlannerBudget`
+        The budget the planner was called with.
+    time : float
+        The time in seconds the call took.
+    success : bool
+        ``True`` if the call returned a complete trajectory.
+    message : str
+        The reason of the failure, if any.
+    """
+
+    def __init__(self, key, budget, time, success, message=None):
+        self.key = key
+        self.budget = budget
+        self.time = time
+        self.success = success
+        self.message = message
+
+    @property
+    def data(self):
+        """dict : The attempt as a json-serializable dictionary."""
+        return dict(budget=self.budget.name, time=self.time, success=self.success, message=self.message)
+
+
+class PlanningError(Exception):
+    """Raised if all budgets of a :class:`PlanningPolicy` failed on an element.
+
+    Attributes
+    ----------
+    attempts : list of :class:`PlanningAttempt`
+        The failed attempts.
+    """
+
+    def __init__(self, message, attempts=None):
+        super(PlanningError, self).__init__(message)
+        self.attempts = attempts or []
+
+
+class PlanningPolicy(object):
+    """Decides which planner and budget to try next while placing elements.
+
+    Budgets are tried in the order of their expected cost to find a plan,
+    ``mean time / success rate``, estimated from all previous attempts.
+    Without any data, this is the order of the allowed planning time, i.e.
+    cheap configurations first. Escalation stops after every budget was tried
+    ``retries`` times, which bounds the time lost on elements that never succeed.
+
+    The policy can be shared by the workers of a :class:`PlanningScheduler`.
+
+    Parameters
+    ----------
+    budgets : list of :class:`PlannerBudget`, optional
+        The budgets to choose from. Defaults to :data:`DEFAULT_BUDGETS`.
+    retries : int, optional
+        The number of attempts per budget and element.
+    exceptions : tuple, optional
+        The exception types which signal a planning failure, e.g. ``(BackendError, )``.
+        Other exceptions are not caught.
+
+    Attributes
+    ----------
+    attempts : dict
+        The list of :class:`PlanningAttempt` of every planned element.
+    """
+
+    def __init__(self, budgets=None, retries=1, exceptions=(Exception, )):
+        self.budgets = list(budgets or DEFAULT_BUDGETS)
+        self.retries = retries
+        self.exceptions = exceptions
+        self.attempts = {}
+        self._lock = threading.RLock()
+
+    def expected_cost(self, budget):
+        """Estimate the time needed to find a plan with a budget.
+
+        Parameters
+        ----------
+        budget : :class:`PlannerBudget`
+
+        Returns
+        -------
+        float
+            The expected time in seconds.
+        """
+        with self._lock:
+            attempts = [a for key_attempts in self.attempts.values() for a in key_attempts if a.budget is budget]
+
+        if attempts:
+            mean_time = sum(a.time for a in attempts) / len(attempts)
+        else:
+            mean_time = budget.allowed_planning_time
+        # Laplace smoothing keeps untested budgets at a success rate of 0.5
+        success_rate = (sum(1 for a in attempts if a.success) + 1.) / (len(attempts) + 2.)
+        return mean_time / success_rate
+
+    def ordered_budgets(self):
+        """Return the budgets in the order they are tried for the next element.
+
+        Returns
+        -------
+        list of :class:`PlannerBudget`
+        """
+        costs = [(self.expected_cost(budget), i) for i, budget in enumerate(self.budgets)]
+        return [self.budgets[i] for _, i in sorted(costs)]
+
+    def plan(self, key, plan_function):
+        """Plan an element, escalating the budget until a plan is found.
+
+        Parameters
+        ----------
+        key : hashable
+            The identifier of the element.
+        plan_function : callable
+            Called as ``plan_function(budget)``, returns a trajectory.
+
+        Returns
+        -------
+        :class:`compas_fab.robots.JointTrajectory`
+
+        Raises
+        ------
+        :class:`PlanningError`
+            If none of the budgets found a complete trajectory.
+        """
+        with self._lock:
+            self.attempts[key] = []
+
+        for budget in self.ordered_budgets():
+            for _ in range(self.retries):
+                start = time.time()
+                try:
+                    trajectory = plan_function(budget)
+                    # only cartesian paths report the fraction of the path that was planned
+                    fraction = getattr(trajectory, 'fraction', None)
+                    if fraction is not None and fraction < 1:
+                        message = 'Incomplete path, fraction is %.3f.' % fraction
+                    else:
+                        message = None
+                except self.exceptions as e:
+                    trajectory, message = None, str(e) or e.__class__.__name__
+
+                attempt = PlanningAttempt(key, budget, time.time() - start, message is None, message)
+                with self._lock:
+                    self.attempts[key].append(attempt)
+
+                if attempt.success:
+                    return trajectory
+
+        raise PlanningError('No plan found for element %s with any budget.' % key, self.attempts[key])
+
+    def element_statistics(self, key):
+        """Summarize the attempts to plan an element.
+
+        Parameters
+        ----------
+        key : hashable
+            The identifier of the element.
+
+        Returns
+        -------
+        dict
+            The number of attempts, the total time, whether it succeeded,
+            the successful budget and all attempts.
+        """
+        with self._lock:
+            attempts = list(self.attempts.get(key, []))
+        successful = [a for a in attempts if a.success]
+        return dict(attempts=len(attempts),
+                    time=sum(a.time for a in attempts),
+                    success=bool(successful),
+                    budget=successful[0].budget.name if successful else None,
+                    history=[a.data for a in attempts])
+
+    def statistics(self):
+        """Summarize all attempts, per element and per budget.
+
+        Returns
+        -------
+        dict
+            A json-serializable dictionary with the keys ``'elements'`` and ``'budgets'``.
+        """
+        with self._lock:
+            keys = list(self.attempts)
+        elements = {str(key): self.element_statistics(key) for key in keys}
+
+        budgets = []
+        for budget in self.budgets:
+            with self._lock:
+                attempts = [a for key_attempts in self.attempts.values() for a in key_attempts if a.budget is budget]
+            budgets.append(dict(budget=budget.name,
+                                attempts=len(attempts),
+                                successes=sum(1 for a in attempts if a.success),
+                                time=sum(a.time for a in attempts),
+                                expected_cost=self.expected_cost(budget)))
+
+        return dict(elements=elements, budgets=budgets)
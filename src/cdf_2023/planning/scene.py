@@ -0,0 +1,246 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import math
+import re
+
+from ..instrumentation import timed
+
+
+__all__ = [
+    'SceneSync',
+]
+
+
+def _collision_mesh(level):
+    return lambda element: element.collision_mesh(level)
+
+
+class SceneSync(object):
+    """Keeps the static assembly geometry of a planning scene in sync, in batches.
+
+    Elements are grouped into cubic cells of a spatial grid. The collision
+    geometry of all elements in a cell is merged into one collision object, so
+    the number of collision objects in the scene is bounded by the number of
+    occupied cells instead of the number of elements. Changes are buffered and
+    :meth:`flush` sends only the cells that changed since the last flush, in a
+    single update. Elements added to a cell that was sent before are appended
+    to its collision object, so a flush does not grow with the size of the
+    cells. Only cells with removed or updated elements are sent again whole.
+
+    Parameters
+    ----------
+    apply_function : callable
+        Called as ``apply_function(added, removed, appended)`` once per flush,
+        with a dictionary of collision object ids and merged meshes to add or
+        replace, a list of collision object ids to remove, and a dictionary of
+        collision object ids and merged meshes to append to existing objects.
+    cell_size : float, optional
+        The edge length of a grid cell.
+    name : str, optional
+        The prefix of the ids of the collision objects.
+    geometry : callable or str, optional
+        Returns the collision mesh of an element, or the level of detail passed
+        to :meth:`Element.collision_mesh`, e.g. ``'hull'``. Defaults to ``element.mesh``.
+    ids_function : callable, optional
+        Returns the ids of the collision objects in the scene. :meth:`clear`
+        then also removes the objects of this sync left by earlier runs, the
+        cells ``<name>_<i>_<j>_<k>`` and ``<name>`` itself.
+
+    Examples
+    --------
+    >>> sync = SceneSync(lambda added, removed, appended: None)
+    >>> sync.cell_id((0.2, 1.7, -0.1))
+    'assembly_0_3_-1'
+    """
+
+    def __init__(self, apply_function, cell_size=0.5, name='assembly', geometry=None, ids_function=None):
+        self.apply_function = apply_function
+        self.ids_function = ids_function
+        self.cell_size = cell_size
+        self.name = name
+        if isinstance(geometry, str):
+            geometry = _collision_mesh(geometry)
+        self.geometry = geometry or (lambda element: element.mesh)
+        self._cells = {}
+        self._element_cell = {}
+        self._dirty = set()
+        self._appended = {}
+        self._sent = set()
+        self._stale = set()
+
+    @classmethod
+    def from_client(cls, client, **kwargs):
+        """Construct a scene sync which applies its updates to a MoveIt planning scene.
+
+        Parameters
+        ----------
+        client : :class:`compas_fab.backends.RosClient`
+            A running client.
+        kwargs
+            The other parameters of :class:`SceneSync`.
+
+        Returns
+        -------
+        :class:`SceneSync`
+        """
+        from compas.utilities import await_callback
+        from compas_fab.robots import CollisionMesh
+        from compas_fab.backends.ros.backend_features.move_it_add_collision_mesh import MoveItAddCollisionMesh
+        from compas_fab.backends.ros.messages import CollisionObject
+        from compas_fab.backends.ros.messages import GetPlanningSceneRequest
+        from compas_fab.backends.ros.messages import PlanningScene
+        from compas_fab.backends.ros.messages import PlanningSceneComponents
+        from compas_fab.backends.ros.messages import PlanningSceneWorld
+        from roslibpy import Service
+        from roslibpy import ServiceRequest
+
+        def apply_scene_diff(callback, errback, collision_objects):
+            world = PlanningSceneWorld(collision_objects=collision_objects)
+            request = PlanningScene(world=world, is_diff=True).to_request(client.ros_distro)
+            MoveItAddCollisionMesh.APPLY_PLANNING_SCENE(client, request, callback, errback)
+
+        def apply_function(added, removed, appended):
+            collision_objects = []
+            for id in removed:
+                co = CollisionObject()
+                co.id = id
+                co.operation = CollisionObject.REMOVE
+                collision_objects.append(co)
+            # ADD replaces an existing object with the same id
+            for operation, meshes in ((CollisionObject.ADD, added), (CollisionObject.APPEND, appended)):
+                for id, mesh in meshes.items():
+                    co = CollisionObject.from_collision_mesh(CollisionMesh(mesh, id))
+                    co.operation = operation
+                    collision_objects.append(co)
+            await_callback(apply_scene_diff, errback_name='errback', collision_objects=collision_objects)
+
+        def get_object_names(callback, errback):
+            # only the names, not the geometry of the world, read from the raw response
+            request = GetPlanningSceneRequest(PlanningSceneComponents(PlanningSceneComponents.WORLD_OBJECT_NAMES))
+            service = Service(client, '/get_planning_scene', 'moveit_msgs/GetPlanningScene')
+            service.call(ServiceRequest(request.msg), callback=callback, errback=errback)
+
+        def ids_function():
+            response = dict(await_callback(get_object_names, errback_name='errback'))
+            return [co['id'] for co in response['scene']['world']['collision_objects']]
+
+        kwargs.setdefault('ids_function', ids_function)
+        return cls(apply_function, **kwargs)
+
+    def cell(self, point):
+        """Return the grid cell of a point.
+
+        Parameters
+        ----------
+        point : :class:`compas.geometry.Point` or list of float
+
+        Returns
+        -------
+        tuple of int
+        """
+        return tuple(int(math.floor(c / self.cell_size)) for c in point[:3])
+
+    def cell_id(self, point):
+        """Return the id of the collision object of the cell containing a point.
+
+        Parameters
+        ----------
+        point : :class:`compas.geometry.Point` or list of float
+
+        Returns
+        -------
+        str
+        """
+        return '_'.join([self.name] + [str(i) for i in self.cell(point)])
+
+    @property
+    def keys(self):
+        """list : The keys of all elements in the scene, including pending ones."""
+        return list(self._element_cell)
+
+    @property
+    def pending(self):
+        """bool : ``True`` if there are changes which were not flushed yet."""
+        return bool(self._dirty or self._appended or self._stale)
+
+    def add_element(self, key, element):
+        """Add an element, or update it if it was added before.
+
+        Parameters
+        ----------
+        key : hashable
+            The identifier of the element.
+        element : :class:`Element`
+            The element.
+        """
+        self.remove_element(key)
+        cell_id = self.cell_id(element.frame.point)
+        self._cells.setdefault(cell_id, {})[key] = self.geometry(element)
+        self._element_cell[key] = cell_id
+        if cell_id in self._sent and cell_id not in self._dirty:
+            self._appended.setdefault(cell_id, []).append(key)
+        else:
+            self._dirty.add(cell_id)
+
+    def remove_element(self, key):
+        """Remove an element, if it is in the scene.
+
+        Parameters
+        ----------
+        key : hashable
+            The identifier of the element.
+        """
+        cell_id = self._element_cell.pop(key, None)
+        if cell_id is None:
+            return
+        del self._cells[cell_id][key]
+        # the object is replaced, with the elements which are appended to it
+        self._appended.pop(cell_id, None)
+        self._dirty.add(cell_id)
+
+    def clear(self):
+        """Remove all elements, and the objects of earlier runs if ``ids_function`` is given."""
+        for key in self.keys:
+            self.remove_element(key)
+        if self.ids_function:
+            # the cells and the single object of the whole assembly, not other objects with the same prefix
+            pattern = re.compile(r'%s(_-?\d+){3}$' % re.escape(self.name))
+            self._stale.update(id for id in self.ids_function() if id == self.name or pattern.match(id))
+
+    @timed('SceneSync.flush')
+    def flush(self):
+        """Send all pending changes in a single update.
+
+        Returns
+        -------
+        tuple
+            The ids of the added or replaced, of the removed and of the appended collision objects.
+        """
+        from compas.datastructures import meshes_join
+
+        added = {}
+        removed = []
+        for cell_id in sorted(self._dirty):
+            meshes = list(self._cells.get(cell_id, {}).values())
+            if meshes:
+                added[cell_id] = meshes_join(meshes)
+            else:
+                self._cells.pop(cell_id, None)
+                if cell_id in self._sent or cell_id in self._stale:
+                    removed.append(cell_id)
+        appended = dict((cell_id, meshes_join([self._cells[cell_id][key] for key in keys]))
+                        for cell_id, keys in self._appended.items())
+        # added objects replace the stale ones with the same id
+        removed += sorted(self._stale.difference(added, removed))
+
+        if added or removed or appended:
+            self.apply_function(added, removed, appended)
+
+        self._sent.update(added)
+        self._sent.difference_update(removed)
+        self._dirty = set()
+        self._appended = {}
+        self._stale = set()
+        return sorted(added), removed, sorted(appended)
@@ -0,0 +1,325 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import threading
+import time
+
+from .scene import SceneSync
+
+try:
+    from Queue import Queue, Empty
+except ImportError:
+    from queue import Queue, Empty
+
+
+__all__ = [
+    'PlanningBackend',
+    'RosPlanningBackend',
+    'MockPlanningBackend',
+    'PlanningResult',
+    'PlanningScheduler',
+]
+
+
+class PlanningBackend(object):
+    """Base class of a planner the :class:`PlanningScheduler` dispatches requests to.
+
+    Every backend owns its own planning scene. Before a request is planned,
+    the scheduler brings that scene to the *predicted* state of the request:
+    the elements placed before planning started plus all elements preceding
+    the request in the building sequence.
+
+    Attributes
+    ----------
+    name : str
+        The name of the backend, reported in the planning results.
+    scene_keys : list
+        The keys of the elements added to the backend's planning scene, in order.
+    """
+
+    def __init__(self, name=None):
+        self.name = name or self.__class__.__name__
+        self.scene_keys = []
+
+    def reset(self):
+        """Remove all assembly elements from the backend's planning scene."""
+        self.scene_keys = []
+
+    def add_element(self, key, element):
+        """Add a placed element to the backend's planning scene.
+
+        Parameters
+        ----------
+        key : hashable
+            The identifier of the element.
+        element : :class:`Element`
+            The element.
+        """
+        raise NotImplementedError
+
+    def flush(self):
+        """Send the elements added since the last flush to the planning scene."""
+        pass
+
+    def plan(self, key, element):
+        """Plan the motion to place an element.
+
+        Parameters
+        ----------
+        key : hashable
+            The identifier of the element.
+        element : :class:`Element`
+            The element.
+
+        Returns
+        -------
+        :class:`compas_fab.robots.JointTrajectory`
+
+        Raises
+        ------
+        Exception
+            If no motion could be planned.
+        """
+        raise NotImplementedError
+
+    def sync_scene(self, assembly, keys):
+        """Bring the planning scene to the given list of placed elements.
+
+        Elements can only be appended, the scene of a backend is never rolled back.
+
+        Parameters
+        ----------
+        assembly : :class:`Assembly`
+            The assembly the elements belong to.
+        keys : list
+            The keys of all elements which should be in the scene, in building order.
+        """
+        if self.scene_keys != keys[:len(self.scene_keys)]:
+            raise ValueError('The planning scene of backend %s cannot be rolled back.' % self.name)
+
+        for key in keys[len(self.scene_keys):]:
+            self.add_element(key, assembly.element(key))
+            self.scene_keys.append(key)
+        self.flush()
+
+
+class RosPlanningBackend(PlanningBackend):
+    """Planning backend running on a ROS/MoveIt container.
+
+    The placed elements are merged into a few collision objects per spatial
+    cell and sent in one scene update per request, see :class:`SceneSync`.
+    :meth:`reset` removes all collision objects of the assembly from the
+    scene, also those left by other processes.
+
+    Parameters
+    ----------
+    robot : :class:`compas_fab.robots.Robot`
+        A robot loaded from a running :class:`compas_fab.backends.RosClient`.
+        Every backend needs its own client.
+    plan_function : callable
+        Called as ``plan_function(robot, key, element)`` to plan the motion of an element.
+    name : str, optional
+        The name of the backend.
+    cell_size : float, optional
+        The edge length of the cells the placed elements are merged in.
+    geometry : callable or str, optional
+        The collision geometry of the placed elements, see :class:`SceneSync`.
+    """
+
+    def __init__(self, robot, plan_function, name=None, cell_size=0.5, geometry=None):
+        super(RosPlanningBackend, self).__init__(name)
+        from compas_fab.robots import PlanningScene
+
+        self.robot = robot
+        self.plan_function = plan_function
+        self.scene = PlanningScene(robot)
+        self.scene_sync = SceneSync.from_client(robot.client, cell_size=cell_size, geometry=geometry)
+
+    def reset(self):
+        # also removes the cells of earlier runs, and the collision mesh
+        # 'assembly' which earlier scripts appended the elements to one by one
+        self.scene_sync.clear()
+        self.scene_sync.flush()
+        super(RosPlanningBackend, self).reset()
+
+    def add_element(self, key, element):
+        self.scene_sync.add_element(key, element)
+
+    def flush(self):
+        self.scene_sync.flush()
+
+    def plan(self, key, element):
+        return self.plan_function(self.robot, key, element)
+
+
+class MockPlanningBackend(PlanningBackend):
+    """Local stand-in for a planning backend, e.g. for tests.
+
+    Instead of a trajectory, :meth:`plan` returns a dictionary with the key of
+    the element and the keys of the elements in the scene it was planned against.
+
+    Parameters
+    ----------
+    planning_time : float, optional
+        The time in seconds a request takes.
+    failing_keys : list, optional
+        The keys of the elements which cannot be planned.
+    name : str, optional
+        The name of the backend.
+    """
+
+    def __init__(self, planning_time=0., failing_keys=None, name=None):
+        super(MockPlanningBackend, self).__init__(name)
+        self.planning_time = planning_time
+        self.failing_keys = set(failing_keys or [])
+
+    def add_element(self, key, element):
+        pass
+
+    def plan(self, key, element):
+        time.sleep(self.planning_time)
+        if key in self.failing_keys:
+            raise RuntimeError('No motion found for element %s.' % key)
+        return {'key': key, 'scene': list(self.scene_keys)}
+
+
+class PlanningResult(object):
+    """The outcome of planning a single element.
+
+    Attributes
+    ----------
+    index : int
+        The position of the element in the building sequence.
+    key : hashable
+        The identifier of the element.
+    trajectory : object
+        The planned trajectory, ``None`` if planning failed.
+    error : Exception
+        The reason planning failed, ``None`` if it succeeded.
+    backend : str
+        The name of the backend which planned the element.
+    time : float
+        The time in seconds spent on the request.
+    """
+
+    def __init__(self, index, key, trajectory=None, error=None, backend=None, time=0.):
+        self.index = index
+        self.key = key
+        self.trajectory = trajectory
+        self.error = error
+        self.backend = backend
+        self.time = time
+
+    @property
+    def success(self):
+        """bool : ``True`` if a trajectory was found."""
+        return self.error is None
+
+    def __repr__(self):
+        return 'PlanningResult({!r}, {!r}, success={}, backend={!r}, time={:.3f})'.format(
+            self.index, self.key, self.success, self.backend, self.time)
+
+
+class PlanningScheduler(object):
+    """Dispatches the planning requests of a building sequence to a pool of backends.
+
+    Each element is placed into a scene containing all elements before it,
+    so the requests are not independent. The scheduler plans ahead
+    speculatively: every request is planned against its predicted scene,
+    assuming all previous elements will be planned successfully. Results are
+    handed back strictly in building order. Once an element fails, the
+    speculative results of all later elements are discarded.
+
+    Parameters
+    ----------
+    backends : list of :class:`PlanningBackend`
+        The backends to plan on, one worker thread is started per backend.
+    """
+
+    def __init__(self, backends):
+        if not backends:
+            raise ValueError('At least one planning backend is required.')
+        self.backends = list(backends)
+
+    def plan(self, assembly, sequence, placed_keys=None, callback=None):
+        """Plan the elements of a building sequence.
+
+        Parameters
+        ----------
+        assembly : :class:`Assembly`
+            The assembly the elements belong to.
+        sequence : list
+            The keys of the elements to plan, in building order.
+        placed_keys : list, optional
+            The keys of elements which are placed already and always part of the scene.
+        callback : callable, optional
+            Called as ``callback(result)`` with every successful result, in building order.
+            Use it to merge the trajectories back into the assembly.
+
+        Returns
+        -------
+        list of :class:`PlanningResult`
+            The results in building order, up to and including the first failure.
+        """
+        sequence = list(sequence)
+        placed_keys = list(placed_keys or [])
+
+        requests = Queue()
+        for index, key in enumerate(sequence):
+            requests.put((index, key))
+
+        finished = Queue()
+        limit = [len(sequence)]
+        lock = threading.Lock()
+
+        def work(backend):
+            backend.reset()
+            while True:
+                try:
+                    index, key = requests.get_nowait()
+                except Empty:
+                    return
+                with lock:
+                    if index >= limit[0]:
+                        return
+
+                start = time.time()
+                try:
+                    backend.sync_scene(assembly, placed_keys + sequence[:index])
+                    trajectory = backend.plan(key, assembly.element(key))
+                    result = PlanningResult(index, key, trajectory=trajectory, backend=backend.name)
+                except Exception as e:
+                    result = PlanningResult(index, key, error=e, backend=backend.name)
+                    with lock:
+                        limit[0] = min(limit[0], index + 1)
+                result.time = time.time() - start
+                finished.put(result)
+
+        threads = [threading.Thread(target=work, args=(backend, )) for backend in self.backends]
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+
+        results = []
+        pending = {}
+        while len(results) < limit[0]:
+            try:
+                result = finished.get(timeout=0.1)
+            except Empty:
+                if not any(thread.is_alive() for thread in threads) and finished.empty():
+                    raise RuntimeError('All planning backends stopped before the sequence was planned.')
+                continue
+            pending[result.index] = result
+
+            # hand over all results that are next in building order
+            while len(results) in pending and len(results) < limit[0]:
+                result = pending.pop(len(results))
+                results.append(result)
+                if result.success and callback:
+                    callback(result)
+
+        for thread in threads:
+            thread.join()
+
+        return results
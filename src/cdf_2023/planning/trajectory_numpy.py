@@ -0,0 +1,233 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import json
+import os
+import sys
+
+import numpy as np
+
+from ..assembly.trajectory_store import trajectory_store_path
+
+try:
+    basestring
+except NameError:
+    basestring = str
+
+
+__all__ = [
+    'trajectory_arrays_numpy',
+    'joint_limits_numpy',
+    'trajectory_metrics_numpy',
+    'trajectory_report_numpy',
+]
+
+
+def trajectory_arrays_numpy(trajectory):
+    """Convert a trajectory to arrays.
+
+    Parameters
+    ----------
+    trajectory : :class:`compas_fab.robots.JointTrajectory` or dict or :class:`numpy.ndarray`
+        A trajectory, its data dictionary, or an array as stored by a :class:`TrajectoryStore`.
+
+    Returns
+    -------
+    tuple of :class:`numpy.ndarray`
+        The time from start of the points, shape ``(m, )``, and their positions,
+        velocities and accelerations, each of shape ``(m, n)``.
+    """
+    if isinstance(trajectory, np.ndarray):
+        a = np.asarray(trajectory, dtype=float)
+        n = (a.shape[1] - 1) // 4
+        return a[:, 0], a[:, 1:1 + n], a[:, 1 + n:1 + 2 * n], a[:, 1 + 2 * n:1 + 3 * n]
+
+    if not isinstance(trajectory, dict):
+        trajectory = trajectory.to_data()
+
+    points = trajectory['points']
+    n = len(points[0]['joint_values']) if points else 0
+
+    def values(name):
+        return np.array([p[name] or [0.] * n for p in points], dtype=float).reshape(-1, n)
+
+    t = np.array([p['time_from_start']['secs'] + p['time_from_start']['nsecs'] * 1e-9 for p in points], dtype=float)
+    return t, values('joint_values'), values('velocities'), values('accelerations')
+
+
+def joint_limits_numpy(robot, group=None):
+    """Collect the limits of the configurable joints of a robot.
+
+    Parameters
+    ----------
+    robot : :class:`compas_fab.robots.Robot`
+    group : str, optional
+        The planning group.
+
+    Returns
+    -------
+    :class:`numpy.ndarray`
+        The lower and upper limits, shape ``(n, 2)``. Continuous joints have infinite limits.
+    """
+    limits = []
+    for joint in robot.get_configurable_joints(group):
+        if joint.type == joint.CONTINUOUS or not joint.limit:
+            limits.append((-np.inf, np.inf))
+        else:
+            limits.append((joint.limit.lower, joint.limit.upper))
+    return np.array(limits, dtype=float).reshape(-1, 2)
+
+
+def trajectory_metrics_numpy(trajectory, joint_limits=None, fk=None):
+    """Compute the metrics of a trajectory.
+
+    Velocities and accelerations are the ones of the time-parameterized
+    trajectory, the jerk is the finite difference of the accelerations.
+
+    Parameters
+    ----------
+    trajectory : :class:`compas_fab.robots.JointTrajectory` or dict or :class:`numpy.ndarray`
+        See :func:`trajectory_arrays_numpy`.
+    joint_limits : array-like, optional
+        The lower and upper limit of every joint, shape ``(n, 2)``, see :func:`joint_limits_numpy`.
+    fk : callable, optional
+        Returns the xyz coordinates of the tool for a list of joint values.
+        Required for the cartesian path length.
+
+    Returns
+    -------
+    dict
+        A json-serializable dictionary of the metrics, per joint metrics are lists.
+    """
+    t, q, qd, qdd = trajectory_arrays_numpy(trajectory)
+    m, n = q.shape
+
+    metrics = {'points': m, 'joints': n}
+    if not m:
+        return metrics
+
+    dq = np.diff(q, axis=0)
+    dt = np.diff(t)
+    moving = dt > 0
+    if moving.any():
+        jerk = np.abs(np.diff(qdd, axis=0)[moving] / dt[moving, None]).max(axis=0)
+    else:
+        jerk = np.zeros(n)
+
+    metrics['duration'] = float(t[-1] - t[0])
+    metrics['joint_path_length'] = float(np.linalg.norm(dq, axis=1).sum())
+    metrics['joint_travel'] = np.abs(dq).sum(axis=0).tolist()
+    metrics['peak_velocity'] = np.abs(qd).max(axis=0).tolist()
+    metrics['peak_acceleration'] = np.abs(qdd).max(axis=0).tolist()
+    metrics['peak_jerk'] = jerk.tolist()
+
+    if joint_limits is not None:
+        limits = np.asarray(joint_limits, dtype=float)
+        margin = np.minimum(q - limits[:, 0], limits[:, 1] - q).min(axis=0)
+        metrics['joint_limit_margin'] = [float(x) if np.isfinite(x) else None for x in margin]
+        metrics['min_joint_limit_margin'] = float(margin.min()) if np.isfinite(margin.min()) else None
+
+    if fk is not None:
+        xyz = np.array([fk(list(row)) for row in q], dtype=float)
+        metrics['cartesian_path_length'] = float(np.linalg.norm(np.diff(xyz, axis=0), axis=1).sum())
+
+    return metrics
+
+
+def _store_directory(store):
+    return store if isinstance(store, basestring) else store.path
+
+
+def _store_arrays(directory, refs):
+    return [np.load(os.path.join(directory, ref + '.npy'), mmap_mode='r') for ref in refs]
+
+
+def _element_trajectories(assembly, store=None, filepath=None):
+    # yields (key, trajectories) without loading the trajectories of a store into compas_fab objects
+    if isinstance(assembly, dict):
+        if store is None:
+            path = assembly.get('attributes', {}).get('trajectory_store')
+            store = trajectory_store_path(path, filepath) if path else None
+        for key, node in assembly['node'].items():
+            element = node['element']
+            if 'trajectory_refs' in element:
+                if store is None:
+                    raise ValueError('The trajectories of element %s are in a trajectory store, but no store is given.' % key)
+                yield key, _store_arrays(_store_directory(store), element['trajectory_refs'])
+            elif element.get('trajectory'):
+                yield key, element['trajectory']
+        return
+
+    for key, element in assembly.elements():
+        refs = element.trajectory_refs
+        if refs and (store is not None or element.trajectory_store):
+            yield key, _store_arrays(_store_directory(store if store is not None else element.trajectory_store), refs)
+        elif element.trajectory:
+            yield key, element.trajectory
+
+
+def trajectory_report_numpy(assembly, joint_limits=None, fk=None, store=None):
+    """Compute the metrics of the trajectories of all elements of an assembly.
+
+    Parameters
+    ----------
+    assembly : :class:`Assembly` or str or dict
+        An assembly, the path to an assembly json file, or its data. Reading
+        the file or the data directly does not need Rhino or compas_fab.
+    joint_limits : array-like, optional
+        See :func:`trajectory_metrics_numpy`.
+    fk : callable, optional
+        See :func:`trajectory_metrics_numpy`.
+    store : :class:`TrajectoryStore` or str, optional
+        The trajectory store, or its directory, of the referenced trajectories.
+        Defaults to the store recorded in the assembly, relative to the json
+        file, or to the working directory for data.
+
+    Returns
+    -------
+    dict
+        The metrics of every trajectory per element key, and a summary over all trajectories.
+
+    Raises
+    ------
+    ValueError
+        If trajectories are referenced but no store is given or recorded.
+    """
+    filepath = None
+    if isinstance(assembly, basestring):
+        filepath = assembly
+        with open(filepath, 'r') as fp:
+            assembly = json.load(fp)
+
+    elements = {}
+    for key, trajectories in _element_trajectories(assembly, store, filepath):
+        elements[str(key)] = [trajectory_metrics_numpy(trajectory, joint_limits, fk) for trajectory in trajectories]
+
+    metrics = [m for element_metrics in elements.values() for m in element_metrics if m['points']]
+    summary = {'elements': len(elements), 'trajectories': len(metrics)}
+    if metrics:
+        summary['duration'] = sum(m['duration'] for m in metrics)
+        summary['max_duration'] = max(m['duration'] for m in metrics)
+        summary['max_peak_velocity'] = max(max(m['peak_velocity']) for m in metrics)
+        summary['max_peak_acceleration'] = max(max(m['peak_acceleration']) for m in metrics)
+        summary['max_peak_jerk'] = max(max(m['peak_jerk']) for m in metrics)
+        margins = [m.get('min_joint_limit_margin') for m in metrics]
+        margins = [margin for margin in margins if margin is not None]
+        if margins:
+            summary['min_joint_limit_margin'] = min(margins)
+
+    return {'elements': elements, 'summary': summary}
+
+
+# ==============================================================================
+# Main
+# ==============================================================================
+if __name__ == "__main__":
+    # python -m cdf_2023.planning.trajectory_numpy <assembly.json> [<report.json>]
+    report = trajectory_report_numpy(sys.argv[1])
+    if len(sys.argv) > 2:
+        with open(sys.argv[2], 'w') as fp:
+            json.dump(report, fp, indent=4)
+    else:
+        print(json.dumps(report['summary'], indent=4))
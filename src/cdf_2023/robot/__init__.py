@@ -1 +1,2 @@
 from .robot import Robot
+from .allocation import RobotAllocator
@@ -0,0 +1,204 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import math
+
+
+__all__ = ['RobotAllocator']
+
+
+def _frame_key(frame):
+    return tuple(frame.point) + tuple(frame.xaxis) + tuple(frame.yaxis)
+
+
+class RobotAllocator(object):
+    """Assigns the robot-placed elements of an assembly to the robots which build them.
+
+    The elements are scheduled in building order (ascending keys). An element
+    can start once all connected elements with a smaller key are placed, and it
+    is assigned to the robot that can reach it and finishes it first, which
+    balances the load between the robots. Elements placed by humans only take
+    part as dependencies, built elements are done from the start.
+
+    The reachability of every robot is cached for its current origin frame and
+    the frames of the elements. When a robot base moves, :meth:`allocate` only
+    recomputes the reachability of that robot, and when elements move, only
+    theirs. It reschedules from the first element whose reachability, ``is_built``
+    or ``placed_by`` attribute or preceding connected elements changed.
+
+    Parameters
+    ----------
+    assembly : :class:`Assembly`
+        The assembly.
+    robots : dict
+        The robots by name, e.g. ``{'AA': robot_AA, 'AB': robot_AB}``.
+        The origin frame of a robot is its base frame.
+    reach : tuple of float, optional
+        The minimum and maximum distance between a robot base and the frame of
+        an element it can place, the same range as :meth:`Assembly.range_filter`.
+    robot_duration : float, optional
+        The time a robot needs to place an element.
+    human_duration : float, optional
+        The time humans need to place an element.
+
+    Examples
+    --------
+    >>> allocator = RobotAllocator(assembly, {'AA': robot_AA, 'AB': robot_AB})  # doctest: +SKIP
+    >>> allocation = allocator.allocate()  # doctest: +SKIP
+    >>> robot_AB.set_origin_frame(new_base_frame)  # doctest: +SKIP
+    >>> allocation = allocator.allocate()  # doctest: +SKIP
+    >>> allocator.apply()  # doctest: +SKIP
+    """
+
+    def __init__(self, assembly, robots, reach=(0.75, 1.3), robot_duration=1., human_duration=0.):
+        self.assembly = assembly
+        self.robots = robots
+        self.reach = reach
+        self.robot_duration = robot_duration
+        self.human_duration = human_duration
+
+        self._reachable = {}
+        self._signatures = []
+        self._sequence = []
+        self._allocation = {}
+        self._finish = {}
+        self._snapshots = []
+
+    @property
+    def allocation(self):
+        """dict : The name of the robot of every robot-placed element, ``None`` if no robot reaches it."""
+        return dict(self._allocation)
+
+    @property
+    def makespan(self):
+        """float : The time until the last element is placed."""
+        return max(self._finish.values()) if self._finish else 0.
+
+    def load(self):
+        """Count the elements assigned to every robot.
+
+        Returns
+        -------
+        dict
+            The number of elements per robot name.
+        """
+        load = {name: 0 for name in self.robots}
+        for name in self._allocation.values():
+            if name is not None:
+                load[name] += 1
+        return load
+
+    def reachable(self, name):
+        """Return the reachability of all elements by a robot.
+
+        Parameters
+        ----------
+        name : str
+            The name of the robot.
+
+        Returns
+        -------
+        dict
+            ``True`` or ``False`` for every element key.
+        """
+        robot = self.robots[name]
+        origin_key = _frame_key(robot.origin_frame)
+        cached = self._reachable.get(name)
+
+        # reuse the cache for an unchanged base, only new and moved elements are checked
+        previous = cached[1] if cached and cached[0] == origin_key else {}
+        entries = {}
+        missing = []
+        for key, element in self.assembly.elements():
+            frame = element.frame
+            frame_key = _frame_key(frame)
+            if key in previous and previous[key][0] == frame_key:
+                entries[key] = previous[key]
+            else:
+                missing.append((key, frame, frame_key))
+
+        frames = robot.frames_to_local_coordinates_origin([frame for _, frame, _ in missing])
+        reach_min, reach_max = self.reach
+        for (key, _, frame_key), frame in zip(missing, frames):
+            entries[key] = (frame_key, reach_min <= math.sqrt(sum(c ** 2 for c in frame.point)) <= reach_max)
+
+        self._reachable[name] = (origin_key, entries)
+        return dict((key, entry[1]) for key, entry in entries.items())
+
+    def allocate(self):
+        """Compute the allocation, reusing the previous one as far as possible.
+
+        Returns
+        -------
+        dict
+            The name of the robot of every robot-placed element, ``None`` if no robot reaches it.
+        """
+        reachable = dict((name, self.reachable(name)) for name in self.robots)
+        sequence = sorted(key for key, _element in self.assembly.elements())
+        position = {key: i for i, key in enumerate(sequence)}
+        predecessors = {}
+        signatures = []
+        for key in sequence:
+            attr = self.assembly.network.node[key]
+            predecessors[key] = sorted(nbr for nbr in self.assembly.network.neighbors(key) if position[nbr] < position[key])
+            signatures.append((key, bool(attr.get('is_built')), attr.get('placed_by'), tuple(predecessors[key]),
+                               tuple(reachable[name][key] for name in sorted(self.robots))))
+
+        # find the first element whose schedule could have changed
+        start = 0
+        while start < len(self._signatures) and start < len(signatures) and self._signatures[start] == signatures[start]:
+            start += 1
+
+        self._signatures = signatures
+        self._schedule(sequence, reachable, predecessors, start)
+        return self.allocation
+
+    def _schedule(self, sequence, reachable, predecessors, start):
+        if start:
+            available = dict(self._snapshots[start])
+            for key in self._sequence[start:]:
+                self._allocation.pop(key, None)
+                self._finish.pop(key, None)
+        else:
+            available = {name: 0. for name in self.robots}
+            self._allocation = {}
+            self._finish = {}
+
+        self._sequence = sequence
+        self._snapshots = self._snapshots[:start]
+
+        for key in sequence[start:]:
+            self._snapshots.append(dict(available))
+            attr = self.assembly.network.node[key]
+
+            if attr.get('is_built'):
+                self._finish[key] = 0.
+                continue
+
+            ready = max([self._finish[nbr] for nbr in predecessors[key]] or [0.])
+
+            if attr.get('placed_by') != 'robot':
+                self._finish[key] = ready + self.human_duration
+                continue
+
+            candidates = [name for name in sorted(self.robots) if reachable[name][key]]
+            if not candidates:
+                self._allocation[key] = None
+                self._finish[key] = ready
+                continue
+
+            name = min(candidates, key=lambda name: max(ready, available[name]))
+            available[name] = self._finish[key] = max(ready, available[name]) + self.robot_duration
+            self._allocation[key] = name
+
+        self._snapshots.append(dict(available))
+
+    def apply(self):
+        """Write the allocation to the ``robot_name`` attribute of the elements.
+
+        Elements which no robot can reach keep their current robot.
+        """
+        for key, name in self._allocation.items():
+            if name is not None:
+                self.assembly.network.node_attribute(key, 'robot_name', name)
@@ -9,6 +9,9 @@ from compas.geometry import Vector, Point
 from compas.geometry import Transformation
 from compas.geometry import Rotation
 from compas.geometry import Translation
+from compas.geometry import transform_frames
+from compas.geometry import transform_points
+from compas.geometry import quaternion_multiply
 
 import math
 
@@ -22,7 +25,9 @@ class Robot(Robot):
 
         self._scale_factor = 1.
         self.model = model
-        self.attached_tool = None
+        # newer versions of compas_fab derive the attached tool from attached_tools
+        if not isinstance(getattr(type(self), 'attached_tool', None), property):
+            self.attached_tool = None
         self.artist = artist
         self.semantics = semantics
         self.client = client
@@ -32,11 +37,28 @@ class Robot(Robot):
             'solutions': None
         }
 
+        self._T_OCF_WCF = None
+        self._T_WCF_OCF = None
         self.origin_frame = Frame.worldXY() # robot's origin in world
 
         self.base_geometry = [] #robot's base geometry
         self.picking_frame = Frame.worldXY() #pick up frame at robot's base
 
+    @property
+    def origin_frame(self):
+        """The robot's origin frame in the world coordinate frame.
+        A copy is returned, set the origin frame to move the robot.
+        :class:`compas.geometry.Frame`
+        """
+        return self._origin_frame.copy()
+
+    @origin_frame.setter
+    def origin_frame(self, frame):
+        self._origin_frame = frame.copy()
+        # the transformations are computed again on first use
+        self._T_OCF_WCF = None
+        self._T_WCF_OCF = None
+
     def get_origin_frame(self):
         """Get the robot's origin frame.
         :class:`compas.geometry.Frame`
@@ -50,19 +72,23 @@ class Robot(Robot):
 
     def transformation_OCF_WCF(self):
         """Get the transformation from the robot's origin frame (OCF) to the world coordinate frame (WCF).
+        The transformation is cached until the origin frame is set again, do not modify it.
         -------
         :class:`compas.geometry.Transformation`
         """
-        origin_frame = self.origin_frame
-        return Transformation.from_change_of_basis(origin_frame, Frame.worldXY())
+        if self._T_OCF_WCF is None:
+            self._T_OCF_WCF = Transformation.from_change_of_basis(self._origin_frame, Frame.worldXY())
+        return self._T_OCF_WCF
 
     def transformation_WCF_OCF(self):
         """Get the transformation from the world coordinate frame (WCF) to the robot's origin frame (OCF).
+        The transformation is cached until the origin frame is set again, do not modify it.
         -------
         :class:`compas.geometry.Transformation`
         """
-        origin_frame = self.origin_frame
-        return Transformation.from_change_of_basis(Frame.worldXY(), origin_frame)
+        if self._T_WCF_OCF is None:
+            self._T_WCF_OCF = Transformation.from_change_of_basis(Frame.worldXY(), self._origin_frame)
+        return self._T_WCF_OCF
 
     def to_local_coordinates_origin(self, frame_WCF):
         """Represent a frame from the world coordinate system (WCF) in the robot's origin coordinate system (OCF).
@@ -92,6 +118,67 @@ class Robot(Robot):
         frame_WCF = frame_OCF.transformed(self.transformation_OCF_WCF())
         return frame_WCF
 
+    def frames_to_local_coordinates_origin(self, frames_WCF):
+        """Represent many frames from the world coordinate system (WCF) in the robot's origin coordinate system (OCF),
+        with a single matrix multiplication.
+        Parameters
+        ----------
+        frames_WCF : list of :class:`compas.geometry.Frame`
+            Frames in the world coordinate frame.
+        Returns
+        -------
+        list of :class:`compas.geometry.Frame`
+            The frames in the robot's coordinate frame.
+        """
+        return [Frame(*f) for f in transform_frames(frames_WCF, self.transformation_WCF_OCF())]
+
+    def frames_to_world_coordinates_origin(self, frames_OCF):
+        """Represent many frames from the robot's origin coordinate system (OCF) in the world coordinate system (WCF),
+        with a single matrix multiplication.
+        Parameters
+        ----------
+        frames_OCF : list of :class:`compas.geometry.Frame`
+            Frames in the robot's coordinate frame.
+        Returns
+        -------
+        list of :class:`compas.geometry.Frame`
+            The frames in the world coordinate frame.
+        """
+        return [Frame(*f) for f in transform_frames(frames_OCF, self.transformation_OCF_WCF())]
+
+    def poses_to_local_coordinates_origin(self, poses_WCF):
+        """Represent many pose quaternions from the world coordinate system (WCF) in the robot's origin coordinate system (OCF).
+        Parameters
+        ----------
+        poses_WCF : list of list of float
+            Poses as [x, y, z, qw, qx, qy, qz] in the world coordinate frame,
+            e.g. from :meth:`Element.get_pose_quaternion`.
+        Returns
+        -------
+        list of list of float
+            The poses in the robot's coordinate frame.
+        """
+        return self._transform_poses(poses_WCF, self.transformation_WCF_OCF())
+
+    def poses_to_world_coordinates_origin(self, poses_OCF):
+        """Represent many pose quaternions from the robot's origin coordinate system (OCF) in the world coordinate system (WCF).
+        Parameters
+        ----------
+        poses_OCF : list of list of float
+            Poses as [x, y, z, qw, qx, qy, qz] in the robot's coordinate frame.
+        Returns
+        -------
+        list of list of float
+            The poses in the world coordinate frame.
+        """
+        return self._transform_poses(poses_OCF, self.transformation_OCF_WCF())
+
+    def _transform_poses(self, poses, T):
+        # the change of basis is rigid, so the orientations rotate with the quaternion of T
+        points = transform_points([pose[:3] for pose in poses], T)
+        q = list(T.rotation.quaternion)
+        return [list(point) + quaternion_multiply(q, pose[3:]) for point, pose in zip(points, poses)]
+
     def get_base_geometry(self):
         return self.base_geometry
     def set_base_geometry(self, base_geometry):
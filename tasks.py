@@ -169,6 +169,32 @@ def test(ctx, checks=True):
 
     ctx.run('pytest --doctest-module')
 
+
+@task(help={
+      'compare': 'True to compare with the last stored results, otherwise False.'})
+def benchmark(ctx, compare=True):
+    """Run the benchmarks and store the results in benchmarks/results."""
+    options = ['--benchmark-autosave', '--benchmark-storage=benchmarks/results']
+    if compare and glob.glob('benchmarks/results/*/*.json'):
+        options.append('--benchmark-compare')
+    ctx.run('pytest benchmarks %s' % ' '.join(options))
+
+
+@task(help={
+      'size': 'The number of elements.',
+      'path': 'The json file to write.',
+      'seed': 'The seed of the random numbers, the same seed grows the same assembly.',
+      'supports': 'The number of support rods.'})
+def generate(ctx, size, path, seed=None, supports=3):
+    """Grow a random reciprocal frame assembly and write it to a json file."""
+    from cdf_2023.assembly import generate_assembly
+
+    seed = int(seed) if seed is not None else None
+    assembly = generate_assembly(int(size), seed=seed, supports=int(supports))
+    assembly.to_json(path)
+    log.write('Wrote %d elements to %s' % (assembly.number_of_elements(), path))
+
+
 @task(help={
       'release_type': 'Type of release follows semver rules. Must be one of: major, minor, patch.'})
 def release(ctx, release_type):
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+import pytest
+from compas.geometry import Frame
+
+from cdf_2023.assembly import Assembly
+from cdf_2023.assembly import BuildingPlanReader
+from cdf_2023.assembly import Element
+from cdf_2023.assembly.exporters import BUILDING_PLAN_HEADER
+
+MARKERS = [Frame([0, 0, 0], [1, 0, 0], [0, 1, 0]), Frame([2., -1., 0.5], [0, 1, 0], [0, 0, 1])]
+TYPES = [u'rod', u'stäbchen', u'ü' * 10]
+
+
+def _assembly():
+    assembly = Assembly()
+    for i, type in enumerate(TYPES):
+        element = Element(Frame([0.5 * i, 1., 0.25], [1, i, 0], [-i, 1, 0.5]))
+        element._type = type
+        assembly.add_element(element)
+    return assembly
+
+
+def _assert_pose(pose, frame):
+    assert len(pose) == 7
+    loaded = Frame.from_quaternion(pose[3:], point=pose[:3])
+    for a, b in zip((loaded.point, loaded.xaxis, loaded.yaxis), (frame.point, frame.xaxis, frame.yaxis)):
+        assert list(a) == pytest.approx(list(b))
+
+
+@pytest.mark.parametrize('binary', [False, True])
+def test_round_trip(tmp_path, binary):
+    assembly = _assembly()
+    path = str(tmp_path / ('plan.bin' if binary else 'plan.csv'))
+    index = assembly.export_building_plan(path, markers=MARKERS, binary=binary)
+    assert [key for key, _ in index] == [0, 1, 2]
+
+    with open(path, 'rb') as fp, open(str(tmp_path / 'plan.idx'), 'rb') as index_fp:
+        reader = BuildingPlanReader(fp, index_fp)
+        assert reader.binary == binary
+        assert sorted(reader.offsets.items()) == index
+
+        # the markers come first, without a key or a message
+        key, type, pose, message = reader.read(BUILDING_PLAN_HEADER.size if binary else 0)
+        assert (key, type, message) == (None, 'GM', '')
+        _assert_pose(pose, MARKERS[0])
+
+        for key, element in assembly.elements():
+            read_key, type, pose, message = reader.element(key)
+            assert read_key == key
+            # binary types are cut to 16 bytes, without splitting a character
+            assert type == (TYPES[key][:8] if binary and key == 2 else TYPES[key])
+            assert message == 'This is the element with the key index %i' % key
+            _assert_pose(pose, element.frame)
+
+        with pytest.raises(KeyError):
+            reader.element(3)
+
+
+def test_binary_records(tmp_path):
+    path = str(tmp_path / 'plan.bin')
+    _assembly().export_building_plan(path, markers=MARKERS, binary=True)
+    with open(path, 'rb') as fp:
+        reader = BuildingPlanReader(fp)
+        assert len(reader) == 5
+        assert [reader.record(i)[:2] for i in range(5)] == [(None, 'GM'), (None, 'GM'), (0, 'rod'), (1, u'stäbchen'), (2, u'ü' * 8)]
+        _assert_pose(reader.record(1)[2], MARKERS[1])
+        with pytest.raises(IndexError):
+            reader.record(5)
+
+
+def test_csv_rows(tmp_path):
+    path = str(tmp_path / 'plan.csv')
+    _assembly().export_building_plan(path, markers=MARKERS)
+    with open(path, 'rb') as fp:
+        lines = fp.read().decode('utf-8').splitlines()
+        reader = BuildingPlanReader(fp)
+        assert not reader.binary
+        with pytest.raises(TypeError):
+            len(reader)
+    assert len(lines) == 5
+    assert [len(line.split(',')) for line in lines] == [8, 8, 9, 9, 9]
+    assert lines[3].startswith(u'stäbchen,')
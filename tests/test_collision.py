@@ -0,0 +1,131 @@
+import math
+import random
+
+import pytest
+from compas.datastructures import Mesh
+from compas.geometry import Box
+from compas.geometry import Frame
+from compas.geometry import Line
+from compas.geometry import Vector
+from compas.geometry import distance_point_point
+
+from cdf_2023.assembly import Element
+from cdf_2023.assembly.collision import box_hull
+from cdf_2023.assembly.collision import closest_points_segment_segment
+from cdf_2023.assembly.collision import distance_segment_segment
+from cdf_2023.assembly.collision import prism_hull
+
+GLOBALS = {'rod_length': 0.7, 'rod_radius': 0.01, 'rf_unit_radius': 0.12, 'rf_unit_offset': 0.14}
+
+
+def _point_at(segment, t):
+    return [a + (b - a) * t for a, b in zip(*segment)]
+
+
+def _brute_force(segment1, segment2, n=200):
+    points1 = [_point_at(segment1, i / float(n)) for i in range(n + 1)]
+    points2 = [_point_at(segment2, i / float(n)) for i in range(n + 1)]
+    return min(distance_point_point(a, b) for a in points1 for b in points2)
+
+
+def _segments():
+    random.seed(3)
+    segments = [(([0, 0, 0], [1, 0, 0]), ([0.5, -1, 0], [0.5, 1, 0])),    # crossing
+                (([0, 0, 0], [1, 0, 0]), ([0.5, 0.2, 0], [2, 0.2, 0])),    # parallel, overlapping
+                (([0, 0, 0], [1, 0, 0]), ([2, 1, 0], [3, 1, 0])),          # parallel, apart
+                (([0, 0, 0], [1, 0, 0]), ([-1, 0, 0], [-2, 0, 0])),        # collinear
+                (([0, 0, 0], [0, 0, 0]), ([1, 1, 1], [2, 0, 1])),          # a point
+                (([0.3, 0.3, 0.3], [0.3, 0.3, 0.3]), ([1, 1, 1], [1, 1, 1]))]
+    for _ in range(40):
+        segments.append(tuple(tuple([random.uniform(-1, 1) for _ in range(3)] for _ in range(2)) for _ in range(2)))
+    return segments
+
+
+@pytest.mark.parametrize('segment1, segment2', _segments())
+def test_distance_segment_segment(segment1, segment2):
+    a, b = closest_points_segment_segment(segment1, segment2)
+    distance = distance_segment_segment(segment1, segment2)
+    assert distance == pytest.approx(distance_point_point(a, b))
+    assert distance == pytest.approx(distance_segment_segment(segment2, segment1), abs=1e-12)
+
+    # the closest points lie on the segments, and no sampled pair is closer
+    for point, segment in ((a, segment1), (b, segment2)):
+        length = distance_point_point(*segment)
+        assert distance_point_point(segment[0], point) + distance_point_point(point, segment[1]) == pytest.approx(length, abs=1e-9)
+    brute_force = _brute_force(segment1, segment2)
+    assert distance <= brute_force + 1e-12
+    step = (distance_point_point(*segment1) + distance_point_point(*segment2)) / 200.
+    assert distance >= brute_force - step
+
+
+def _contains(mesh, point, tolerance=1e-12):
+    # a point inside a convex mesh is behind all faces, which face outwards
+    for face in mesh.faces():
+        normal = mesh.face_normal(face)
+        origin = mesh.vertex_coordinates(mesh.face_vertices(face)[0])
+        if sum(n * (p - o) for n, p, o in zip(normal, point, origin)) > tolerance:
+            return False
+    return True
+
+
+@pytest.mark.parametrize('line', [Line([0, 0, 0], [1, 0, 0]), Line([0.1, 0.2, 0.3], [0.1, 0.2, -0.5]),
+                                  Line([0, 0, 0], [0.3, -0.4, 0.6])])
+@pytest.mark.parametrize('sides', [3, 6, 8])
+def test_prism_hull(line, sides):
+    radius = 0.05
+    hull = prism_hull(line, radius, sides)
+    assert hull.number_of_vertices() == 2 * sides
+    assert hull.is_closed()
+
+    # the cylinder is inside, a bit further out is not
+    xaxis = Vector(1, 0, 0).cross(line.direction)
+    if xaxis.length < 0.1:
+        xaxis = Vector(0, 1, 0).cross(line.direction)
+    xaxis.unitize()
+    yaxis = line.direction.cross(xaxis)
+    for i in range(24):
+        angle = 2 * math.pi * i / 24.
+        offset = [radius * (math.cos(angle) * x + math.sin(angle) * y) for x, y in zip(xaxis, yaxis)]
+        for t in (0., 0.5, 1.):
+            point = [p + o for p, o in zip(_point_at(line, t), offset)]
+            assert _contains(hull, point, 1e-9)
+            outside = [p + o * 1.01 / math.cos(math.pi / sides) for p, o in zip(_point_at(line, t), offset)]
+            assert not _contains(hull, outside)
+    assert not _contains(hull, _point_at(line, 1.01))
+    assert not _contains(hull, _point_at(line, -0.01))
+
+
+def _vertices(mesh):
+    return sorted(tuple(round(x, 9) + 0. for x in mesh.vertex_coordinates(key)) for key in mesh.vertices())
+
+
+def test_box_hull():
+    frame = Frame([1, 2, 3], [1, 1, 0], [-1, 1, 0])
+    mesh = Mesh.from_shape(Box(frame, 1., 2., 3.))
+    hull = box_hull(mesh, frame)
+    assert hull.is_closed()
+    # the box itself, aligned with its frame
+    assert _vertices(hull) == _vertices(mesh)
+
+
+def test_element_collision_geometry():
+    rod = Element.from_rod(Frame([1., 2., 0.5], [0., 1., 0.], [-1., 0., 0.]), GLOBALS, 10.)
+    capsule = rod.capsule
+    assert capsule.radius == pytest.approx(GLOBALS['rod_radius'])
+    assert distance_point_point(capsule.line.start, rod.line.start) == pytest.approx(0.)
+
+    # the capsule and the hull contain the rod, the capsule mesh approximates the capsule
+    points = [rod.mesh.vertex_coordinates(key) for key in rod.mesh.vertices()]
+    assert all(distance_segment_segment(capsule.line, (point, point)) <= capsule.radius + 1e-9 for point in points)
+    assert all(_contains(rod.collision_mesh('hull'), point, 1e-9) for point in points)
+    mesh = rod.collision_mesh('capsule')
+    for key in mesh.vertices():
+        point = mesh.vertex_coordinates(key)
+        assert distance_segment_segment(capsule.line, (point, point)) == pytest.approx(capsule.radius)
+    assert rod.collision_mesh('mesh') is rod.mesh
+    with pytest.raises(ValueError):
+        rod.collision_mesh('sphere')
+
+    box = Element.from_box(Box(Frame([0, 0, 1], [1, 0, 0], [0, 1, 0]), 1., 2., 3.))
+    assert box.capsule is None
+    assert _vertices(box.collision_mesh('capsule')) == _vertices(box.mesh)
@@ -0,0 +1,102 @@
+import json
+import math
+import os
+
+import pytest
+from compas.geometry import Circle
+from compas.geometry import Cone
+from compas.geometry import Frame
+from compas.geometry import Plane
+
+from cdf_2023.assembly import ConnectorRange
+from cdf_2023.assembly.connector_range import _curve_point
+
+DATA = os.path.join(os.path.dirname(__file__), '..', 'data', 'assembly')
+
+FRAME = Frame([1., 2., 3.], [0., 1., 0.], [0., 0., 1.])
+
+
+def _surface_points(data, samples=7):
+    # points on the boundary arcs of the data of a NURBS surface
+    points, weights, degree = data['points'], data['weights'], data['u_degree']
+    knots = [knot for knot, mult in zip(data['u_knots'], data['u_mults']) for _ in range(mult)]
+    t0, t1 = knots[degree], knots[len(points)]
+    for j in (0, -1):
+        column = [row[j] for row in points]
+        column_weights = [row[j] for row in weights]
+        for i in range(samples):
+            yield _curve_point(column, column_weights, knots, degree, t0 + (t1 - t0) * i / (samples - 1.))
+
+
+@pytest.mark.parametrize('angle, sweep', [(math.radians(30), 2 * math.pi), (math.radians(60), math.radians(100)),
+                                          (math.radians(45), math.radians(270)), (math.pi / 2, math.radians(120))])
+def test_nurbs_data_round_trip(angle, sweep):
+    connector_range = ConnectorRange(FRAME, angle, 0.2, 0.5, sweep)
+    data = connector_range.nurbs_data()
+    for point in _surface_points(data):
+        assert connector_range.contains(point, tolerance=1e-9)
+
+    fitted = ConnectorRange.from_data(data)
+    assert isinstance(fitted, ConnectorRange)
+    assert fitted.angle == pytest.approx(angle)
+    assert (fitted.start, fitted.end, fitted.sweep) == pytest.approx((0.2, 0.5, sweep))
+    assert list(fitted.frame.point) == pytest.approx(list(FRAME.point))
+    assert list(fitted.frame.zaxis) == pytest.approx(list(FRAME.zaxis))
+    if sweep < 2 * math.pi:
+        assert list(fitted.frame.xaxis) == pytest.approx(list(FRAME.xaxis))
+
+
+def test_nurbs_data_of_assembly():
+    with open(os.path.join(DATA, 'trunk_1_assembly.json')) as f:
+        nodes = json.load(f)['node']
+    for node in nodes.values():
+        for name in ('connector_range_1', 'connector_range_2'):
+            data = node['element'][name]
+            connector_range = ConnectorRange.from_nurbs_data(data)
+            assert all(connector_range.contains(point, tolerance=1e-6) for point in _surface_points(data))
+
+
+def test_cone_data():
+    cone = Cone(Circle(Plane([0., 0., 1.], [0., 0., 1.]), 0.5), 2.)
+    connector_range = ConnectorRange.from_data(cone.data)
+    assert list(connector_range.frame.point) == pytest.approx([0., 0., 3.])
+    assert connector_range.angle == pytest.approx(math.atan2(0.5, 2.))
+    assert (connector_range.start, connector_range.end) == pytest.approx((0., math.hypot(0.5, 2.)))
+    assert connector_range.contains([0.5, 0., 1.])
+    assert connector_range.contains([0., 0.25, 2.])
+    assert not connector_range.contains([0., 0., 2.])
+    assert not connector_range.contains([0.75, 0., 0.])
+
+
+def test_contains():
+    connector_range = ConnectorRange(Frame.worldXY(), math.radians(45), 0.2, 1., math.pi / 2)
+    r = math.sqrt(0.5)
+    assert connector_range.contains([0.5 * r, 0., 0.5 * r])
+    assert connector_range.contains([0., 0.5 * r, 0.5 * r])
+    # outside the sweep, the distances, or off the cone
+    assert not connector_range.contains([-0.5 * r, 0., 0.5 * r])
+    assert not connector_range.contains([0.1 * r, 0., 0.1 * r])
+    assert not connector_range.contains([1.1 * r, 0., 1.1 * r])
+    assert not connector_range.contains([0.5 * r, 0., 0.6 * r])
+
+
+def test_intersection_line_cone():
+    connector_range = ConnectorRange(Frame.worldXY(), math.radians(45), 0., 2.)
+    points = connector_range.intersection_line([[-2., 0., 1.], [2., 0., 1.]])
+    assert [list(point) for point in points] == [pytest.approx([-1., 0., 1.]), pytest.approx([1., 0., 1.])]
+    # only the nappe above the apex, and only within the segment
+    assert connector_range.intersection_line([[-2., 0., -1.], [2., 0., -1.]]) == []
+    assert connector_range.intersection_line([[-0.5, 0., 1.], [0.5, 0., 1.]]) == []
+    assert len(connector_range.intersection_line([[-0.5, 0., 1.], [0.5, 0., 1.]], segment=False)) == 2
+
+
+def test_intersection_line_annulus():
+    connector_range = ConnectorRange(FRAME, math.pi / 2, 0.2, 0.5, math.pi)
+    inside = FRAME.to_world_coordinates([0., 0.3, 0.])
+    below, above = FRAME.to_world_coordinates([0., 0.3, -1.]), FRAME.to_world_coordinates([0., 0.3, 1.])
+    point, = connector_range.intersection_line([below, above])
+    assert list(point) == pytest.approx(list(inside))
+    # in the hole, outside the sweep, and parallel to the plane
+    assert connector_range.intersection_line([FRAME.to_world_coordinates([0., 0.1, -1.]), FRAME.to_world_coordinates([0., 0.1, 1.])]) == []
+    assert connector_range.intersection_line([FRAME.to_world_coordinates([0., -0.3, -1.]), FRAME.to_world_coordinates([0., -0.3, 1.])]) == []
+    assert connector_range.intersection_line([FRAME.to_world_coordinates([0., 0.3, 0.1]), FRAME.to_world_coordinates([1., 0.3, 0.1])]) == []
@@ -0,0 +1,307 @@
+import math
+
+import pytest
+from compas.datastructures import Mesh
+from compas.geometry import Box
+from compas.geometry import Frame
+from compas.geometry import Line
+from compas.geometry import Rotation
+from compas.geometry import Scale
+from compas.geometry import Transformation
+from compas.geometry import Translation
+
+from cdf_2023.assembly import Assembly
+from cdf_2023.assembly import ConnectorRange
+from cdf_2023.assembly import Element
+from cdf_2023.assembly import ElementOption
+
+T1 = Translation.from_vector([1., 2., 3.])
+T2 = Rotation.from_axis_and_angle([0, 0, 1], 0.7, [0.5, 0, 0])
+T3 = Rotation.from_axis_and_angle([1, 0, 0], 0.3) * Translation.from_vector([0., -1., 0.5])
+
+
+def _flat(value):
+    if isinstance(value, (int, float)):
+        return [float(value)]
+    if isinstance(value, dict):
+        return [x for key in sorted(value) for x in _flat(value[key])]
+    return [x for item in value for x in _flat(item)]
+
+
+def assert_close(a, b):
+    a, b = _flat(a), _flat(b)
+    assert len(a) == len(b)
+    assert a == pytest.approx(b, abs=1e-9)
+
+
+def _element():
+    element = Element(Frame([0.1, 0.2, 0.3], [1, 0, 0], [0, 1, 0]))
+    element.mesh = Mesh.from_shape(Box(Frame.worldXY(), 1., 2., 3.))
+    element.tool_frame = Frame([0, 0, 1], [1, 0, 0], [0, 1, 0])
+    element.connector_frame_1 = Frame([0.5, 0, 0], [0, 1, 0], [0, 0, 1])
+    element.line = Line([-0.5, 0, 0], [0.5, 0, 0])
+    element.path = [Frame([0, 0, 2], [1, 0, 0], [0, 1, 0]), Frame([0, 1, 2], [1, 0, 0], [0, 1, 0])]
+    return element
+
+
+def _geometry(element):
+    return {'frame': [element.frame.point, element.frame.xaxis, element.frame.yaxis],
+            'tool_frame': [element.tool_frame.point, element.tool_frame.xaxis, element.tool_frame.yaxis],
+            'connector_frame_1': [element.connector_frame_1.point, element.connector_frame_1.xaxis],
+            'line': [element.line.start, element.line.end],
+            'path': [frame.point for frame in element.path],
+            'mesh': [element.mesh.vertex_coordinates(key) for key in element.mesh.vertices()]}
+
+
+def _expected(*transformations):
+    # the geometry transformed right away, one transformation after the other
+    element = _element()
+    geometry = {'frame': element.frame, 'tool_frame': element.tool_frame, 'connector_frame_1': element.connector_frame_1,
+                'line': element.line, 'path': element.path}
+    mesh = element.mesh.copy()
+    for T in transformations:
+        for name in ('frame', 'tool_frame', 'connector_frame_1', 'line'):
+            geometry[name] = geometry[name].transformed(T)
+        geometry['path'] = [frame.transformed(T) for frame in geometry['path']]
+        mesh = mesh.transformed(T)
+    element = Element(geometry['frame'])
+    element.tool_frame = geometry['tool_frame']
+    element.connector_frame_1 = geometry['connector_frame_1']
+    element.line = geometry['line']
+    element.path = geometry['path']
+    element.mesh = mesh
+    return _geometry(element)
+
+
+def test_transform_copy_transform():
+    element = _element()
+    element.transform(T1)
+    copy = element.copy()
+    copy.transform(T2)
+    element.transform(T3)
+    assert_close(_geometry(copy), _expected(T1, T2))
+    assert_close(_geometry(element), _expected(T1, T3))
+    assert_close(_geometry(element.transformed(T2)), _expected(T1, T3, T2))
+
+
+def test_data_after_pending_transform():
+    element = _element()
+    element.transform(T1)
+    element.transform(T2)
+    loaded = Element.from_data(element.to_data())
+    assert_close(_geometry(loaded), _expected(T1, T2))
+    # reading the data applied the transformations once
+    assert_close(_geometry(element), _expected(T1, T2))
+
+
+def test_setter_between_transforms():
+    element = _element()
+    element.transform(T1)
+    # assigned values are already transformed
+    element.connector_frame_1 = Frame([0, 0, 0], [1, 0, 0], [0, 1, 0])
+    element.transform(T2)
+    assert_close([element.connector_frame_1.point, element.connector_frame_1.xaxis],
+                  [Frame([0, 0, 0], [1, 0, 0], [0, 1, 0]).transformed(T2).point, Frame.worldXY().transformed(T2).xaxis])
+    assert_close(element.tool_frame.point, _expected(T1, T2)['tool_frame'][0])
+
+    box = Box(Frame.worldXY(), 1., 1., 1.)
+    element.mesh = Mesh.from_shape(box)
+    element.transform(T3)
+    assert_close(element.mesh.vertex_coordinates(0), Mesh.from_shape(box).transformed(T3).vertex_coordinates(0))
+
+
+def test_mesh_without_source():
+    element = Element(Frame.worldXY())
+    element._mesh = Mesh.from_shape(Box(Frame.worldXY(), 1., 1., 1.))
+    element.transform(Scale.from_factors([2., 2., 2.]))
+    element.transform(T1)
+    assert element._source is None
+    mesh = Mesh.from_data(element.to_data()['_mesh'])
+    expected = Mesh.from_shape(Box(Frame.worldXY(), 1., 1., 1.)).vertex_coordinates(0)
+    assert_close(mesh.vertex_coordinates(0), [2. * x + t for x, t in zip(expected, [1., 2., 3.])])
+
+
+
+def test_source_after_pending_transform():
+    box = Box(Frame.worldXY(), 1., 2., 3.)
+    element = Element.from_box(box.copy())
+    element.transform(T1)
+    assert_close(element.source.frame.point, box.transformed(T1).frame.point)
+    assert_close(element.mesh.vertex_coordinates(0), Mesh.from_shape(box).transformed(T1).vertex_coordinates(0))
+
+GLOBALS = {'rod_length': 0.7, 'rod_radius': 0.01, 'rf_unit_radius': 0.12, 'rf_unit_offset': 0.14}
+ROD_FRAME = Frame([1., 2., 0.5], [0., 1., 0.], [-1., 0., 0.])
+
+
+def _rod_at_origin(angle):
+    # a rod built attribute by attribute, like the Grasshopper definition does
+    length, radius, offset = GLOBALS['rod_length'], GLOBALS['rf_unit_radius'], GLOBALS['rf_unit_offset']
+    element = Element(Frame.worldXY())
+    element.line = Line([-length / 2., 0, 0], [length / 2., 0, 0])
+    frames = [Frame([offset, -radius / 2., 0], [1, 0, 0], [0, 1, 0]), Frame([-offset, radius / 2., 0], [-1, 0, 0], [0, -1, 0])]
+    for i, frame in enumerate(frames, 1):
+        frame = frame.transformed(Rotation.from_axis_and_angle(frame.yaxis, math.radians(angle), frame.point))
+        direction = frame.yaxis.transformed(Rotation.from_axis_and_angle(frame.zaxis, math.radians(60)))
+        setattr(element, 'connector_frame_%d' % i, frame)
+        setattr(element, 'joint_frame_%d' % i, frame.transformed(Translation.from_vector(direction * radius)))
+    return element
+
+
+def _rod_geometry(element):
+    return [_coordinates(getattr(element, name)) for name in ('line', 'connector_frame_1', 'connector_frame_2', 'joint_frame_1', 'joint_frame_2')]
+
+
+def _coordinates(geometry):
+    if isinstance(geometry, Line):
+        return [geometry.start, geometry.end]
+    return [geometry.point, geometry.xaxis, geometry.yaxis]
+
+
+def test_rod_geometry():
+    rod = Element.from_rod(ROD_FRAME, GLOBALS, 10.)
+    explicit = _rod_at_origin(10.)
+    explicit.transform(Transformation.from_frame(ROD_FRAME))
+    assert_close(_rod_geometry(rod), _rod_geometry(explicit))
+    assert rod.mesh.number_of_vertices() > 0
+    assert_close(rod.mesh.centroid(), ROD_FRAME.point)
+    assert_close(rod.source.circle.plane.point, ROD_FRAME.point)
+    assert rod.source.height == pytest.approx(GLOBALS['rod_length'])
+
+    # the data only holds the frame and the parameters
+    data = rod.to_data()
+    assert 'connector_frame_1' not in data and 'line' not in data
+    assert_close(_rod_geometry(Element.from_data(data)), _rod_geometry(explicit))
+
+
+def test_rod_geometry_follows_frame():
+    rod = Element.from_rod(Frame.worldXY(), GLOBALS, 10.)
+    line = rod.line
+    assert rod.line is line
+    rod.frame = ROD_FRAME
+    explicit = _rod_at_origin(10.)
+    explicit.transform(Transformation.from_frame(ROD_FRAME))
+    assert_close(_rod_geometry(rod), _rod_geometry(explicit))
+    assert_close(rod.line.midpoint, rod.mesh.centroid())
+
+
+def test_rod_geometry_assigned():
+    rod = Element.from_rod(ROD_FRAME, GLOBALS, 10.)
+    other = Element.from_rod(ROD_FRAME, GLOBALS, 10.)
+    frame = rod.connector_frame_1.copy()
+    frame.point.x += 1.
+    rod.connector_frame_1 = frame
+    assert_close(other.connector_frame_1.point, [frame.point.x - 1., frame.point.y, frame.point.z])
+
+    # the assigned value is kept through transformations, copies and the data
+    rod.transform(T1)
+    moved = [frame.point.x + 1., frame.point.y + 2., frame.point.z + 3.]
+    assert_close(rod.connector_frame_1.point, moved)
+    assert_close(rod.copy().connector_frame_1.point, moved)
+    data = rod.to_data()
+    assert 'connector_frame_1' in data and 'connector_frame_2' not in data
+    assert_close(Element.from_data(data).connector_frame_1.point, moved)
+    # the derived ones follow the frame
+    assert_close(rod.connector_frame_2.point, other.connector_frame_2.transformed(T1).point)
+
+
+def _fresh(element):
+    # an element without cached properties, with the same mesh
+    fresh = Element(element.frame)
+    fresh.mesh = element.mesh.copy()
+    return fresh
+
+
+def test_cached_volume_after_scale_and_mirror():
+    element = Element.from_box(Box(Frame.worldXY(), 1., 2., 3.))
+    assert element.volume == pytest.approx(6.)
+    element.center
+
+    element.transform(Scale.from_factors([2., 1., 0.5]))
+    assert 'volume' in element._properties
+    assert element.volume == pytest.approx(6.)
+    element.transform(Scale.from_factors([2., 2., 2.]))
+    assert element.volume == pytest.approx(48.)
+    assert element.volume == pytest.approx(_fresh(element).volume)
+    assert_close(element.center, _fresh(element).center)
+
+    mirror = Transformation.from_matrix([[-1., 0., 0., 0.], [0., 1., 0., 0.], [0., 0., 1., 0.], [0., 0., 0., 1.]])
+    element.transform(Translation.from_vector([1., 0., 0.]))
+    center = element.center
+    element.transform(mirror)
+    # the volume is computed again from the mirrored mesh
+    assert 'volume' not in element._properties
+    assert element.volume == pytest.approx(_fresh(element).volume)
+    assert_close(element.center, [-center[0], center[1], center[2]])
+
+
+def test_cached_top_after_rotation():
+    element = Element.from_box(Box(Frame([0., 0., 1.], [1, 0, 0], [0, 1, 0]), 1., 2., 3.))
+    top = element.top
+    assert element.mesh.face_center(top)[2] == pytest.approx(2.5)
+
+    element.transform(Rotation.from_axis_and_angle([0, 0, 1], 0.4))
+    assert element.top == top
+    # upside down, the former bottom face is on top
+    element.transform(Rotation.from_axis_and_angle([1, 0, 0], math.pi))
+    assert 'top' not in element._properties
+    assert element.top != top
+    assert element.top == _fresh(element).top
+    assert element.mesh.face_center(element.top)[2] == pytest.approx(0.5)
+
+
+def test_setters_clear_cached_properties():
+    element = Element.from_box(Box(Frame.worldXY(), 1., 1., 1.))
+    assert element.volume == pytest.approx(1.)
+    element.mesh = Mesh.from_shape(Box(Frame.worldXY(), 2., 1., 1.))
+    assert element.volume == pytest.approx(2.)
+
+    rod = Element.from_rod(Frame.worldXY(), GLOBALS, 10.)
+    assert_close(rod.center, [0., 0., 0.])
+    rod.frame = Frame([1., 0., 0.], [0, 1, 0], [-1, 0, 0])
+    assert rod._properties == {}
+    assert_close(rod.center, [1., 0., 0.])
+
+
+def _rod_with_ranges():
+    rod = Element.from_rod(ROD_FRAME, GLOBALS, 10.)
+    rod.connector_range_1 = ConnectorRange(rod.connector_frame_1, math.radians(30), 0.1, 0.2, math.pi)
+    rod.connector_range_2 = ConnectorRange(rod.connector_frame_2, math.pi / 2, 0.1, 0.2)
+    rod.connector_2_state = False
+    return rod
+
+
+def test_option_to_element():
+    rod = _rod_with_ranges()
+    assembly = Assembly()
+    assembly.globals = GLOBALS
+    options = rod.current_option_elements(assembly, 'AB', 30., 0.05)
+    assert len(options) == 2
+    for option in options:
+        expected = rod.transformed(option.transformation)
+        element = option.to_element()
+        for name in ('frame', 'tool_frame', 'line', 'connector_frame_1', 'connector_frame_2', 'joint_frame_1', 'joint_frame_2'):
+            assert_close(_coordinates(getattr(option, name)), _coordinates(getattr(expected, name)))
+            assert_close(_coordinates(getattr(element, name)), _coordinates(getattr(expected, name)))
+        for name in ('connector_range_1', 'connector_range_2'):
+            assert_close(getattr(option, name).data, getattr(expected, name).data)
+        assert_close(option.mesh.vertex_coordinates(0), expected.mesh.vertex_coordinates(0))
+        assert_close(option.source.data, expected.source.data)
+        assert_close(option.capsule.data, expected.capsule.data)
+
+        # a placed element has open connectors
+        data, expected_data = option.data, expected.data
+        assert data['connector_1_state'] and data['connector_2_state']
+        expected_data['connector_2_state'] = True
+        assert_close(dict((k, v) for k, v in data.items() if k != '_type'),
+                     dict((k, v) for k, v in expected_data.items() if k != '_type'))
+
+
+def test_option_connector_states():
+    rod = _rod_with_ranges()
+    option = ElementOption(rod, T1)
+    option.connector_1_state = False
+    for other in (option.copy(), option.transformed(T2)):
+        assert (other.connector_1_state, other.connector_2_state) == (False, True)
+        assert (other.to_element().connector_1_state, other.to_element().connector_2_state) == (False, True)
+    assert ElementOption(rod, T1).connector_1_state
+    assert_close(option.transformed(T2).frame.point, rod.transformed(T1).transformed(T2).frame.point)
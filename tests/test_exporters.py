@@ -0,0 +1,59 @@
+import gzip
+import io
+import os
+
+import pytest
+from compas.geometry import Frame
+
+from cdf_2023.assembly import Assembly
+from cdf_2023.assembly.exporters import write_incon
+from cdf_2023.assembly.exporters import write_xr
+
+HERE = os.path.dirname(__file__)
+ASSEMBLIES = os.path.join(HERE, '..', 'data', 'assembly')
+GOLDEN = os.path.join(HERE, 'data')
+
+QR_CODE = [Frame([0.1, 0.2, 0.], [1, 0, 0], [0, 1, 0]), Frame([1.5, -0.3, 0.2], [0, 1, 0], [-1, 0, 0.3])]
+
+
+def _golden(name):
+    # written by the exports before they were streamed
+    path = os.path.join(GOLDEN, name)
+    if name.endswith('.gz'):
+        with gzip.open(path, 'rb') as fp:
+            return fp.read().decode('utf-8')
+    with io.open(path, 'r', encoding='utf-8', newline='') as fp:
+        return fp.read()
+
+
+def _read(path):
+    with io.open(path, 'r', encoding='utf-8') as fp:
+        return fp.read()
+
+
+@pytest.mark.parametrize('name, filename', [('trunk_1', 'trunk_1_assembly.json'), ('study_2', 'study_2.json')])
+def test_incon(tmp_path, name, filename):
+    assembly = Assembly.from_json(os.path.join(ASSEMBLIES, filename))
+    before = assembly.network.data
+
+    path = str(tmp_path / 'incon.json')
+    assembly.export_to_json_incon(path, QR_CODE)
+    assert _read(path) == _golden('%s_incon.json' % name)
+
+    fp = io.StringIO()
+    write_incon(assembly, fp, QR_CODE, starting_geometry=False, pretty=False)
+    assert fp.getvalue() == _golden('%s_incon_compact.json' % name)
+    assert assembly.network.data == before
+
+
+def test_xr(tmp_path):
+    assembly = Assembly.from_json(os.path.join(ASSEMBLIES, 'final_design_assembly.json'))
+    path = str(tmp_path / 'xr.json')
+    assembly.export_to_json_for_xr(path, is_built=True)
+    assert _read(path) == _golden('final_design_assembly_xr.json.gz')
+
+    # the assembly is not changed by the export
+    assert 'idx_v' not in assembly.network.default_node_attributes
+    fp = io.StringIO()
+    write_xr(assembly, fp, is_built=True)
+    assert fp.getvalue() == _golden('final_design_assembly_xr.json.gz')
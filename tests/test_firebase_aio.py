@@ -0,0 +1,65 @@
+import asyncio
+import time
+
+from cdf_2023.firebase import AsyncRealtimeDatabase
+from cdf_2023.firebase import LocalDatabase
+from cdf_2023.firebase import LocalDatabaseServer
+
+
+def test_async_client():
+    db = LocalDatabase({'Users': {'u1': {'userID': 1}}, 'Design': {'currentstick': 2}})
+
+    async def main(url):
+        async with AsyncRealtimeDatabase(url=url) as client:
+            await client.write_many([('set', 'Built Keys', {'a': 'a'}),
+                                     ('update', 'Built Keys', {'b': 'b'}),
+                                     ('remove', 'Built Keys/a', None)])
+            await client.add_key_built(7)
+            await client.update_robot_frame(7, 'robot_AA_base_frame', [1, 2])
+            assert sorted(await client.get_keys_built()) == ['7', 'b']
+            assert await client.get_users() == ['u1']
+            assert await client.get_json_data('Design', 'node') == {'7': {'robot_AA_base_frame': [1, 2]}}
+
+            db.latency = 0.3
+            start = time.time()
+            state = await client.get_state()
+            assert time.time() - start < 0.75
+            db.latency = 0.
+
+            assert state['Design']['currentstick'] == 2
+
+            events = []
+            async for event in client.stream('Built Keys'):
+                events.append(event)
+                if len(events) == 1:
+                    await client.remove_key_built('b')
+                else:
+                    break
+            assert events == [{'event': 'put', 'path': '/', 'data': {'7': '7', 'b': 'b'}},
+                              {'event': 'put', 'path': '/b', 'data': None}]
+
+    with LocalDatabaseServer(db) as server:
+        asyncio.run(main(server.url))
+
+
+def test_cancelled_pipeline_closes_connection():
+    db = LocalDatabase({'Design': {'currentstick': 2}})
+
+    async def main(url):
+        async with AsyncRealtimeDatabase(url=url, connections=1) as client:
+            db.latency = 0.2
+            writes = [('set', 'Built Keys/%d' % i, str(i)) for i in range(3)]
+            try:
+                # cancelled after the first response, the others are still on the connection
+                await asyncio.wait_for(client.write_many(writes), 0.3)
+            except asyncio.TimeoutError:
+                pass
+            else:
+                assert False, 'The writes were not cancelled.'
+            db.latency = 0.
+
+            assert client._idle == []
+            assert await client.get('Design/currentstick') == 2
+
+    with LocalDatabaseServer(db) as server:
+        asyncio.run(main(server.url))
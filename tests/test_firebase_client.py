@@ -0,0 +1,20 @@
+from cdf_2023.firebase import realtime_database
+from cdf_2023.firebase.realtime_database import RealtimeDatabase
+
+
+def test_client_is_lazy():
+    client = RealtimeDatabase(url='http://localhost:9000', credentials='service_account.json')
+    assert client.url == 'http://localhost:9000'
+    assert client.config['serviceAccount'] == 'service_account.json'
+    assert client.config['projectId'] == realtime_database.DEFAULT_CONFIG['projectId']
+    assert client._app is None
+
+
+def test_default_client_can_be_replaced():
+    default = realtime_database.get_client()
+    client = RealtimeDatabase(url='http://localhost:9000')
+    realtime_database.set_client(client)
+    try:
+        assert realtime_database.get_client() is client
+    finally:
+        realtime_database.set_client(default)
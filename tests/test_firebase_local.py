@@ -0,0 +1,176 @@
+import json
+import threading
+
+from urllib.request import Request
+from urllib.request import urlopen
+
+from cdf_2023.firebase import LocalDatabase
+from cdf_2023.firebase import LocalDatabaseServer
+from cdf_2023.firebase import RealtimeDatabase
+
+
+def test_client_on_local_database():
+    client = RealtimeDatabase(app=LocalDatabase())
+    for key in (3, 5, 7):
+        client.add_key_built(key)
+    client.remove_key_built(5)
+    assert sorted(client.get_keys_built()) == ['3', '7']
+
+    client.update_robot_frame(3, 'robot_AA_base_frame', {'point': [1, 2, 3]})
+    assert client.get_json_data('Design', 'node') == {'3': {'robot_AA_base_frame': {'point': [1, 2, 3]}}}
+    assert client.get_json_data('Design', 'currentstick') is None
+
+
+def test_integer_keys_are_returned_as_array():
+    db = LocalDatabase()
+    db.set('Built Keys', {'0': '0', '1': '1', '3': '3'})
+    assert db.get('Built Keys') == ['0', '1', None, '3']
+    db.update('', {'Built Keys/1': None, 'Built Keys/0': None})
+    assert db.get('Built Keys') == {'3': '3'}
+
+
+def test_stream_events():
+    db = LocalDatabase({'Built Keys': {'a': 'a'}})
+    messages = []
+    done = threading.Event()
+
+    def handler(message):
+        messages.append(message)
+        if len(messages) == 3:
+            done.set()
+
+    stream = db.database().child('Built Keys').stream(handler, stream_id='keys')
+    db.database().child('Built Keys').update({'b': 'b'})
+    db.database().child('Built Keys', 'a').remove()
+    db.database().child('Users').set({'u': 1})
+    assert done.wait(2)
+    stream.close()
+
+    assert [(m['event'], m['path'], m['data']) for m in messages] == [
+        ('put', '/', {'a': 'a'}),
+        ('patch', '/', {'b': 'b'}),
+        ('put', '/a', None),
+    ]
+    assert messages[0]['stream_id'] == 'keys'
+
+
+def test_server_rest_and_stream():
+    with LocalDatabaseServer(keep_alive=0.1) as server:
+        def request(method, path, data=None, headers=None):
+            body = json.dumps(data).encode('utf-8') if data is not None else None
+            return urlopen(Request(server.url + path, body, headers or {}, method=method), timeout=2)
+
+        request('PUT', '/Built%20Keys.json', {'1': '1'})
+        request('PATCH', '/Built%20Keys.json', {'2': '2'})
+        assert json.loads(request('GET', '/Built%20Keys/2.json').read().decode('utf-8')) == '2'
+        request('DELETE', '/Built%20Keys/1.json')
+        assert server.database.get('Built Keys') == {'2': '2'}
+
+        response = request('GET', '/Built%20Keys.json', headers={'Accept': 'text/event-stream'})
+        assert response.readline().decode('utf-8').strip() == 'event: put'
+        assert json.loads(response.readline().decode('utf-8')[len('data: '):]) == {'path': '/', 'data': {'2': '2'}}
+        response.close()
+
+
+def test_batch_sends_one_update():
+    db = LocalDatabase({'Built Keys': {'1': '1'}})
+    client = RealtimeDatabase(app=db)
+    with client.batch() as batch:
+        batch.add_key_built(2)
+        batch.remove_key_built(1)
+        batch.update_robot_frame(2, 'robot_AA_base_frame', {'point': [0, 0, 0]})
+        batch.set('Design/node/2', {'is_built': True})
+        batch.update_robot_frame(2, 'robot_AB_base_frame', {'point': [1, 0, 0]})
+        batch.set_joints({'0': 'j'})
+        assert len(batch) == 4
+        assert db.requests == 0
+
+    assert db.requests == 1
+    assert db.get('Built Keys') == {'2': '2'}
+    assert db.get('Design/node/2') == {'is_built': True, 'robot_AB_base_frame': {'point': [1, 0, 0]}}
+    assert db.get('Joints') == ['j']
+
+
+def test_batch_flushes_on_size_and_interval():
+    db = LocalDatabase()
+    batch = RealtimeDatabase(app=db).batch(flush_interval=0.05, max_size=2)
+    batch.add_key_built(1)
+    batch.add_key_built(2)
+    assert db.requests == 1
+
+    batch.start()
+    batch.add_key_built(3)
+    for _ in range(100):
+        if not len(batch):
+            break
+        threading.Event().wait(0.01)
+    batch.stop()
+    assert db.get('Built Keys') == [None, '1', '2', '3']
+
+
+def _wait_for(condition):
+    for _ in range(200):
+        if condition():
+            return True
+        threading.Event().wait(0.01)
+    return False
+
+
+def test_mirror_serves_getters_from_memory():
+    db = LocalDatabase({'Built Keys': {'a': 'a'}, 'Users': {'u1': {'userID': 1}}, 'Design': {'currentstick': 4}})
+    client = RealtimeDatabase(app=db)
+    mirror = client.mirror(check_interval=0.05)
+    try:
+        assert mirror.wait(2)
+        requests = db.requests
+        assert client.get_keys_built() == ['a']
+        assert client.get_users() == ['u1']
+        assert client.get_json_data('Design', 'currentstick') == 4
+        assert db.requests == requests
+
+        db.set('Built Keys/b', 'b')
+        assert _wait_for(lambda: mirror.is_built('b'))
+        assert client.get_keys_built() == ['a', 'b']
+        assert db.requests == requests + 1
+    finally:
+        mirror.stop()
+
+    assert client.get_keys_built() == ['a', 'b']
+    assert db.requests == requests + 2
+
+
+def test_mirror_reconnects_and_resyncs():
+    db = LocalDatabase({'Built Keys': {'a': 'a'}})
+    mirror = RealtimeDatabase(app=db).mirror(['Built Keys'], check_interval=0.05)
+    try:
+        assert mirror.wait(2)
+        # drop the stream and change the data while disconnected
+        mirror._streams['Built Keys'].close()
+        db.set('Built Keys', {'c': 'c'})
+        assert _wait_for(lambda: mirror.reconnects == 1)
+        assert _wait_for(lambda: mirror.get_keys_built() == ['c'])
+    finally:
+        mirror.stop()
+
+
+def test_sync_json_data_uploads_changes(tmp_path):
+    json_f = str(tmp_path / 'design.json')
+    design = {'node': dict((str(i), {'x': i}) for i in range(10)), 'edge': {'0': {'1': {}}}, 'attributes': {'name': 'a'}}
+    with open(json_f, 'w') as fp:
+        json.dump(design, fp)
+
+    db = LocalDatabase({'Design': {'node': {'99': {'x': 99}}}})
+    client = RealtimeDatabase(app=db)
+    assert client.sync_json_data(json_f, 'Design', ['node', 'edge']) == {'changed': 2, 'removed': 0}
+    assert db.get('Design/node/99') is None
+
+    design['node']['3'] = {'x': -3}
+    del design['node']['4']
+    with open(json_f, 'w') as fp:
+        json.dump(design, fp)
+    requests = db.requests
+    assert client.sync_json_data(json_f, 'Design', ['node', 'edge']) == {'changed': 1, 'removed': 1}
+    assert db.requests == requests + 1
+    assert db.get('Design/node/3') == {'x': -3}
+    assert db.get('Design/node/4') is None
+    assert client.sync_json_data(json_f, 'Design', ['node', 'edge']) == {'changed': 0, 'removed': 0}
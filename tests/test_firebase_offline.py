@@ -0,0 +1,86 @@
+import time
+
+from cdf_2023.firebase import LocalDatabase
+from cdf_2023.firebase import OfflineCache
+from cdf_2023.firebase import RealtimeDatabase
+
+
+class FlakyDatabase(LocalDatabase):
+    offline = False
+
+    def _request(self):
+        if self.offline:
+            raise ConnectionError('offline')
+        super(FlakyDatabase, self)._request()
+
+
+def test_offline_reads_and_queued_writes(tmp_path):
+    db = FlakyDatabase({'Built Keys': {'k1': 'k1'}, 'Design': {'node': {'5': {'robot_AA_base_frame': 'a'}}}})
+    path = str(tmp_path / 'cache.sqlite')
+    cache = OfflineCache(RealtimeDatabase(app=db), path, retry_interval=0., background=False)
+
+    assert cache.get_keys_built() == ['k1']
+    assert cache.get('Design/node').value == {'5': {'robot_AA_base_frame': 'a'}}
+
+    db.offline = True
+    cache.add_key_built('k2')
+    cache.update_robot_frame(5, 'robot_AA_base_frame', 'b')
+    assert cache.pending == 2
+    assert sorted(cache.get_keys_built()) == ['k1', 'k2']
+    value, age = cache.get('Design/node/5/robot_AA_base_frame')
+    assert value == 'b' and age > 0
+    cache.close()
+
+    # someone else changes the frame while this cache is offline
+    db.offline = False
+    db.set('Design/node/5/robot_AA_base_frame', 'c')
+    db.offline = True
+
+    cache = OfflineCache(RealtimeDatabase(app=db), path, retry_interval=0., background=False)
+    assert cache.pending == 2
+    db.offline = False
+    assert cache.replay() == 2
+    assert cache.pending == 0
+    assert db.get('Built Keys') == {'k1': 'k1', 'k2': 'k2'}
+    assert db.get('Design/node/5/robot_AA_base_frame') == 'b'
+    conflict, = cache.conflicts
+    assert (conflict['path'], conflict['base'], conflict['local'], conflict['remote']) == ('Design/node/5/robot_AA_base_frame', 'a', 'b', 'c')
+    cache.close()
+
+
+def test_writes_do_not_wait_for_the_network(tmp_path):
+    db = LocalDatabase({'Built Keys': {'k1': 'k1'}})
+    cache = OfflineCache(RealtimeDatabase(app=db), str(tmp_path / 'cache.sqlite'))
+    assert cache.get_keys_built() == ['k1']
+
+    db.latency = 0.2
+    start = time.time()
+    for key in ('k2', 'k3', 'k4'):
+        cache.add_key_built(key)
+    assert time.time() - start < 0.2
+    assert sorted(cache.get_keys_built(max_age=10.)) == ['k1', 'k2', 'k3', 'k4']
+
+    start = time.time()
+    while cache.pending and time.time() - start < 10.:
+        time.sleep(0.05)
+    assert cache.pending == 0
+    assert db.get('Built Keys') == {'k1': 'k1', 'k2': 'k2', 'k3': 'k3', 'k4': 'k4'}
+    cache.close()
+
+
+def test_writes_update_only_related_records():
+    db = LocalDatabase({'a': {'b': 1, 'c': 2}, 'ab': 3, 'a0': 4})
+    cache = OfflineCache(RealtimeDatabase(app=db), ':memory:', background=False)
+    for path in ('a', 'a/b', 'a/c', 'ab', 'a0'):
+        cache.get(path)
+
+    cache.set('a/b', 5)
+    assert cache.get('a', max_age=10.).value == {'b': 5, 'c': 2}
+    assert cache.get('a/b', max_age=10.).value == 5
+    cache.set('a', {'c': 6})
+    assert [cache.get(path, max_age=10.).value for path in ('a/b', 'a/c', 'ab', 'a0')] == [None, 6, 3, 4]
+    # without a background thread the writes wait for replay
+    assert db.get('a') == {'b': 1, 'c': 2}
+    assert cache.replay() == 2
+    assert db.get('a') == {'c': 6}
+    cache.close()
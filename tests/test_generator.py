@@ -0,0 +1,54 @@
+import itertools
+
+from cdf_2023.assembly import Assembly
+from cdf_2023.assembly import generate_assembly
+from cdf_2023.assembly.collision import distance_segment_segment
+from cdf_2023.assembly.generator import DEFAULT_GLOBALS
+
+
+def test_size_and_seed():
+    assembly = generate_assembly(41, seed=3)
+    assert assembly.number_of_elements() == 41
+    assert assembly.globals == DEFAULT_GLOBALS
+    assert generate_assembly(41, seed=3).data == assembly.data
+    assert generate_assembly(41, seed=4).data != assembly.data
+
+
+def test_units_are_free_and_above_ground():
+    assembly = generate_assembly(41, seed=3)
+    clearance = DEFAULT_GLOBALS['rod_radius'] * 2. + 0.015 - 0.001
+    lines = dict((key, element.line) for key, element in assembly.elements())
+    assert min(min(line.start[2], line.end[2]) for line in lines.values()) >= 0
+
+    # every element touches the elements it is connected to, and no other
+    for u, v in itertools.combinations(lines, 2):
+        if assembly.network.has_edge(u, v, directed=False):
+            continue
+        assert distance_segment_segment(lines[u], lines[v]) >= clearance
+
+
+def test_json(tmp_path):
+    assembly = generate_assembly(21, seed=1, globals={'rod_length': 0.5})
+    assert assembly.globals['rod_length'] == 0.5
+    assert abs(assembly.element(0).line.length - 0.5) < 1e-9
+
+    path = str(tmp_path / 'assembly.json')
+    assembly.to_json(path)
+    loaded = Assembly.from_json(path)
+    assert loaded.number_of_elements() == 21
+    assert loaded.number_of_connections() == assembly.number_of_connections()
+
+
+def test_even_size():
+    assembly = generate_assembly(42, seed=3)
+    assert assembly.number_of_elements() == 42
+
+    # the units of the odd size, and one more support rod where it is free
+    odd = generate_assembly(41, seed=3)
+    for key, element in odd.elements():
+        assert assembly.element(key).frame == element.frame
+    attr = assembly.network.node[41]
+    assert attr['is_support'] and attr['on_ground'] and attr['placed_by'] == 'human'
+    clearance = DEFAULT_GLOBALS['rod_radius'] * 2. + 0.015 - 0.001
+    line = assembly.element(41).line
+    assert min(distance_segment_segment(line, element.line) for key, element in odd.elements()) >= clearance
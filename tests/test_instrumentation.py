@@ -0,0 +1,82 @@
+import json
+import time
+
+from cdf_2023.instrumentation import Profiler
+
+
+def test_disabled_profiler_records_nothing():
+    profiler = Profiler()
+
+    @profiler.timed()
+    def double(x):
+        return 2 * x
+
+    with profiler.section('outer'):
+        assert double(2) == 4
+    assert profiler.stats() == {}
+    assert profiler.stacks() == {}
+
+
+def test_counts_percentiles_and_nested_time():
+    profiler = Profiler(enabled=True)
+
+    @profiler.timed('inner')
+    def inner(duration):
+        time.sleep(duration)
+
+    @profiler.timed('outer')
+    def outer():
+        for i in range(10):
+            inner(0.001 * (i % 2))
+
+    outer()
+    outer()
+
+    stats = profiler.stats()
+    assert stats['outer']['count'] == 2
+    assert stats['inner']['count'] == 20
+    assert stats['inner']['min'] <= stats['inner']['p50'] <= stats['inner']['p90'] <= stats['inner']['max']
+    assert stats['inner']['p90'] >= 0.001
+
+    stacks = profiler.stacks()
+    assert sorted(stacks) == [('outer', ), ('outer', 'inner')]
+    # the time of outer in the stacks excludes the time spent in inner
+    assert abs(stacks[('outer', )] + stacks[('outer', 'inner')] - stats['outer']['total']) < 1e-6
+    assert stacks[('outer', )] < stats['outer']['total']
+
+
+def test_records_calls_which_raise():
+    profiler = Profiler(enabled=True)
+
+    @profiler.timed('fail')
+    def fail():
+        raise ValueError()
+
+    try:
+        fail()
+    except ValueError:
+        pass
+    assert profiler.stats()['fail']['count'] == 1
+    assert profiler._stack() == []
+
+
+def test_export(tmp_path):
+    profiler = Profiler(enabled=True)
+    with profiler.section('a'):
+        with profiler.section('b'):
+            pass
+
+    profiler.to_json(str(tmp_path / 'profile.json'))
+    with open(str(tmp_path / 'profile.json')) as f:
+        data = json.load(f)
+    assert sorted(data['stats']) == ['a', 'b']
+    assert [stack['stack'] for stack in data['stacks']] == [['a'], ['a', 'b']]
+
+    profiler.to_folded(str(tmp_path / 'profile.folded'))
+    with open(str(tmp_path / 'profile.folded')) as f:
+        lines = f.read().splitlines()
+    assert [line.split(' ')[0] for line in lines] == ['a', 'a;b']
+    assert all(int(line.split(' ')[1]) >= 0 for line in lines)
+
+    profiler.reset()
+    assert profiler.stats() == {}
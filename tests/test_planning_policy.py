@@ -0,0 +1,53 @@
+import time
+
+import pytest
+
+from cdf_2023.planning import PlannerBudget
+from cdf_2023.planning import PlanningError
+from cdf_2023.planning import PlanningPolicy
+
+
+class _Trajectory(object):
+    def __init__(self, fraction=None):
+        self.fraction = fraction
+
+
+def test_escalate_from_cheap_budget():
+    cheap, expensive = PlannerBudget('RRTConnect', 1, 1.), PlannerBudget('RRTConnect', 20, 10.)
+    policy = PlanningPolicy([expensive, cheap])
+
+    def plan(budget):
+        if budget is cheap:
+            raise RuntimeError('timeout')
+        return _Trajectory()
+
+    policy.plan(0, plan)
+    stats = policy.element_statistics(0)
+    assert stats['attempts'] == 2
+    assert stats['budget'] == expensive.name
+    assert [a['success'] for a in stats['history']] == [False, True]
+
+
+def test_skip_budget_that_keeps_failing():
+    cheap, expensive = PlannerBudget('RRTConnect', 1, 1.), PlannerBudget('RRTConnect', 20, 10.)
+    policy = PlanningPolicy([cheap, expensive])
+
+    def plan(budget):
+        if budget is cheap:
+            time.sleep(0.005)
+            return _Trajectory(fraction=0.5)
+        return _Trajectory()
+
+    for key in range(5):
+        policy.plan(key, plan)
+
+    assert policy.ordered_budgets()[0] is expensive
+    assert policy.element_statistics(4)['attempts'] == 1
+
+
+def test_raise_after_all_budgets():
+    policy = PlanningPolicy(retries=2)
+    with pytest.raises(PlanningError) as e:
+        policy.plan('a', lambda budget: _Trajectory(fraction=0.))
+    assert len(e.value.attempts) == 2 * len(policy.budgets)
+    assert not policy.statistics()['elements']['a']['success']
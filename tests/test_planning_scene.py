@@ -0,0 +1,69 @@
+from compas.datastructures import Mesh
+from compas.geometry import Box
+from compas.geometry import Frame
+
+from cdf_2023.planning import SceneSync
+
+
+class _Element(object):
+    def __init__(self, point):
+        self.frame = Frame(point, [1, 0, 0], [0, 1, 0])
+        self.mesh = Mesh.from_shape(Box(self.frame, 0.1, 0.1, 0.1))
+
+
+def test_merge_elements_per_cell_and_send_diffs():
+    updates = []
+    sync = SceneSync(lambda added, removed, appended: updates.append((added, removed, appended)), cell_size=1.)
+
+    for key, point in enumerate([[0.1, 0.1, 0.1], [0.5, 0.5, 0.5], [1.5, 0.1, 0.1]]):
+        sync.add_element(key, _Element(point))
+    assert sync.flush() == (['assembly_0_0_0', 'assembly_1_0_0'], [], [])
+    assert len(updates) == 1
+    assert updates[0][0]['assembly_0_0_0'].number_of_faces() == 12
+
+    sync.add_element(3, _Element([0.2, 0.8, 0.3]))
+    assert sync.flush() == ([], [], ['assembly_0_0_0'])
+
+    sync.remove_element(2)
+    assert sync.flush() == ([], ['assembly_1_0_0'], [])
+
+    assert sync.flush() == ([], [], [])
+    assert len(updates) == 3
+
+
+def test_append_only_new_elements():
+    updates = []
+    sync = SceneSync(lambda added, removed, appended: updates.append((added, removed, appended)), cell_size=10.)
+    for key in range(50):
+        sync.add_element(key, _Element([0.1 * key, 0., 0.]))
+        sync.flush()
+
+    # a flush sends the new element, not the whole cell
+    assert all(len(appended) == 1 and not added for added, _, appended in updates[1:])
+    assert [appended['assembly_0_0_0'].number_of_faces() for _, _, appended in updates[1:]] == [6] * 49
+
+    # an updated element replaces the cell, with the elements appended before the flush
+    sync.add_element(50, _Element([0.2, 0.2, 0.2]))
+    sync.add_element(3, _Element([0.3, 0.2, 0.2]))
+    sync.add_element(51, _Element([0.4, 0.2, 0.2]))
+    assert sync.flush() == (['assembly_0_0_0'], [], [])
+    assert updates[-1][0]['assembly_0_0_0'].number_of_faces() == 6 * 52
+
+
+def test_clear_removes_objects_of_earlier_runs():
+    updates = []
+    scene = ['assembly', 'assembly_0_0_0', 'assembly_3_1_-1', 'assembly_table', 'assembly_1_2', 'robot_base', 'assembly2_0_0_0']
+    sync = SceneSync(lambda added, removed, appended: updates.append((added, removed, appended)),
+                     cell_size=1., ids_function=lambda: scene)
+    sync.add_element(0, _Element([0.1, 0.1, 0.1]))
+    sync.flush()
+
+    sync.clear()
+    assert sync.pending
+    # other objects, e.g. the table, are kept
+    assert sync.flush() == ([], ['assembly_0_0_0', 'assembly', 'assembly_3_1_-1'], [])
+
+    # a cell sent again replaces the stale object instead of removing it
+    sync.clear()
+    sync.add_element(1, _Element([0.1, 0.1, 0.1]))
+    assert sync.flush() == (['assembly_0_0_0'], ['assembly', 'assembly_3_1_-1'], [])
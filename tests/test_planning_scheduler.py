@@ -0,0 +1,36 @@
+import pytest
+
+from cdf_2023.planning import MockPlanningBackend
+from cdf_2023.planning import PlanningScheduler
+
+
+class _Assembly(object):
+    def element(self, key):
+        return None
+
+
+def test_plan_against_predicted_scene():
+    backends = [MockPlanningBackend(planning_time=0.01) for _ in range(3)]
+    scheduler = PlanningScheduler(backends)
+    merged = []
+    results = scheduler.plan(_Assembly(), [3, 1, 2, 0, 4], placed_keys=[9], callback=lambda r: merged.append(r.key))
+
+    assert [r.key for r in results] == [3, 1, 2, 0, 4]
+    assert merged == [3, 1, 2, 0, 4]
+    assert [r.trajectory['scene'] for r in results] == [[9], [9, 3], [9, 3, 1], [9, 3, 1, 2], [9, 3, 1, 2, 0]]
+
+
+def test_discard_speculative_results_after_failure():
+    backends = [MockPlanningBackend(failing_keys=[2]) for _ in range(2)]
+    scheduler = PlanningScheduler(backends)
+    merged = []
+    results = scheduler.plan(_Assembly(), range(6), callback=lambda r: merged.append(r.key))
+
+    assert [r.key for r in results] == [0, 1, 2]
+    assert not results[-1].success
+    assert merged == [0, 1]
+
+
+def test_requires_backend():
+    with pytest.raises(ValueError):
+        PlanningScheduler([])
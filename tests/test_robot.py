@@ -0,0 +1,62 @@
+import math
+
+import pytest
+from compas.geometry import Frame
+from compas.robots import RobotModel
+
+from cdf_2023.robot import Robot
+
+
+def _robot(frame):
+    robot = Robot(RobotModel('robot'))
+    robot.origin_frame = frame
+    return robot
+
+
+def _flat(frame):
+    return list(frame.point) + list(frame.xaxis) + list(frame.yaxis)
+
+
+FRAMES = [Frame([1., 2., 3.], [1, 0, 0], [0, 1, 0]),
+          Frame([-0.5, 0.2, 1.], [0, 1, 0], [-1, 0, 1]),
+          Frame([0., 0., 0.], [1, 1, 1], [1, -1, 0])]
+
+
+def test_batch_methods_match_single_frames():
+    robot = _robot(Frame([0.3, -1., 0.2], [0.6, 0.8, 0], [-0.8, 0.6, 0]))
+    local = robot.frames_to_local_coordinates_origin(FRAMES)
+    for frame, batch in zip(FRAMES, local):
+        assert _flat(batch) == pytest.approx(_flat(robot.to_local_coordinates_origin(frame)))
+    for frame, batch in zip(local, robot.frames_to_world_coordinates_origin(local)):
+        assert _flat(batch) == pytest.approx(_flat(robot.to_world_coordinates_origin(frame)))
+    for frame, world in zip(FRAMES, robot.frames_to_world_coordinates_origin(local)):
+        assert _flat(world) == pytest.approx(_flat(frame))
+
+    poses = [list(frame.point) + list(frame.quaternion) for frame in FRAMES]
+    for frame, pose in zip(FRAMES, robot.poses_to_local_coordinates_origin(poses)):
+        expected = robot.to_local_coordinates_origin(frame)
+        assert pose[:3] == pytest.approx(list(expected.point))
+        # q and -q are the same orientation
+        sign = math.copysign(1., sum(a * b for a, b in zip(pose[3:], expected.quaternion)))
+        assert [sign * q for q in pose[3:]] == pytest.approx(list(expected.quaternion))
+    for pose, world in zip(poses, robot.poses_to_world_coordinates_origin(robot.poses_to_local_coordinates_origin(poses))):
+        assert world[:3] == pytest.approx(pose[:3])
+
+
+def test_cached_transformations_follow_the_origin_frame():
+    robot = _robot(Frame.worldXY())
+    assert _flat(robot.to_local_coordinates_origin(FRAMES[0])) == pytest.approx(_flat(FRAMES[0]))
+
+    # the returned frame is a copy, changing it in place does not move the robot
+    robot.origin_frame.point.x += 1.
+    assert list(robot.origin_frame.point) == [0., 0., 0.]
+    assert _flat(robot.to_local_coordinates_origin(FRAMES[0])) == pytest.approx(_flat(FRAMES[0]))
+
+    # nor does changing the frame it was set with
+    frame = Frame([1., 0., 0.], [1, 0, 0], [0, 1, 0])
+    robot.set_origin_frame(frame)
+    frame.point.x = 5.
+    assert list(robot.get_origin_frame().point) == [1., 0., 0.]
+    assert list(robot.to_local_coordinates_origin(FRAMES[0]).point) == pytest.approx([0., 2., 3.])
+    assert list(robot.frames_to_local_coordinates_origin(FRAMES[:1])[0].point) == pytest.approx([0., 2., 3.])
+    assert list(robot.to_world_coordinates_origin(Frame.worldXY()).point) == pytest.approx([1., 0., 0.])
@@ -0,0 +1,90 @@
+import pytest
+from compas.geometry import Frame
+from compas.geometry import Translation
+from compas.robots import RobotModel
+
+from cdf_2023.assembly import Assembly
+from cdf_2023.assembly import Element
+from cdf_2023.robot import Robot
+from cdf_2023.robot import RobotAllocator
+
+
+def _robot(point):
+    robot = Robot(RobotModel('robot'))
+    robot.origin_frame = Frame(point, [1, 0, 0], [0, 1, 0])
+    return robot
+
+
+def _assembly():
+    # a row of elements between two robots, every element connected to the one before
+    assembly = Assembly()
+    for i in range(8):
+        assembly.add_element(Element(Frame([0.25 * i, 1., 0.], [1, 0, 0], [0, 1, 0])), placed_by='robot')
+        if i:
+            assembly.add_connection(i - 1, i)
+    return assembly
+
+
+def _check(allocator):
+    # the incremental allocation is the one computed from scratch
+    allocation = allocator.allocate()
+    fresh = RobotAllocator(allocator.assembly, allocator.robots)
+    assert allocation == fresh.allocate()
+    assert allocator.makespan == pytest.approx(fresh.makespan)
+    return allocation
+
+
+def test_allocate():
+    robots = {'AA': _robot([0., 0., 0.]), 'AB': _robot([1.75, 0., 0.])}
+    allocation = _check(RobotAllocator(_assembly(), robots))
+    assert set(allocation.values()) == {'AA', 'AB'}
+    assert allocation[0] == 'AA' and allocation[7] == 'AB'
+
+
+def test_reallocate_after_changes():
+    assembly = _assembly()
+    robots = {'AA': _robot([0., 0., 0.]), 'AB': _robot([1.75, 0., 0.])}
+    allocator = RobotAllocator(assembly, robots)
+    _check(allocator)
+
+    # a moved robot
+    robots['AB'].origin_frame = Frame([5., 0., 0.], [1, 0, 0], [0, 1, 0])
+    assert set(_check(allocator).values()) == {'AA', None}
+
+    # a moved element, set and transformed
+    assembly.element(7).frame = Frame([5.5, 1., 0.], [1, 0, 0], [0, 1, 0])
+    assert _check(allocator)[7] == 'AB'
+    assembly.element(6).transform(Translation.from_vector([5.25 - 1.5, 0., 0.]))
+    assert _check(allocator)[6] == 'AB'
+
+    # placed by humans
+    assembly.network.node_attribute(2, 'placed_by', 'human')
+    assert 2 not in _check(allocator)
+    assembly.network.node_attribute(2, 'placed_by', 'robot')
+    assert _check(allocator)[2] == 'AA'
+
+    # built elements are done from the start
+    makespan = allocator.makespan
+    assembly.network.node_attribute(0, 'is_built', True)
+    _check(allocator)
+    assert allocator.makespan < makespan
+
+    # new connections and elements
+    assembly.add_connection(1, 6)
+    _check(allocator)
+    key = assembly.add_element(Element(Frame([0.6, 1., 0.], [1, 0, 0], [0, 1, 0])), placed_by='robot')
+    assembly.add_connection(7, key)
+    assert _check(allocator)[key] == 'AA'
+
+
+def test_changed_predecessors_delay_the_schedule():
+    assembly = _assembly()
+    robots = {'AA': _robot([0., 0., 0.]), 'AB': _robot([1.75, 0., 0.])}
+    allocator = RobotAllocator(assembly, robots)
+    allocator.allocate()
+    makespan = allocator.makespan
+
+    # without the connection to its predecessor, an element can start right away
+    assembly.network.delete_edge(3, 4)
+    _check(allocator)
+    assert (makespan, allocator.makespan) == (8., 4.)
@@ -0,0 +1,81 @@
+import json
+
+import numpy as np
+import pytest
+
+from cdf_2023.planning import trajectory_arrays_numpy
+from cdf_2023.planning import trajectory_metrics_numpy
+from cdf_2023.planning import trajectory_report_numpy
+
+
+def _point(t, values, velocities):
+    secs = int(t)
+    return {'joint_values': values, 'joint_types': [0] * len(values), 'joint_names': [],
+            'velocities': velocities, 'accelerations': [0.] * len(values), 'effort': [0.] * len(values),
+            'time_from_start': {'secs': secs, 'nsecs': int(round((t - secs) * 1e9))}}
+
+
+def _trajectory():
+    points = [_point(0., [0., 0.], [0., 0.]),
+              _point(0.5, [0.3, -0.4], [1., -1.]),
+              _point(1.5, [0.6, -0.8], [0., 0.])]
+    return {'points': points, 'joint_names': ['a', 'b'], 'start_configuration': None,
+            'fraction': None, 'attached_collision_meshes': []}
+
+
+def test_arrays():
+    t, q, qd, qdd = trajectory_arrays_numpy(_trajectory())
+    assert t.tolist() == [0., 0.5, 1.5]
+    assert q.shape == qd.shape == qdd.shape == (3, 2)
+
+
+def test_metrics():
+    metrics = trajectory_metrics_numpy(_trajectory(), joint_limits=[[-1., 1.], [-np.inf, np.inf]],
+                                       fk=lambda q: [q[0], q[1], 0.])
+    assert metrics['duration'] == 1.5
+    assert np.isclose(metrics['joint_path_length'], 1.)
+    assert np.allclose(metrics['joint_travel'], [0.6, 0.8])
+    assert metrics['peak_velocity'] == [1., 1.]
+    assert np.isclose(metrics['min_joint_limit_margin'], 0.4)
+    assert metrics['joint_limit_margin'][1] is None
+    assert np.isclose(metrics['cartesian_path_length'], 1.)
+
+
+def test_report_from_json(tmp_path):
+    data = {'attributes': {}, 'node': {'0': {'element': {'trajectory': [_trajectory(), _trajectory()]}},
+                                       '1': {'element': {}}}}
+    filepath = tmp_path / 'assembly.json'
+    filepath.write_text(json.dumps(data))
+
+    report = trajectory_report_numpy(str(filepath))
+    assert list(report['elements']) == ['0']
+    assert report['summary']['trajectories'] == 2
+    assert report['summary']['duration'] == 3.
+
+
+def _stored(tmp_path):
+    # an assembly json in a folder, and its trajectory store in a sibling folder
+    (tmp_path / 'out').mkdir()
+    (tmp_path / 'traj').mkdir()
+    rows = [[0., 0., 0., 0., 0., 0., 0., 0., 0.], [2., 0.3, -0.4, 0., 0., 0., 0., 0., 0.]]
+    np.save(str(tmp_path / 'traj' / '0_0.npy'), np.array(rows))
+    data = {'attributes': {'trajectory_store': '../traj'}, 'node': {'0': {'element': {'trajectory_refs': ['0_0']}}}}
+    filepath = tmp_path / 'out' / 'assembly.json'
+    filepath.write_text(json.dumps(data))
+    return str(filepath), data
+
+
+def test_report_resolves_store_against_json(tmp_path, monkeypatch):
+    filepath, _data = _stored(tmp_path)
+    monkeypatch.chdir(str(tmp_path / 'traj'))
+    report = trajectory_report_numpy(filepath)
+    assert report['summary']['duration'] == 2.
+
+
+def test_report_from_data(tmp_path):
+    _filepath, data = _stored(tmp_path)
+    assert trajectory_report_numpy(data, store=str(tmp_path / 'traj'))['summary']['trajectories'] == 1
+
+    del data['attributes']['trajectory_store']
+    with pytest.raises(ValueError):
+        trajectory_report_numpy(data)
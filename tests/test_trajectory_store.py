@@ -0,0 +1,128 @@
+import json
+import os
+
+import pytest
+from compas.geometry import Frame
+from compas_fab.robots import Duration
+from compas_fab.robots import JointTrajectory
+from compas_fab.robots import JointTrajectoryPoint
+
+from cdf_2023.assembly import Assembly
+from cdf_2023.assembly import Element
+from cdf_2023.assembly import TrajectoryStore
+
+
+def _trajectory(offset=0.):
+    points = [JointTrajectoryPoint(joint_values=[offset + 0.1 * i, -0.2 * i], joint_types=[0, 0],
+                                   velocities=[0.5, -0.5], accelerations=[0., 0.], effort=[0., 0.],
+                                   time_from_start=Duration(i, 250000000))
+              for i in range(3)]
+    return JointTrajectory(trajectory_points=points, joint_names=['a', 'b'])
+
+
+def _assembly():
+    assembly = Assembly()
+    for i in range(2):
+        element = Element(Frame([i, 0, 0], [1, 0, 0], [0, 1, 0]))
+        element.trajectory = [_trajectory(i), _trajectory(i + 0.5)]
+        assembly.add_element(element)
+    return assembly
+
+
+def _values(trajectory):
+    return [list(point.joint_values) for point in trajectory.points]
+
+
+def test_relative_store_round_trip(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.mkdir('out')
+    assembly = _assembly()
+    assembly.store_trajectories(TrajectoryStore('traj'))
+    assembly.to_json(os.path.join('out', 'a.json'))
+
+    # written relative to the json file, kept absolute in memory
+    with open(os.path.join('out', 'a.json')) as f:
+        assert '"trajectory_store": "../traj"' in f.read().replace('\\\\', '/')
+    assert os.path.isabs(assembly.network.attributes['trajectory_store'])
+
+    loaded = Assembly.from_json(os.path.join('out', 'a.json'))
+    assert loaded.trajectory_store is not None
+    assert loaded.element(0).trajectory_refs == ['0_0', '0_1']
+    assert _values(loaded.element(1).trajectory[1]) == _values(_trajectory(1.5))
+
+    # saving elsewhere keeps the store reachable
+    os.mkdir('other')
+    loaded.to_json(os.path.join('other', 'b.json'))
+    assert Assembly.from_json(os.path.join('other', 'b.json')).element(0).trajectory is not None
+
+
+def test_lazy_loading(tmp_path):
+    assembly = _assembly()
+    assembly.store_trajectories(TrajectoryStore(str(tmp_path / 'traj')))
+    assembly.to_json(str(tmp_path / 'a.json'))
+    loaded = Assembly.from_json(str(tmp_path / 'a.json'))
+
+    loads = []
+    store = loaded.trajectory_store
+    load = store.load
+    store.load = lambda name: loads.append(name) or load(name)
+
+    assert loads == []
+    assert len(loaded.element(0).trajectory) == 2
+    assert loads == ['0_0', '0_1']
+    loaded.element(0).trajectory
+    assert loads == ['0_0', '0_1']
+
+
+def test_float32(tmp_path):
+    assembly = _assembly()
+    assembly.store_trajectories(TrajectoryStore(str(tmp_path / 'traj'), dtype='float32'))
+    assembly.to_json(str(tmp_path / 'a.json'))
+    loaded = Assembly.from_json(str(tmp_path / 'a.json'))
+
+    assert loaded.trajectory_store.array('1_0', mmap_mode=None).dtype.name == 'float32'
+    for trajectory, expected in zip(loaded.element(1).trajectory, [_trajectory(1), _trajectory(1.5)]):
+        for values, expected_values in zip(_values(trajectory), _values(expected)):
+            assert values == pytest.approx(expected_values, abs=1e-6)
+        assert trajectory.points[1].time_from_start.seconds == pytest.approx(1.25)
+
+
+def test_copy(tmp_path):
+    assembly = _assembly()
+    assembly.store_trajectories(TrajectoryStore(str(tmp_path / 'traj')))
+    copy = assembly.copy()
+    assert copy.trajectory_store is assembly.trajectory_store
+    assert copy.element(1).trajectory_refs == ['1_0', '1_1']
+    assert _values(copy.element(1).trajectory[0]) == _values(_trajectory(1))
+
+
+def test_empty_attributes(tmp_path):
+    store = TrajectoryStore(str(tmp_path))
+    points = [JointTrajectoryPoint(joint_values=[0.1 * i, -0.2 * i], joint_types=[0, 0], effort=[1., 2.],
+                                   time_from_start=Duration(i, 0))
+              for i in range(3)]
+    trajectory = JointTrajectory(trajectory_points=points, joint_names=['a', 'b'])
+    store.save('t', trajectory)
+    with open(str(tmp_path / 't.json')) as fp:
+        assert json.load(fp)['empty'] == ['velocities', 'accelerations']
+    assert store.load('t').data == trajectory.data
+    assert store.array('t').shape == (3, 9)
+
+    # stores written before have no empty attributes
+    store.save('full', _trajectory())
+    with open(str(tmp_path / 'full.json')) as fp:
+        meta = json.load(fp)
+    del meta['empty']
+    with open(str(tmp_path / 'full.json'), 'w') as fp:
+        json.dump(meta, fp)
+    assert store.load('full').data == _trajectory().data
+
+
+def test_missing_store(tmp_path):
+    assembly = _assembly()
+    assembly.store_trajectories(TrajectoryStore(str(tmp_path / 'traj')), path='missing')
+    assembly.to_json(str(tmp_path / 'a.json'))
+    loaded = Assembly.from_json(str(tmp_path / 'a.json'))
+    assert loaded.trajectory_store is None
+    with pytest.raises(ValueError):
+        loaded.element(0).trajectory